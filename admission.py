@@ -0,0 +1,137 @@
+"""
+Admission control for the upload endpoints.
+
+Every upload to /process, /process-stream, /parse-resume, /analyze and
+/parse-resumes takes a slot before its body is read; the streaming endpoints
+hold their slot until the last event or result line has been sent, since the
+model call runs while the response is streamed. At most UPLOAD_MAX_IN_FLIGHT uploads are processed at once
+(default 64). Up to UPLOAD_MAX_QUEUED more wait for a slot (default 256),
+each for at most UPLOAD_QUEUE_TIMEOUT seconds (default 30). Anything beyond
+that is rejected with Overloaded, which the apps turn into a 429 with a
+Retry-After header. That way a burst is shed early instead of piling up
+threads, memory and model calls.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+
+import telemetry
+
+LIMITED_PATHS = ('/process', '/process-stream', '/parse-resume', '/analyze', '/parse-resumes')
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_MAX_QUEUED = 256
+DEFAULT_QUEUE_TIMEOUT = 30.0
+RETRY_AFTER_SECONDS = 1
+
+REJECTIONS = telemetry.Counter('resume_upload_rejections_total', 'Uploads rejected with a 429', ['reason'])
+
+
+class Overloaded(Exception):
+    """Raised when an upload cannot be admitted; maps to HTTP 429"""
+
+    def __init__(self, reason):
+        super().__init__(f"Server is busy ({reason}), please retry")
+        self.reason = reason
+        self.retry_after = RETRY_AFTER_SECONDS
+
+
+class AdmissionLimiter:
+    """Bounded in-flight work with a bounded wait queue, for threads and event loops alike"""
+
+    def __init__(self, max_in_flight=None, max_queued=None, queue_timeout=None):
+        if max_in_flight is None:
+            max_in_flight = int(os.getenv('UPLOAD_MAX_IN_FLIGHT', DEFAULT_MAX_IN_FLIGHT))
+        if max_queued is None:
+            max_queued = int(os.getenv('UPLOAD_MAX_QUEUED', DEFAULT_MAX_QUEUED))
+        if queue_timeout is None:
+            queue_timeout = float(os.getenv('UPLOAD_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT))
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        # asyncio semaphores belong to the loop that uses them
+        self._async_slots = weakref.WeakKeyDictionary()
+
+    def _queue(self):
+        with self._lock:
+            if self.in_flight + self.queued >= self.max_in_flight + self.max_queued:
+                self.rejected += 1
+                REJECTIONS.inc('queue_full')
+                raise Overloaded('queue full')
+            self.queued += 1
+
+    def _admitted(self, acquired):
+        with self._lock:
+            self.queued -= 1
+            if acquired:
+                self.in_flight += 1
+                return
+            self.rejected += 1
+        REJECTIONS.inc('timeout')
+        raise Overloaded('timed out waiting for a slot')
+
+    def _done(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def enter(self):
+        """Block until a slot is free; raises Overloaded if the queue is full or the wait times out"""
+        self._queue()
+        self._admitted(self._slots.acquire(timeout=self.queue_timeout))
+
+    def leave(self):
+        self._done()
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        self.enter()
+        try:
+            yield
+        finally:
+            self.leave()
+
+    def _get_async_slots(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                slots = self._async_slots[loop] = asyncio.Semaphore(self.max_in_flight)
+        return slots
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Async variant of slot(); waiting does not block the event loop"""
+        slots = self._get_async_slots()
+        self._queue()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            acquired = False
+        except BaseException:
+            # Cancelled while waiting (e.g. the client went away)
+            with self._lock:
+                self.queued -= 1
+            raise
+        self._admitted(acquired)
+        try:
+            yield
+        finally:
+            self._done()
+            slots.release()
+
+    def stats(self):
+        return {
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'rejected': self.rejected,
+            'max_in_flight': self.max_in_flight,
+            'max_queued': self.max_queued,
+        }
@@ -1,48 +1,288 @@
 # FLASK APP - Run the app using flask --app app.py run
 import os, sys
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from pypdf import PdfReader 
-import json
 import re
-from resumeparser import ats_extractor
-from ats_score_checker import get_ats_score
-from werkzeug.utils import secure_filename
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import resumeparser
+import ats_score_checker
+from resumeparser import extract_resume
+from ats_score_checker import get_ats_score, analyze_resume_stream
+from result_cache import create_cache_from_env, make_cache_key
+import extraction_pool
+import parsed_document
+import text_extraction
+from batch import BatchSummary, DEFAULT_WORKERS as BATCH_DEFAULT_WORKERS, content_hash, process_resume, run_batch
+import gemini_client
+import json_codec
+from resume_store import create_store_from_env, search_params
+import telemetry
+from admission import AdmissionLimiter, LIMITED_PATHS, Overloaded
+
+log = telemetry.get_logger(__name__)
 
 # Get the absolute path of the project directory
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_PATH = os.path.join(PROJECT_DIR, "__DATA__")
 
-# Create __DATA__ directory if it doesn't exist
+# Create __DATA__ directory if it doesn't exist (holds the on-disk result cache)
 os.makedirs(UPLOAD_PATH, exist_ok=True)
 
+# The batch endpoint accepts many resumes (or a zip of them) in one request
+BATCH_MAX_CONTENT_LENGTH = int(os.getenv('BATCH_MAX_CONTENT_LENGTH', 100 * 1024 * 1024))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 16))
+LARGE_BODY_PATHS = ('/parse-resumes', '/rank-candidates', '/resumes')
+
+class ResumeRequest(Request):
+    """Request class that allows larger bodies on the batch and ranking endpoints only"""
+
+    @property
+    def max_content_length(self):
+        if self.path in LARGE_BODY_PATHS:
+            return BATCH_MAX_CONTENT_LENGTH
+        return super().max_content_length
+
+class CodecJSONProvider(JSONProvider):
+    """Serializes every jsonify response once, with json_codec (orjson when installed, compact)"""
+
+    def dumps(self, obj, **kwargs):
+        return json_codec.dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_codec.dumpb(obj), mimetype='application/json')
+
 app = Flask(__name__)
-# Configure CORS to allow requests from the frontend
+app.request_class = ResumeRequest
+app.json = CodecJSONProvider(app)
+# Configure CORS to allow requests from the frontend (asgi_app.py applies the same policy)
+CORS_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]  # Vite's default ports
+CORS_METHODS = ["GET", "POST", "OPTIONS"]
+CORS_HEADERS = ["Content-Type"]
 CORS(app, resources={
     r"/*": {
-        "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],  # Vite's default ports
-        "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "origins": CORS_ORIGINS,
+        "methods": CORS_METHODS,
+        "allow_headers": CORS_HEADERS
     }
 })
 
-# Configure upload folder
-UPLOAD_FOLDER = 'uploads'
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# The Gemini client is configured from config.yaml on first use (or by warmup.warm_up) and reused by every request
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Uploads are parsed straight from the request stream and never written to disk
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
 
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# Cache of model results keyed by the uploaded PDF (see result_cache.py)
+result_cache = create_cache_from_env(os.path.join(UPLOAD_PATH, "result_cache.sqlite3"))
+# Queryable store of every parse result and ATS report (see resume_store.py)
+resume_store = create_store_from_env(os.path.join(UPLOAD_PATH, "resumes.sqlite3"))
+CACHE_HEADER = 'X-Cache'
+
+# Bounds the uploads processed at once; the rest wait briefly or get a 429 (see admission.py)
+upload_limiter = AdmissionLimiter()
+telemetry.Gauge('resume_uploads_in_flight', 'Uploads being processed', lambda: upload_limiter.in_flight)
+telemetry.Gauge('resume_uploads_queued', 'Uploads waiting for a processing slot', lambda: upload_limiter.queued)
+
+# Runs the parse and score model calls of /analyze side by side
+analysis_executor = ThreadPoolExecutor(max_workers=int(os.getenv('ANALYZE_WORKERS', 16)))
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _with_cache_status(response, hit):
+    response.headers[CACHE_HEADER] = 'HIT' if hit else 'MISS'
+    return response
+
+def _extraction_settings(text_backend=True):
+    # What decides the text the model sees: parse results come from ParsedDocument (page cap
+    # only), ATS reports may come from the PDF_TEXT_BACKEND backend as well
+    settings = {'max_pages': parsed_document.MAX_PAGES}
+    if text_backend:
+        settings['text_backend'] = text_extraction.DEFAULT_BACKEND
+    return settings
+
+def parse_cache_key(pdf_bytes):
+    return make_cache_key(
+        pdf_bytes,
+        resumeparser.MODEL_NAME,
+        resumeparser.GENERATION_CONFIG,
+        resumeparser.PROMPT_VERSION,
+        _extraction_settings(text_backend=False)
+    )
+
+def score_cache_key(pdf_bytes):
+    return make_cache_key(
+        pdf_bytes,
+        ats_score_checker.MODEL_NAME,
+        ats_score_checker.GENERATION_CONFIG,
+        ats_score_checker.PROMPT_VERSION,
+        _extraction_settings()
+    )
+
+def stream_score_cache_key(pdf_bytes):
+    # /process-stream always uses the free-text prompt, whatever ATS_OUTPUT_MODE is, so its
+    # reports are cached apart from the ones score_cache_key keys
+    return make_cache_key(
+        pdf_bytes,
+        ats_score_checker.MODEL_NAME,
+        ats_score_checker.TEXT_GENERATION_CONFIG,
+        ats_score_checker.TEXT_PROMPT_VERSION + '+stream',
+        _extraction_settings()
+    )
+
+def cache_parse_result(cache_key, result):
+    """Cache a successful extract_resume result; errors are retried on the next upload"""
+    if 'error' not in result:
+        result_cache.set(cache_key, result)
+
+def cache_score_result(cache_key, result):
+    """Cache an ATS report; analyze_resume falls back to an empty report on model errors"""
+    if result.get('detailed_scores'):
+        result_cache.set(cache_key, result)
+
+def store_results(pdf_bytes, file_name=None, parsed=None, analysis=None):
+    """Write fresh results into the resume store; failed results are skipped and store errors never fail a request"""
+    if parsed is not None and 'error' in parsed:
+        parsed = None
+    if analysis is not None and not analysis.get('detailed_scores'):
+        analysis = None
+    if parsed is None and analysis is None:
+        return
+    try:
+        resume_store.upsert(content_hash(pdf_bytes), parsed, analysis, file_name)
+    except Exception as e:
+        log.warning("Error writing resume store: %s", e)
+
+def import_records(payload):
+    """Validate and upsert records posted to /resumes; raises ValueError on bad input"""
+    records = payload if isinstance(payload, list) else [payload]
+    for record in records:
+        if not isinstance(record, dict) or not isinstance(record.get('sha256'), str) or not record['sha256']:
+            raise ValueError('Every record must be an object with a "sha256" string')
+        if not isinstance(record.get('parsed_data', {}), (dict, str, type(None))):
+            raise ValueError('"parsed_data" must be an object')
+        if not isinstance(record.get('ats_analysis', {}), (dict, type(None))):
+            raise ValueError('"ats_analysis" must be an object')
+    ok = [record for record in records if record.get('status', 'ok') == 'ok']
+    return {'changed': resume_store.upsert_many(ok), 'skipped': len(records) - len(ok), 'total': len(resume_store)}
+
+def combined_cache_status(parse_hit, score_hit):
+    if parse_hit and score_hit:
+        return 'HIT'
+    if parse_hit or score_hit:
+        return 'PARTIAL'
+    return 'MISS'
+
+def overloaded_payload(e):
+    return {"error": "Too many requests", "message": str(e)}
+
+@app.before_request
+def _admit_upload():
+    # Runs before the body is read, so a rejected upload costs almost nothing
+    if request.method == 'POST' and request.path in LIMITED_PATHS:
+        try:
+            upload_limiter.enter()
+        except Overloaded as e:
+            return jsonify(overloaded_payload(e)), 429, {'Retry-After': str(e.retry_after)}
+        g.upload_admitted = True
+
+@app.teardown_request
+def _release_upload(exc):
+    if g.pop('upload_admitted', False):
+        upload_limiter.leave()
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+    if request.mimetype == 'multipart/form-data':
+        # Receive and parse the multipart body now so its time is recorded as the upload stage
+        with telemetry.span('upload'):
+            request.files
+
+@app.after_request
+def _record_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Route templates (e.g. /resumes/<sha256>) keep the label set small
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        telemetry.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, str(response.status_code))
+    return response
+
 @app.route('/')
 def index():
     return jsonify({"message": "Resume Parser API is running"})
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: per-stage and request latency histograms, token counts and cache hits"""
+    return Response(telemetry.render(), content_type=telemetry.CONTENT_TYPE)
+
+@app.route('/model-stats')
+def model_stats():
+    """Rate limiter, hedging and fallback figures of the Gemini client"""
+    return jsonify(gemini_client.get_client().stats())
+
+@app.route("/rank-candidates", methods=["POST"])
+def rank_candidates():
+    """Rank a corpus of parsed resumes against a job description (see job_matcher.py)"""
+    # numpy and scipy are only needed here, so they are not loaded at startup
+    import job_matcher
+    try:
+        return jsonify(job_matcher.rank_request(request.get_json(silent=True), resume_store))
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid ranking request',
+            'details': str(e)
+        }), 400
+
+@app.route("/resumes", methods=["GET"])
+def search_resumes():
+    """
+    Query the resume store.
+
+    Query parameters: q (full-text query), skill and company (repeatable or
+    comma-separated, all must match), min_years, min_score,
+    education_year_min, education_year_max, limit and offset.
+    """
+    try:
+        return jsonify(resume_store.search(**search_params(request.args.to_dict(flat=False))))
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid search',
+            'details': str(e)
+        }), 400
+
+@app.route("/resumes/<sha256>", methods=["GET"])
+def get_resume(sha256):
+    """Stored parse result and ATS report of one resume, by the SHA-256 of its PDF"""
+    record = resume_store.get(sha256)
+    if record is None:
+        return jsonify({
+            'error': 'Resume not found',
+            'details': f"No stored resume with sha256 {sha256}"
+        }), 404
+    return jsonify(record)
+
+@app.route("/resumes", methods=["POST"])
+def upsert_resumes():
+    """Upsert one record or a list of records shaped like batch.py output (sha256, file, parsed_data, ats_analysis)"""
+    try:
+        return jsonify(import_records(request.get_json(silent=True)))
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid resume records',
+            'details': str(e)
+        }), 400
+
 @app.route("/parse-resume", methods=["POST"])
 def parse_resume():
     try:
@@ -69,21 +309,19 @@ def parse_resume():
                 'details': 'Only PDF files are allowed'
             }), 400
 
-        # Save file securely
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        pdf_bytes = file.read()
+        cache_key = parse_cache_key(pdf_bytes)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return _with_cache_status(jsonify(cached), hit=True)
 
-        # Parse the resume
-        result = ats_extractor(filepath)
+        # Parse the resume from memory
+        result = extract_resume(pdf_bytes)
 
-        # Clean up - remove the file after processing
-        try:
-            os.remove(filepath)
-        except Exception as e:
-            print(f"Error removing file {filepath}: {str(e)}")
+        cache_parse_result(cache_key, result)
+        store_results(pdf_bytes, file.filename, parsed=result)
 
-        return result
+        return _with_cache_status(jsonify(result), hit=False)
 
     except Exception as e:
         return jsonify({
@@ -113,13 +351,15 @@ def ats():
                 "message": "Only PDF files are supported"
             }), 400
 
-        # Save the file
-        doc_path = os.path.join(UPLOAD_PATH, "file.pdf")
-        doc.save(doc_path)
+        pdf_bytes = doc.read()
+        cache_key = score_cache_key(pdf_bytes)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return _with_cache_status(jsonify(cached), hit=True)
 
-        # Read and process the file
+        # Read and process the file from memory
         try:
-            data = _read_file_from_path(doc_path)
+            data = _read_file_from_bytes(pdf_bytes)
         except Exception as e:
             return jsonify({
                 "error": "Failed to read PDF file",
@@ -129,7 +369,9 @@ def ats():
         # Get ATS analysis
         try:
             result = get_ats_score(data)
-            return jsonify(result)
+            cache_score_result(cache_key, result)
+            store_results(pdf_bytes, doc.filename, analysis=result)
+            return _with_cache_status(jsonify(result), hit=False)
         except Exception as e:
             return jsonify({
                 "error": "Failed to process resume",
@@ -140,24 +382,271 @@ def ats():
             "error": str(e),
             "message": "An error occurred while processing your resume"
         }), 500
+ 
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json_codec.dumps(data)}\n\n"
+
+@app.route("/process-stream", methods=["POST"])
+def ats_stream():
+    """
+    Streaming variant of /process using Server-Sent Events.
+
+    Emits overall_score and detailed_score events as soon as the model has
+    generated those lines, then a complete event with the full analysis.
+    """
+    if 'pdf_doc' not in request.files:
+        return jsonify({
+            "error": "No file provided",
+            "message": "Please upload a PDF file"
+        }), 400
+
+    doc = request.files['pdf_doc']
+    if doc.filename == '':
+        return jsonify({
+            "error": "No file selected",
+            "message": "Please select a PDF file"
+        }), 400
+
+    if not doc.filename.lower().endswith('.pdf'):
+        return jsonify({
+            "error": "Invalid file type",
+            "message": "Only PDF files are supported"
+        }), 400
+
+    pdf_bytes = doc.read()
+    cache_key = stream_score_cache_key(pdf_bytes)
+    cached = result_cache.get(cache_key)
+
+    if cached is None:
+        try:
+            data = _read_file_from_bytes(pdf_bytes)
+        except Exception as e:
+            return jsonify({
+                "error": "Failed to read PDF file",
+                "message": str(e)
+            }), 400
+
+    def generate():
+        if cached is not None:
+            yield _sse_event('complete', cached)
+            return
+        for event in analyze_resume_stream(data):
+            if event['event'] == 'complete':
+                cache_score_result(cache_key, event['data'])
+                store_results(pdf_bytes, doc.filename, analysis=event['data'])
+            yield _sse_event(event['event'], event['data'])
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return _with_cache_status(response, hit=cached is not None)
+
+@app.route("/analyze", methods=["POST"])
+def analyze():
+    """Parse and score a resume from one upload, running both model calls concurrently"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({
+                'error': 'No file provided',
+                'details': 'Please upload a PDF file'
+            }), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({
+                'error': 'No file selected',
+                'details': 'Please select a PDF file to upload'
+            }), 400
+
+        if not allowed_file(file.filename):
+            return jsonify({
+                'error': 'Invalid file type',
+                'details': 'Only PDF files are allowed'
+            }), 400
+
+        pdf_bytes = file.read()
+        parse_key = parse_cache_key(pdf_bytes)
+        score_key = score_cache_key(pdf_bytes)
+        parsed = result_cache.get(parse_key)
+        analysis = result_cache.get(score_key)
+        cache_status = combined_cache_status(parsed is not None, analysis is not None)
+
+        if parsed is None or analysis is None:
+            # Extract once and share the document between both model calls
+            try:
+                document = extraction_pool.extract_document(pdf_bytes)
+            except ValueError as e:
+                return jsonify({
+                    'error': 'Failed to read PDF file',
+                    'details': str(e)
+                }), 400
+
+            parse_future = analysis_executor.submit(extract_resume, document) if parsed is None else None
+            score_future = analysis_executor.submit(get_ats_score, document) if analysis is None else None
+
+            if parse_future is not None:
+                parsed = parse_future.result()
+                cache_parse_result(parse_key, parsed)
+            if score_future is not None:
+                analysis = score_future.result()
+                cache_score_result(score_key, analysis)
+            store_results(
+                pdf_bytes, file.filename,
+                parsed=parsed if parse_future is not None else None,
+                analysis=analysis if score_future is not None else None
+            )
+
+        response = jsonify({
+            'parsed_data': parsed,
+            'ats_analysis': analysis
+        })
+        response.headers[CACHE_HEADER] = cache_status
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to process resume',
+            'details': str(e)
+        }), 500
+
+def _iter_zip_pdfs(archive):
+    """Yield (name, bytes) for every PDF inside an open zip archive, reading one member at a time"""
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+            continue
+        if info.file_size > app.config['MAX_CONTENT_LENGTH']:
+            log.info("Skipping %s: larger than the single-file upload limit", info.filename)
+            continue
+        try:
+            pdf_bytes = archive.read(info)
+        except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+            log.warning("Skipping %s: cannot be read from the archive: %s", info.filename, e)
+            continue
+        yield info.filename, pdf_bytes
+
+def _open_batch_uploads(uploads):
+    """
+    Check the uploads of /parse-resumes and open their zip archives.
+
+    Args:
+        uploads: FileStorage objects from the `files` field
+
+    Returns:
+        tuple: ((name, FileStorage | ZipFile) sources for _iter_batch_items, None),
+        or (None, error payload) for a 400 response
+    """
+    sources = []
+    for upload in uploads:
+        if upload.filename.lower().endswith('.zip'):
+            try:
+                # Only the central directory is read here; members are read as the batch reaches them
+                sources.append((upload.filename, zipfile.ZipFile(upload.stream)))
+            except zipfile.BadZipFile as e:
+                _close_batch_sources(sources)
+                return None, {'error': 'Invalid zip archive', 'details': f"{upload.filename}: {str(e)}"}
+        elif allowed_file(upload.filename):
+            sources.append((upload.filename, upload))
+        else:
+            _close_batch_sources(sources)
+            return None, {
+                'error': 'Invalid file type',
+                'details': f"{upload.filename}: only PDF files and zip archives are allowed"
+            }
+    return sources, None
+
+def _close_batch_sources(sources):
+    for _, source in sources:
+        if isinstance(source, zipfile.ZipFile):
+            source.close()
+
+def _iter_batch_items(sources):
+    """Lazily yield (name, PDF bytes) for run_batch, closing the archives once the batch is done"""
+    try:
+        for name, source in sources:
+            if isinstance(source, zipfile.ZipFile):
+                yield from _iter_zip_pdfs(source)
+            else:
+                yield name, source.read()
     finally:
-        # Clean up the uploaded file
+        _close_batch_sources(sources)
+
+def _process_batch_item(name, pdf_bytes, score):
+    """Batch worker that serves resumes already in the result cache without calling the model"""
+    start = time.perf_counter()
+    parse_key = parse_cache_key(pdf_bytes)
+    score_key = score_cache_key(pdf_bytes)
+    parsed = result_cache.get(parse_key)
+    analysis = result_cache.get(score_key) if score else None
+
+    if parsed is not None and (analysis is not None or not score):
+        record = {
+            'file': name,
+            'sha256': content_hash(pdf_bytes),
+            'status': 'ok',
+            'parsed_data': parsed,
+            'cached': True
+        }
+        if score:
+            record['ats_analysis'] = analysis
+        record['elapsed_s'] = round(time.perf_counter() - start, 4)
+        return record
+
+    record = process_resume(name, pdf_bytes, score)
+    if record['status'] == 'ok':
+        result_cache.set(parse_key, record['parsed_data'])
+        if score:
+            cache_score_result(score_key, record['ats_analysis'])
+        store_results(pdf_bytes, name, parsed=record['parsed_data'], analysis=record.get('ats_analysis'))
+    return record
+
+@app.route("/parse-resumes", methods=["POST"])
+def parse_resumes():
+    """
+    Parse many resumes in one request.
+
+    Accepts several PDF uploads and/or zip archives of PDFs in the `files`
+    field and streams one JSON line per resume as each finishes, followed by
+    a {"summary": ...} line. Query parameters: workers (parallelism) and
+    score (also run the ATS analysis).
+    """
+    uploads = request.files.getlist('files')
+    if not uploads or all(upload.filename == '' for upload in uploads):
+        return jsonify({
+            'error': 'No files provided',
+            'details': 'Please upload PDF files or a zip archive of PDFs in the "files" field'
+        }), 400
+
+    sources, error = _open_batch_uploads(uploads)
+    if error is not None:
+        return jsonify(error), 400
+
+    workers = max(1, min(request.args.get('workers', BATCH_DEFAULT_WORKERS, type=int), BATCH_MAX_WORKERS))
+    score = request.args.get('score', 'false').lower() in ('1', 'true', 'yes')
+
+    def generate():
+        summary = BatchSummary()
+        # PDFs are read from the uploads and archives only as workers free up
+        items = _iter_batch_items(sources)
         try:
-            if os.path.exists(doc_path):
-                os.remove(doc_path)
-        except:
-            pass
- 
-def _read_file_from_path(path):
-    reader = PdfReader(path) 
-    data = ""
+            for record in run_batch(items, workers, score, summary=summary, process_item=_process_batch_item):
+                yield json_codec.dumpb(record) + b"\n"
+            yield json_codec.dumpb({'summary': summary.as_dict()}) + b"\n"
+        finally:
+            items.close()
 
-    for page_no in range(len(reader.pages)):
-        page = reader.pages[page_no] 
-        data += page.extract_text()
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
-    return data 
+def _read_file_from_bytes(pdf_bytes):
+    # Plain text for the ATS endpoints, from the PDF_TEXT_BACKEND backend (see text_extraction.py),
+    # extracted in the pool so large PDFs do not hold the GIL on request threads
+    return extraction_pool.extract_text(pdf_bytes)
 
 if __name__ == "__main__":
+    # With debug=True the reloader serves from a child process (WERKZEUG_RUN_MAIN=true);
+    # warming up the watching parent would only start a pool and models nobody uses
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        import warmup
+        warmup.warm_up()
     app.run(port=8000, debug=True)
 
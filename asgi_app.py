@@ -0,0 +1,488 @@
+"""
+ASGI serving mode for the resume API.
+
+Exposes the same endpoints as the Flask app, with the same CORS policy, but
+every request is a coroutine: PDF extraction and multipart parsing are
+offloaded to threads and the Gemini calls are awaited, so one process can
+hold hundreds of uploads in flight while the model is generating. The
+streaming endpoints (/process-stream, /parse-resumes) advance their
+generators on worker threads and send each event as it is produced. Run it
+with:
+
+    uvicorn asgi_app:app --port 8000
+"""
+import asyncio
+import os
+import time
+from io import BytesIO
+from urllib.parse import parse_qs
+
+from werkzeug.formparser import FormDataParser
+from werkzeug.http import parse_options_header
+
+from app import (
+    app as flask_app, allowed_file, result_cache, CACHE_HEADER,
+    BATCH_MAX_CONTENT_LENGTH, BATCH_MAX_WORKERS, LARGE_BODY_PATHS, resume_store, store_results, import_records,
+    parse_cache_key, score_cache_key, stream_score_cache_key, cache_parse_result, cache_score_result,
+    combined_cache_status, upload_limiter, overloaded_payload, CORS_ORIGINS, CORS_METHODS, CORS_HEADERS,
+    _sse_event, _open_batch_uploads, _iter_batch_items, _process_batch_item
+)
+from admission import LIMITED_PATHS, Overloaded
+from ats_score_checker import analyze_resume_stream, get_ats_score_async
+from batch import BatchSummary, DEFAULT_WORKERS as BATCH_DEFAULT_WORKERS, run_batch
+import extraction_pool
+import gemini_client
+import json_codec
+from resume_store import search_params
+import telemetry
+from resumeparser import extract_resume_async
+import warmup
+
+log = telemetry.get_logger(__name__)
+
+MAX_CONTENT_LENGTH = flask_app.config['MAX_CONTENT_LENGTH']
+# Run warmup.warm_up during lifespan startup (0 leaves it to the first requests)
+WARM_UP = os.getenv('WARM_UP', '1') != '0'
+
+
+class HTTPError(Exception):
+    def __init__(self, status, payload):
+        super().__init__(payload)
+        self.status = status
+        self.payload = payload
+
+
+def _json_body(payload):
+    return json_codec.dumpb(payload)
+
+
+class RawBody:
+    """A non-JSON response body (e.g. the Prometheus text format)"""
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+
+
+class StreamBody:
+    """A response body sent chunk by chunk from a blocking generator of bytes"""
+
+    def __init__(self, chunks, content_type):
+        self.chunks = chunks
+        self.content_type = content_type
+
+
+_END = object()
+
+
+async def _iterate_in_thread(generator):
+    """Advance a blocking generator on worker threads, yielding its items on the event loop"""
+    try:
+        while True:
+            item = await asyncio.to_thread(next, generator, _END)
+            if item is _END:
+                return
+            yield item
+    finally:
+        await asyncio.to_thread(generator.close)
+
+
+def _cors_headers(scope, preflight=False):
+    """The CORS headers flask_cors sends for the same request, if its Origin is allowed"""
+    headers = dict(scope['headers'])
+    origin = headers.get(b'origin', b'').decode('latin-1')
+    if origin not in CORS_ORIGINS:
+        return {}
+    cors = {'Access-Control-Allow-Origin': origin, 'Vary': 'Origin'}
+    if preflight:
+        cors['Access-Control-Allow-Methods'] = ', '.join(sorted(CORS_METHODS))
+        requested = headers.get(b'access-control-request-headers', b'').decode('latin-1')
+        allowed = {name.lower() for name in CORS_HEADERS}
+        requested = [name.strip() for name in requested.split(',') if name.strip().lower() in allowed]
+        if requested:
+            cors['Access-Control-Allow-Headers'] = ', '.join(requested)
+    return cors
+
+
+async def _send_response(send, status, payload, headers=None):
+    stream = payload if isinstance(payload, StreamBody) else None
+    if stream is not None:
+        body, content_type = None, stream.content_type
+    elif isinstance(payload, RawBody):
+        body, content_type = payload.body, payload.content_type
+    else:
+        body, content_type = _json_body(payload), 'application/json'
+    raw_headers = [(b'content-type', content_type.encode('latin-1'))]
+    if body is not None:
+        raw_headers.append((b'content-length', str(len(body)).encode('latin-1')))
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    if stream is None:
+        await send({'type': 'http.response.body', 'body': body})
+        return
+    try:
+        async for chunk in _iterate_in_thread(stream.chunks):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    except Exception as e:
+        # The status line is gone already; end the stream instead of sending an error response
+        log.warning("Streamed response failed: %s", e)
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _read_body(scope, receive):
+    headers = dict(scope['headers'])
+    limit = BATCH_MAX_CONTENT_LENGTH if scope['path'] in LARGE_BODY_PATHS else MAX_CONTENT_LENGTH
+    too_large = HTTPError(413, {'error': 'File too large', 'details': f'Maximum upload size is {limit // (1024 * 1024)}MB'})
+    content_length = headers.get(b'content-length')
+    if content_length is not None and int(content_length) > limit:
+        raise too_large
+
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+def _parse_multipart(scope, body):
+    headers = dict(scope['headers'])
+    mimetype, options = parse_options_header(headers.get(b'content-type', b'').decode('latin-1'))
+    _, _, files = FormDataParser().parse(BytesIO(body), mimetype, len(body), options)
+    return files
+
+
+async def _parse_files(scope, body):
+    """Parse a multipart body into werkzeug FileStorage objects, off the event loop"""
+    return await asyncio.to_thread(_parse_multipart, scope, body)
+
+
+async def parse_resume(scope, body):
+    files = await _parse_files(scope, body)
+    if 'file' not in files:
+        raise HTTPError(400, {'error': 'No file provided', 'details': 'Please upload a PDF file'})
+
+    file = files['file']
+    if file.filename == '':
+        raise HTTPError(400, {'error': 'No file selected', 'details': 'Please select a PDF file to upload'})
+    if not allowed_file(file.filename):
+        raise HTTPError(400, {'error': 'Invalid file type', 'details': 'Only PDF files are allowed'})
+
+    pdf_bytes = file.read()
+    cache_key = parse_cache_key(pdf_bytes)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return 200, cached, {CACHE_HEADER: 'HIT'}
+
+    result = await extract_resume_async(pdf_bytes)
+    cache_parse_result(cache_key, result)
+    await asyncio.to_thread(store_results, pdf_bytes, file.filename, result)
+    return 200, result, {CACHE_HEADER: 'MISS'}
+
+
+async def process(scope, body):
+    files = await _parse_files(scope, body)
+    if 'pdf_doc' not in files:
+        raise HTTPError(400, {'error': 'No file provided', 'message': 'Please upload a PDF file'})
+
+    doc = files['pdf_doc']
+    if doc.filename == '':
+        raise HTTPError(400, {'error': 'No file selected', 'message': 'Please select a PDF file'})
+    if not doc.filename.lower().endswith('.pdf'):
+        raise HTTPError(400, {'error': 'Invalid file type', 'message': 'Only PDF files are supported'})
+
+    pdf_bytes = doc.read()
+    cache_key = score_cache_key(pdf_bytes)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return 200, cached, {CACHE_HEADER: 'HIT'}
+
+    try:
+        data = await extraction_pool.extract_text_async(pdf_bytes)
+    except Exception as e:
+        raise HTTPError(400, {'error': 'Failed to read PDF file', 'message': str(e)})
+
+    result = await get_ats_score_async(data)
+    cache_score_result(cache_key, result)
+    await asyncio.to_thread(store_results, pdf_bytes, doc.filename, None, result)
+    return 200, result, {CACHE_HEADER: 'MISS'}
+
+
+async def analyze(scope, body):
+    files = await _parse_files(scope, body)
+    if 'file' not in files:
+        raise HTTPError(400, {'error': 'No file provided', 'details': 'Please upload a PDF file'})
+
+    file = files['file']
+    if file.filename == '':
+        raise HTTPError(400, {'error': 'No file selected', 'details': 'Please select a PDF file to upload'})
+    if not allowed_file(file.filename):
+        raise HTTPError(400, {'error': 'Invalid file type', 'details': 'Only PDF files are allowed'})
+
+    pdf_bytes = file.read()
+    parse_key = parse_cache_key(pdf_bytes)
+    score_key = score_cache_key(pdf_bytes)
+    parsed = result_cache.get(parse_key)
+    analysis = result_cache.get(score_key)
+    cache_status = combined_cache_status(parsed is not None, analysis is not None)
+
+    if parsed is None or analysis is None:
+        # Extract once and share the document between both model calls
+        try:
+            document = await extraction_pool.extract_document_async(pdf_bytes)
+        except ValueError as e:
+            raise HTTPError(400, {'error': 'Failed to read PDF file', 'details': str(e)})
+
+        async def cached(value):
+            return value
+
+        parsed_call = extract_resume_async(document) if parsed is None else cached(parsed)
+        score_call = get_ats_score_async(document) if analysis is None else cached(analysis)
+        new_parsed, new_analysis = await asyncio.gather(parsed_call, score_call)
+
+        if parsed is None:
+            cache_parse_result(parse_key, new_parsed)
+        if analysis is None:
+            cache_score_result(score_key, new_analysis)
+        await asyncio.to_thread(
+            store_results, pdf_bytes, file.filename,
+            new_parsed if parsed is None else None, new_analysis if analysis is None else None
+        )
+        parsed, analysis = new_parsed, new_analysis
+
+    return 200, {'parsed_data': parsed, 'ats_analysis': analysis}, {CACHE_HEADER: cache_status}
+
+
+async def process_stream(scope, body):
+    files = await _parse_files(scope, body)
+    if 'pdf_doc' not in files:
+        raise HTTPError(400, {'error': 'No file provided', 'message': 'Please upload a PDF file'})
+
+    doc = files['pdf_doc']
+    if doc.filename == '':
+        raise HTTPError(400, {'error': 'No file selected', 'message': 'Please select a PDF file'})
+    if not doc.filename.lower().endswith('.pdf'):
+        raise HTTPError(400, {'error': 'Invalid file type', 'message': 'Only PDF files are supported'})
+
+    pdf_bytes = doc.read()
+    cache_key = stream_score_cache_key(pdf_bytes)
+    cached = result_cache.get(cache_key)
+
+    if cached is None:
+        try:
+            data = await extraction_pool.extract_text_async(pdf_bytes)
+        except Exception as e:
+            raise HTTPError(400, {'error': 'Failed to read PDF file', 'message': str(e)})
+
+    def generate():
+        if cached is not None:
+            yield _sse_event('complete', cached).encode('utf-8')
+            return
+        for event in analyze_resume_stream(data):
+            if event['event'] == 'complete':
+                cache_score_result(cache_key, event['data'])
+                store_results(pdf_bytes, doc.filename, analysis=event['data'])
+            yield _sse_event(event['event'], event['data']).encode('utf-8')
+
+    headers = {
+        'Cache-Control': 'no-cache',
+        # Stop reverse proxies from buffering the stream
+        'X-Accel-Buffering': 'no',
+        CACHE_HEADER: 'HIT' if cached is not None else 'MISS',
+    }
+    return 200, StreamBody(generate(), 'text/event-stream'), headers
+
+
+def _query_int(args, name, default):
+    try:
+        return int(args[name][0]) if args.get(name) else default
+    except ValueError:
+        return default
+
+
+async def parse_resumes(scope, body):
+    files = await _parse_files(scope, body)
+    uploads = files.getlist('files')
+    if not uploads or all(upload.filename == '' for upload in uploads):
+        raise HTTPError(400, {
+            'error': 'No files provided',
+            'details': 'Please upload PDF files or a zip archive of PDFs in the "files" field'
+        })
+
+    sources, error = await asyncio.to_thread(_open_batch_uploads, uploads)
+    if error is not None:
+        raise HTTPError(400, error)
+
+    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    workers = max(1, min(_query_int(args, 'workers', BATCH_DEFAULT_WORKERS), BATCH_MAX_WORKERS))
+    score = args.get('score', ['false'])[0].lower() in ('1', 'true', 'yes')
+
+    def generate():
+        summary = BatchSummary()
+        # Runs on worker threads (see _iterate_in_thread); zip members are read as the batch reaches them
+        items = _iter_batch_items(sources)
+        try:
+            for record in run_batch(items, workers, score, summary=summary, process_item=_process_batch_item):
+                yield json_codec.dumpb(record) + b"\n"
+            yield json_codec.dumpb({'summary': summary.as_dict()}) + b"\n"
+        finally:
+            items.close()
+
+    return 200, StreamBody(generate(), 'application/x-ndjson'), None
+
+
+async def index(scope, body):
+    return 200, {'message': 'Resume Parser API is running'}, None
+
+
+async def model_stats(scope, body):
+    return 200, gemini_client.get_client().stats(), None
+
+
+async def metrics(scope, body):
+    return 200, RawBody(telemetry.render().encode('utf-8'), telemetry.CONTENT_TYPE), None
+
+
+def _json_payload(body):
+    try:
+        return json_codec.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def rank_candidates(scope, body):
+    # numpy and scipy are only needed here, so they are not loaded at startup
+    import job_matcher
+    try:
+        result = await asyncio.to_thread(job_matcher.rank_request, _json_payload(body), resume_store)
+    except ValueError as e:
+        raise HTTPError(400, {'error': 'Invalid ranking request', 'details': str(e)})
+    return 200, result, None
+
+
+async def search_resumes(scope, body):
+    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    try:
+        filters = search_params(args)
+        result = await asyncio.to_thread(lambda: resume_store.search(**filters))
+    except ValueError as e:
+        raise HTTPError(400, {'error': 'Invalid search', 'details': str(e)})
+    return 200, result, None
+
+
+async def upsert_resumes(scope, body):
+    try:
+        result = await asyncio.to_thread(import_records, _json_payload(body))
+    except ValueError as e:
+        raise HTTPError(400, {'error': 'Invalid resume records', 'details': str(e)})
+    return 200, result, None
+
+
+async def get_resume(scope, body):
+    sha256 = scope['path'][len('/resumes/'):]
+    record = await asyncio.to_thread(resume_store.get, sha256)
+    if record is None:
+        raise HTTPError(404, {'error': 'Resume not found', 'details': f"No stored resume with sha256 {sha256}"})
+    return 200, record, None
+
+
+ROUTES = {
+    ('GET', '/'): index,
+    ('GET', '/model-stats'): model_stats,
+    ('GET', '/metrics'): metrics,
+    ('POST', '/parse-resume'): parse_resume,
+    ('POST', '/process'): process,
+    ('POST', '/process-stream'): process_stream,
+    ('POST', '/parse-resumes'): parse_resumes,
+    ('POST', '/analyze'): analyze,
+    ('POST', '/rank-candidates'): rank_candidates,
+    ('GET', '/resumes'): search_resumes,
+    ('POST', '/resumes'): upsert_resumes,
+}
+# Routes whose path ends in a parameter, matched by prefix
+PREFIX_ROUTES = {
+    ('GET', '/resumes/'): get_resume,
+}
+
+
+async def _handle(handler, scope, receive):
+    if dict(scope['headers']).get(b'content-type', b'').startswith(b'multipart/form-data'):
+        with telemetry.span('upload'):
+            body = await _read_body(scope, receive)
+    else:
+        body = await _read_body(scope, receive)
+    return await handler(scope, body)
+
+
+async def _respond(handler, scope, receive, send):
+    """Run a handler and send its response; returns the status"""
+    try:
+        status, payload, headers = await _handle(handler, scope, receive)
+    except HTTPError as e:
+        status, payload, headers = e.status, e.payload, None
+    except Exception as e:
+        status, payload, headers = 500, {'error': 'Failed to process resume', 'details': str(e)}, None
+    await _send_response(send, status, payload, dict(headers or {}, **_cors_headers(scope)))
+    return status
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the PDF engines, start the extraction workers and build the models before the first upload
+                if WARM_UP:
+                    await asyncio.to_thread(warmup.warm_up)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.to_thread(extraction_pool.shutdown_pool)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    start = time.perf_counter()
+    endpoint = scope['path']
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        handler, endpoint = next(((route, prefix + '<sha256>') for (method, prefix), route in PREFIX_ROUTES.items()
+                                  if method == scope['method'] and scope['path'].startswith(prefix)
+                                  and len(scope['path']) > len(prefix)), (None, 'unmatched'))
+    known_path = any(path == scope['path'] for _, path in ROUTES) or any(
+        scope['path'].startswith(prefix) and len(scope['path']) > len(prefix) for _, prefix in PREFIX_ROUTES
+    )
+    if scope['method'] == 'OPTIONS' and known_path:
+        # CORS preflight, answered like flask_cors does
+        await _send_response(send, 200, RawBody(b'', 'text/html; charset=utf-8'), _cors_headers(scope, preflight=True))
+        telemetry.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, '200')
+        return
+    if handler is None:
+        status = 405 if known_path else 404
+        await _send_response(
+            send, status, {'error': 'Method not allowed' if known_path else 'Not found'}, _cors_headers(scope)
+        )
+        return
+
+    try:
+        if scope['method'] == 'POST' and scope['path'] in LIMITED_PATHS:
+            # Admitted before the body is read, so a rejected upload costs almost nothing; the slot is held
+            # until the response (including a streamed one) has been sent
+            async with upload_limiter.slot_async():
+                status = await _respond(handler, scope, receive, send)
+        else:
+            status = await _respond(handler, scope, receive, send)
+    except Overloaded as e:
+        status = 429
+        headers = dict(_cors_headers(scope), **{'Retry-After': str(e.retry_after)})
+        await _send_response(send, status, overloaded_payload(e), headers)
+
+    telemetry.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, str(status))
@@ -1,20 +1,94 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
 import json
 import re
+from parsed_document import ParsedDocument
+from resume_models import normalize_report
+import gemini_client
+import prompt_compaction
+import telemetry
 
-# Load environment variables
-load_dotenv()
+log = telemetry.get_logger(__name__)
+
+MODEL_NAME = 'gemini-1.5-flash'
+
+# 'json' asks Gemini for output matching ANALYSIS_SCHEMA; 'text' uses the free-form
+# prompt scraped by parse_analysis_response
+OUTPUT_MODE = os.getenv('ATS_OUTPUT_MODE', 'json').lower()
+
+# 'llm' always asks Gemini; 'local' only uses local_ats_scorer; 'gate' scores locally
+# first and asks Gemini only for resumes scoring at least ATS_GATE_THRESHOLD
+SCORER = os.getenv('ATS_SCORER', 'llm').lower()
+GATE_THRESHOLD = int(os.getenv('ATS_GATE_THRESHOLD', 60))
+
+# Bump whenever a prompt changes so cached results are invalidated
+TEXT_PROMPT_VERSION = 'ats-v2+' + prompt_compaction.CACHE_TAG
+JSON_PROMPT_VERSION = 'ats-json-v2+' + prompt_compaction.CACHE_TAG
+
+# (schema key, display name, weight) of the scored categories
+CATEGORIES = [
+    ('content_quality', 'Content Quality', 0.15),
+    ('ats_parse_rate', 'ATS Parse Rate', 0.15),
+    ('quantifying_impact', 'Quantifying Impact', 0.15),
+    ('repetition_check', 'Repetition Check', 0.10),
+    ('spelling_grammar', 'Spelling & Grammar', 0.10),
+    ('format', 'Format', 0.10),
+    ('sections', 'Sections', 0.125),
+    ('style', 'Style', 0.125),
+]
+
+_string_list_schema = {'type': 'array', 'items': {'type': 'string'}}
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'ats_score': {'type': 'integer'},
+        'detailed_scores': {
+            'type': 'object',
+            'properties': {key: {'type': 'integer'} for key, _, _ in CATEGORIES},
+            'required': [key for key, _, _ in CATEGORIES]
+        },
+        'category_analysis': {
+            'type': 'object',
+            'properties': {key: {'type': 'string'} for key, _, _ in CATEGORIES}
+        },
+        'strengths': _string_list_schema,
+        'improvements': _string_list_schema,
+        'recommendations': _string_list_schema
+    },
+    'required': ['ats_score', 'detailed_scores', 'strengths', 'improvements', 'recommendations']
+}
+
+TEXT_GENERATION_CONFIG = {}
+JSON_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': ANALYSIS_SCHEMA,
+    'max_output_tokens': 1536
+}
+
+if OUTPUT_MODE == 'json':
+    PROMPT_VERSION = JSON_PROMPT_VERSION
+    GENERATION_CONFIG = JSON_GENERATION_CONFIG
+else:
+    PROMPT_VERSION = TEXT_PROMPT_VERSION
+    GENERATION_CONFIG = TEXT_GENERATION_CONFIG
+if SCORER != 'llm':
+    PROMPT_VERSION += f'+{SCORER}:{GATE_THRESHOLD}' if SCORER == 'gate' else f'+{SCORER}'
 
 def setup_gemini():
-    """Setup Gemini API with the API key."""
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        raise ValueError("Please set GEMINI_API_KEY in your .env file")
-    
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-1.5-flash')
+    """Return the shared Gemini client, configured from config.yaml or GEMINI_API_KEY."""
+    try:
+        return gemini_client.get_configured_client()
+    except (FileNotFoundError, KeyError) as e:
+        raise ValueError("Please set GEMINI_API_KEY in your .env file") from e
+
+def _empty_analysis():
+    return {
+        'ats_score': 0,
+        'detailed_scores': {},
+        'category_analysis': {},
+        'strengths': [],
+        'improvements': [],
+        'recommendations': []
+    }
 
 def parse_analysis_response(response_text):
     """
@@ -74,34 +148,168 @@ def parse_analysis_response(response_text):
             'recommendations': recommendations
         }
     except Exception as e:
-        print(f"Error parsing response: {str(e)}")
-        return {
-            'ats_score': 0,
-            'detailed_scores': {},
-            'category_analysis': {},
-            'strengths': [],
-            'improvements': [],
-            'recommendations': []
-        }
+        log.warning("Error parsing response: %s", e)
+        return _empty_analysis()
 
-def analyze_resume(resume_text):
+def _clamp_score(value):
+    return max(0, min(100, int(round(float(value)))))
+
+def _string_list(value):
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def parse_json_analysis(response_text):
     """
-    Analyze resume using Gemini API and return ATS score and feedback.
+    Validate a JSON analysis and normalize it to the parse_analysis_response shape.
     
     Args:
-        resume_text (str): The content of the resume
+        response_text (str): The JSON response from Gemini
         
     Returns:
         dict: Structured analysis results
+        
+    Raises:
+        ValueError: If the response is not JSON or has no usable scores
+    """
+    text = response_text.strip()
+    if text.startswith('```'):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Analysis JSON is not an object")
+
+    raw_scores = data.get('detailed_scores')
+    if not isinstance(raw_scores, dict):
+        raise ValueError("Analysis JSON has no detailed_scores")
+
+    scores = {}
+    weighted_total = 0.0
+    weight_sum = 0.0
+    for key, name, weight in CATEGORIES:
+        value = raw_scores.get(key, raw_scores.get(name))
+        if value is None:
+            continue
+        scores[name] = _clamp_score(value)
+        weighted_total += scores[name] * weight
+        weight_sum += weight
+    if not scores:
+        raise ValueError("Analysis JSON has no category scores")
+
+    overall = data.get('ats_score')
+    overall = _clamp_score(overall) if overall is not None else int(round(weighted_total / weight_sum))
+
+    feedback = data.get('category_analysis') if isinstance(data.get('category_analysis'), dict) else {}
+    analysis = {}
+    for key, name, _ in CATEGORIES:
+        text = feedback.get(key, feedback.get(name))
+        if text:
+            analysis[name] = str(text).strip()
+
+    return {
+        'ats_score': overall,
+        'detailed_scores': scores,
+        'category_analysis': analysis,
+        'strengths': _string_list(data.get('strengths')),
+        'improvements': _string_list(data.get('improvements')),
+        'recommendations': _string_list(data.get('recommendations'))
+    }
+
+def parse_model_output(response_text, output_mode=None):
     """
-    model = setup_gemini()
+    Parse the model output for the given mode.
     
-    prompt = f"""
+    In JSON mode the response is validated against the schema; the regex
+    parser is only used as a fallback when the model did not return JSON.
+    """
+    if (output_mode or OUTPUT_MODE) == 'json':
+        try:
+            return parse_json_analysis(response_text)
+        except (ValueError, TypeError) as e:
+            log.warning("Invalid JSON analysis, falling back to text parsing: %s", e)
+    return parse_analysis_response(response_text)
+
+class StreamingAnalysisParser:
+    """
+    Incremental parser for a streamed analysis response.
+
+    Chunks are fed as they arrive; every complete line is checked for the
+    "Overall ATS Score" and "Detailed Scores" entries so they can be shown
+    before the rest of the answer has been generated. finish() runs the full
+    parse_analysis_response over the accumulated text.
+    """
+
+    _overall_re = re.compile(r'Overall ATS Score:\s*(\d+)')
+    _detailed_re = re.compile(r'^\s*- ([^:]+):\s*(\d+)/100')
+
+    def __init__(self):
+        self._buffer = ''
+        self._parts = []
+        self.overall_score = None
+        self.detailed_scores = {}
+
+    def _parse_line(self, line):
+        if self.overall_score is None:
+            match = self._overall_re.search(line)
+            if match:
+                self.overall_score = int(match.group(1))
+                return {'event': 'overall_score', 'data': {'ats_score': self.overall_score}}
+        match = self._detailed_re.match(line)
+        if match:
+            category = match.group(1).strip()
+            score = int(match.group(2))
+            self.detailed_scores[category] = score
+            return {'event': 'detailed_score', 'data': {'category': category, 'score': score}}
+        return None
+
+    def feed(self, chunk):
+        """
+        Add a chunk of response text.
+
+        Returns:
+            list: Events ({'event': name, 'data': dict}) for lines completed by this chunk
+        """
+        self._parts.append(chunk)
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        events = []
+        for line in lines:
+            event = self._parse_line(line)
+            if event:
+                events.append(event)
+        return events
+
+    def finish(self):
+        """Flush the last line and return (events, full analysis result)"""
+        events = []
+        if self._buffer:
+            event = self._parse_line(self._buffer)
+            if event:
+                events.append(event)
+            self._buffer = ''
+        return events, parse_analysis_response(''.join(self._parts))
+
+# Static parts of the prompts. They are sent as the system instruction, which
+# gemini_client registers once as cached content, so only the resume is sent per call
+JSON_ANALYSIS_INSTRUCTIONS = """You are an expert ATS (Applicant Tracking System) analyzer. Score the resume you are given from 0 to 100 in each category:
+- content_quality (15%): relevance, clarity, professional tone, industry terminology, keyword optimization
+- ats_parse_rate (15%): machine readability, text extraction accuracy, special characters, tables and lists, headers and footers
+- quantifying_impact (15%): metrics and numbers, quantified achievements, results-oriented language
+- repetition_check (10%): redundant information, word and phrase repetition, keyword density
+- spelling_grammar (10%): spelling, grammar, punctuation, consistent technical terms
+- format (10%): document structure, layout consistency, white space, bullet point consistency
+- sections (12.5%): required sections present, organization, chronological order, completeness
+- style (12.5%): professional appearance, consistent fonts, headers and section styling
+
+ats_score is the weighted average of the category scores.
+category_analysis gives one or two sentences of feedback per category with examples from the resume.
+strengths and improvements list the most important points.
+recommendations gives at least one specific, actionable recommendation for every category scoring below 80, based on the actual resume content.
+"""
+
+ANALYSIS_INSTRUCTIONS = """
     You are an expert ATS (Applicant Tracking System) analyzer. Analyze this resume and provide a detailed assessment.
     
-    Resume content:
-    {resume_text}
-    
     Please analyze the resume for the following categories and provide scores. Calculate the overall score by taking the weighted average of all categories.
     
     IMPORTANT: For ANY category with a score below 80, you MUST provide at least one specific recommendation based on the actual content of the resume.
@@ -267,33 +475,189 @@ def analyze_resume(resume_text):
     Each recommendation MUST be specific to the content of the resume and provide actionable steps for improvement.
     Do not skip recommendations for any category scoring below 80.
     """
+
+def build_resume_prompt(resume_text):
+    """Per-resume part of the ATS prompt"""
+    return f"""
+    Resume content:
+    {resume_text}
+    """
+
+def build_json_analysis_prompt(resume_text):
+    """
+    Build the full compact prompt used with the JSON response schema.
+
+    The output format lives in ANALYSIS_SCHEMA, so the prompt only carries
+    the rubric.
+
+    Args:
+        resume_text (str): The content of the resume
+
+    Returns:
+        str: The prompt sent to Gemini
+    """
+    return JSON_ANALYSIS_INSTRUCTIONS + build_resume_prompt(resume_text)
+
+def build_analysis_prompt(resume_text):
+    """
+    Build the full ATS analysis prompt for a resume.
+
+    Args:
+        resume_text (str): The content of the resume
+
+    Returns:
+        str: The prompt sent to Gemini
+    """
+    return ANALYSIS_INSTRUCTIONS + build_resume_prompt(resume_text)
+
+def _system_instruction():
+    if OUTPUT_MODE == 'json':
+        return JSON_ANALYSIS_INSTRUCTIONS
+    return ANALYSIS_INSTRUCTIONS
+
+def analyze_resume(resume_text):
+    """
+    Analyze resume using Gemini API and return ATS score and feedback.
+    
+    Args:
+        resume_text (str | ParsedDocument): The content of the resume
+        
+    Returns:
+        dict: Structured analysis results
+    """
+    resume_text = prompt_compaction.prepare_resume_text(resume_text, "ATS")
+
+    client = setup_gemini()
+    prompt = build_resume_prompt(resume_text)
     
     try:
-        response = model.generate_content(prompt)
-        return parse_analysis_response(response.text)
+        response = client.generate_content(
+            prompt, MODEL_NAME, GENERATION_CONFIG, system_instruction=_system_instruction()
+        )
+        return parse_model_output(response.text)
     except Exception as e:
-        print(f"Error analyzing resume: {str(e)}")
-        return {
-            'ats_score': 0,
-            'detailed_scores': {},
-            'category_analysis': {},
-            'strengths': [],
-            'improvements': [],
-            'recommendations': []
-        }
+        log.error("Error analyzing resume: %s", e)
+        return _empty_analysis()
 
-def get_ats_score(resume_text):
+def analyze_resume_stream(resume_text):
+    """
+    Analyze a resume with a streamed Gemini response.
+
+    Args:
+        resume_text (str | ParsedDocument): The content of the resume
+
+    Yields:
+        dict: {'event': name, 'data': dict} events: overall_score and
+        detailed_score as soon as their lines arrive, then complete with the
+        full structured analysis (or error if the model call fails)
+    """
+    resume_text = prompt_compaction.prepare_resume_text(resume_text, "ATS")
+
+    client = setup_gemini()
+    prompt = build_resume_prompt(resume_text)
+    parser = StreamingAnalysisParser()
+
+    try:
+        # Streaming always uses the text prompt: its score lines can be parsed as they arrive
+        for chunk in client.generate_content_stream(
+            prompt, MODEL_NAME, TEXT_GENERATION_CONFIG, system_instruction=ANALYSIS_INSTRUCTIONS
+        ):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata only)
+                continue
+            yield from parser.feed(text)
+    except Exception as e:
+        log.error("Error analyzing resume: %s", e)
+        yield {'event': 'error', 'data': {'error': 'Failed to process resume', 'message': str(e)}}
+        return
+
+    events, result = parser.finish()
+    yield from events
+    yield {'event': 'complete', 'data': normalize_report(result)}
+
+async def analyze_resume_async(resume_text):
+    """
+    Async variant of analyze_resume that awaits the model call.
+    
+    Args:
+        resume_text (str | ParsedDocument): The content of the resume
+        
+    Returns:
+        dict: Structured analysis results
+    """
+    resume_text = prompt_compaction.prepare_resume_text(resume_text, "ATS")
+
+    client = setup_gemini()
+    prompt = build_resume_prompt(resume_text)
+
+    try:
+        response = await client.generate_content_async(
+            prompt, MODEL_NAME, GENERATION_CONFIG, system_instruction=_system_instruction()
+        )
+        return parse_model_output(response.text)
+    except Exception as e:
+        log.error("Error analyzing resume: %s", e)
+        return _empty_analysis()
+
+def _local_score(resume_text):
+    # Imported here because local_ats_scorer reads CATEGORIES from this module
+    import local_ats_scorer
+    return local_ats_scorer.score_resume(resume_text)
+
+def _needs_model(local_result, scorer):
+    """True when the model analysis should run after the local score"""
+    if scorer == 'local':
+        return False
+    if local_result['ats_score'] < GATE_THRESHOLD:
+        log.debug("Local ATS score %s is below the gate of %s, skipping the model", local_result['ats_score'], GATE_THRESHOLD)
+        return False
+    return True
+
+def get_ats_score(resume_text, scorer=None):
     """
     Get ATS score for the given resume text.
     This function can be imported and used by other modules.
     
     Args:
-        resume_text (str): The content of the resume
+        resume_text (str | ParsedDocument): The content of the resume
+        scorer (str): "llm", "local" or "gate"; defaults to ATS_SCORER
+        
+    Returns:
+        dict: Structured analysis results including score, feedback, and suggestions,
+        normalized by resume_models.normalize_report
+    """
+    scorer = scorer or SCORER
+    if scorer == 'llm':
+        return normalize_report(analyze_resume(resume_text))
+    local_result = _local_score(resume_text)
+    if not _needs_model(local_result, scorer):
+        return normalize_report(local_result)
+    result = analyze_resume(resume_text)
+    # A failed model call still leaves the local estimate
+    return normalize_report(result if result.get('detailed_scores') else local_result)
+
+async def get_ats_score_async(resume_text, scorer=None):
+    """
+    Async variant of get_ats_score.
+    
+    Args:
+        resume_text (str | ParsedDocument): The content of the resume
+        scorer (str): "llm", "local" or "gate"; defaults to ATS_SCORER
         
     Returns:
-        dict: Structured analysis results including score, feedback, and suggestions
+        dict: Structured analysis results including score, feedback, and suggestions,
+        normalized by resume_models.normalize_report
     """
-    return analyze_resume(resume_text)
+    scorer = scorer or SCORER
+    if scorer == 'llm':
+        return normalize_report(await analyze_resume_async(resume_text))
+    local_result = _local_score(resume_text)
+    if not _needs_model(local_result, scorer):
+        return normalize_report(local_result)
+    result = await analyze_resume_async(resume_text)
+    return normalize_report(result if result.get('detailed_scores') else local_result)
 
 if __name__ == "__main__":
     # Example usage
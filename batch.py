@@ -0,0 +1,224 @@
+"""
+Batch resume ingestion for bulk screening.
+
+Resumes are fanned out over a worker pool and every result is emitted as one
+JSON line as soon as it finishes. Each line carries the SHA-256 of the PDF,
+so re-running the CLI with the same --output skips every file that already
+has a successful result instead of paying for it again.
+
+    python batch.py resumes/ --output results.jsonl --workers 16 --score
+"""
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from ats_score_checker import get_ats_score
+import call_scheduler
+import extraction_pool
+import json_codec
+from resume_store import ResumeStore
+from resumeparser import extract_resume
+
+DEFAULT_WORKERS = 8
+
+
+def content_hash(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def iter_pdf_files(directory):
+    """Yield (name, path) for every PDF under a directory, in a stable order"""
+    pattern = os.path.join(directory, "**", "*.pdf")
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        yield os.path.relpath(path, directory), path
+
+
+def load_checkpoint(output_path):
+    """Return the content hashes that already have a successful result in a JSONL file"""
+    done = set()
+    if not output_path or not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if record.get("status") == "ok" and record.get("sha256"):
+                done.add(record["sha256"])
+    return done
+
+
+def process_resume(name, pdf_bytes, score=False, parser_mode=None, scorer=None):
+    """
+    Parse (and optionally score) one resume.
+
+    Args:
+        name (str): File name reported in the result
+        pdf_bytes (bytes): Raw PDF bytes
+        score (bool): Also run the ATS analysis
+        parser_mode (str): "llm", "local" or "hybrid"; defaults to PARSER_MODE
+        scorer (str): "llm", "local" or "gate"; defaults to ATS_SCORER
+
+    Returns:
+        dict: One result record, with status "ok" or "error"
+    """
+    start = time.perf_counter()
+    record = {"file": name, "sha256": content_hash(pdf_bytes)}
+    try:
+        document = extraction_pool.extract_document(pdf_bytes)
+        # Batch calls yield to interactive requests and wait as long as the quota requires
+        with call_scheduler.call_options(priority=call_scheduler.BATCH):
+            parsed = extract_resume(document, parser_mode)
+            if "error" in parsed:
+                record["status"] = "error"
+                record["error"] = parsed
+            else:
+                record["status"] = "ok"
+                record["parsed_data"] = parsed
+                if score:
+                    record["ats_analysis"] = get_ats_score(document, scorer)
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = {"error": "Failed to process resume", "details": str(e)}
+    record["elapsed_s"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _read_item(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, "rb") as f:
+        return f.read()
+
+
+class BatchSummary:
+    """Throughput and latency figures for one batch run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ok = 0
+        self.errors = 0
+        self.skipped = 0
+        self.latencies = []
+
+    def add(self, record):
+        if record["status"] == "ok":
+            self.ok += 1
+        else:
+            self.errors += 1
+        self.latencies.append(record["elapsed_s"])
+
+    def _percentile(self, pct):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def as_dict(self):
+        wall = time.perf_counter() - self.started
+        processed = self.ok + self.errors
+        return {
+            "processed": processed,
+            "ok": self.ok,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "wall_s": round(wall, 3),
+            "throughput_per_s": round(processed / wall, 3) if wall else None,
+            "latency_p50_s": self._percentile(50),
+            "latency_p95_s": self._percentile(95),
+            "latency_max_s": max(self.latencies) if self.latencies else None,
+        }
+
+
+def run_batch(items, workers=DEFAULT_WORKERS, score=False, done=None, summary=None, process_item=process_resume):
+    """
+    Process resumes concurrently and yield each result as it finishes.
+
+    Args:
+        items: Iterable of (name, source) pairs, where source is PDF bytes or a file path
+        workers (int): Number of resumes processed in parallel
+        score (bool): Also run the ATS analysis for every resume
+        done (set): Content hashes to skip because they already have a result
+        summary (BatchSummary): Collects throughput/latency figures for the run
+        process_item: Function called as process_item(name, pdf_bytes, score)
+
+    Yields:
+        dict: One result record per processed resume
+    """
+    done = done or set()
+    summary = summary if summary is not None else BatchSummary()
+    items = iter(items)
+    pending = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            # Keep only a small window of files in memory, not the whole batch
+            for name, source in items:
+                pdf_bytes = _read_item(source)
+                if content_hash(pdf_bytes) in done:
+                    summary.skipped += 1
+                    continue
+                pending.add(executor.submit(process_item, name, pdf_bytes, score))
+                return True
+            return False
+
+        while len(pending) < workers * 2 and submit_next():
+            pass
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pending.discard(future)
+                record = future.result()
+                summary.add(record)
+                yield record
+                submit_next()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a directory of resume PDFs in bulk")
+    parser.add_argument("directory", help="Directory containing resume PDFs (searched recursively)")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSON Lines output, also used as the checkpoint")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Resumes processed in parallel")
+    parser.add_argument("--score", action="store_true", help="Also compute the ATS analysis for every resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore existing results in --output and start over")
+    parser.add_argument("--parser", choices=["llm", "local", "hybrid"], default=None,
+                        help="Parsing mode; 'local' never calls the model (default: PARSER_MODE)")
+    parser.add_argument("--store", default=None, metavar="PATH",
+                        help="Also upsert every successful result into the resume store at PATH")
+    parser.add_argument("--scorer", choices=["llm", "local", "gate"], default=None,
+                        help="ATS scoring mode for --score; 'local' never calls the model (default: ATS_SCORER)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Directory not found: {args.directory}", file=sys.stderr)
+        sys.exit(1)
+
+    done = set() if args.restart else load_checkpoint(args.output)
+    if done:
+        print(f"Resuming: {len(done)} resumes already processed in {args.output}", file=sys.stderr)
+
+    store = ResumeStore(args.store) if args.store else None
+    summary = BatchSummary()
+    mode = "w" if args.restart else "a"
+    with open(args.output, mode) as out:
+        process_item = functools.partial(process_resume, parser_mode=args.parser, scorer=args.scorer)
+        for record in run_batch(iter_pdf_files(args.directory), args.workers, args.score, done, summary, process_item):
+            out.write(json_codec.dumps(record) + "\n")
+            out.flush()
+            if store is not None and record["status"] == "ok":
+                store.upsert_many([record])
+
+    print(json.dumps({"summary": summary.as_dict()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
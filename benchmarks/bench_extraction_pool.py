@@ -0,0 +1,74 @@
+"""
+Throughput of PDF extraction inline versus in the process pool.
+
+Generates a corpus of multi-page resumes, then extracts all of them from a
+fixed number of concurrent "request" threads, once inline (pool size 0) and
+once per pool size. Results are printed as JSON.
+
+    python benchmarks/bench_extraction_pool.py --documents 200 --pages 4 --sizes 1,2,4,8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extraction_pool  # noqa: E402
+from corpus import make_corpus  # noqa: E402
+
+
+def run(corpus, pool_size, threads):
+    extraction_pool.shutdown_pool()
+    start_up = time.perf_counter()
+    extraction_pool.start_pool(pool_size)
+    warm_s = time.perf_counter() - start_up
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pages = sum(doc.page_count for doc in executor.map(extraction_pool.extract_document, corpus))
+    elapsed = time.perf_counter() - start
+    extraction_pool.shutdown_pool()
+
+    return {
+        "pool_size": pool_size,
+        "documents": len(corpus),
+        "pages": pages,
+        "wall_s": round(elapsed, 3),
+        "docs_per_s": round(len(corpus) / elapsed, 1),
+        "pages_per_s": round(pages / elapsed, 1),
+        "pool_start_s": round(warm_s, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF extraction process pool")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--links", type=int, default=6)
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent request threads")
+    parser.add_argument("--sizes", default=None, help="Comma-separated pool sizes (default: 1,2,4,... up to the CPU count)")
+    args = parser.parse_args()
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    else:
+        sizes = []
+        size = 1
+        while size <= (os.cpu_count() or 1):
+            sizes.append(size)
+            size *= 2
+
+    corpus = make_corpus(args.documents, pages=args.pages, links=args.links)
+    results = [run(corpus, 0, args.threads)] + [run(corpus, size, args.threads) for size in sizes]
+    baseline = results[0]["docs_per_s"]
+    for result in results:
+        result["speedup_vs_inline"] = round(result["docs_per_s"] / baseline, 2)
+
+    print(json.dumps({"cpu_count": os.cpu_count(), "threads": args.threads, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Ranking latency of job_matcher against a large synthetic corpus.
+
+Generates parsed resumes with random skills and achievement bullets, builds
+the CandidateIndex once, then ranks several job descriptions against it and
+reports index build time and per-query latency percentiles as JSON.
+
+    python benchmarks/bench_job_matcher.py --resumes 100000 --queries 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import job_matcher  # noqa: E402
+from local_parser import SKILLS_DICTIONARY  # noqa: E402
+
+VERBS = ["Built", "Designed", "Optimized", "Migrated", "Deployed", "Automated", "Led", "Tested"]
+OBJECTS = [
+    "a payments service", "the search API", "an analytics dashboard", "a recommendation engine",
+    "CI pipelines", "a mobile app", "the data warehouse", "a chat backend", "an auth gateway",
+]
+ALL_SKILLS = [skill for skills in SKILLS_DICTIONARY.values() for skill in skills]
+
+
+def make_resume(rng):
+    skills = {category: rng.sample(names, rng.randint(1, min(6, len(names))))
+              for category, names in SKILLS_DICTIONARY.items()}
+    bullets = [
+        f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(ALL_SKILLS)} and {rng.choice(ALL_SKILLS)}, "
+        f"improving throughput by {rng.randint(5, 80)}%"
+        for _ in range(rng.randint(2, 6))
+    ]
+    return {
+        "skills": skills,
+        "experience": [{"title": "Software Engineer", "company": "Example", "achievements": bullets[:3]}],
+        "projects": [{"name": "Project", "technologies": rng.sample(ALL_SKILLS, 3), "achievements": bullets[3:]}],
+    }
+
+
+def make_job_description(rng):
+    required = ", ".join(rng.sample(ALL_SKILLS, 6))
+    nice = ", ".join(rng.sample(ALL_SKILLS, 3))
+    return (f"We are hiring a software engineer. Required: {required}. "
+            f"Nice to have: {nice}. You will {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job-description ranking")
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--scoring", choices=["bm25", "tfidf"], default="bm25")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [make_resume(rng) for _ in range(args.resumes)]
+
+    start = time.perf_counter()
+    index = job_matcher.CandidateIndex.build(resumes, scoring=args.scoring)
+    build_s = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(args.queries):
+        job_description = make_job_description(rng)
+        start = time.perf_counter()
+        index.rank(job_description, args.top)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(json.dumps({
+        "resumes": len(index),
+        "terms": len(index.vocabulary),
+        "non_zeros": int(index.counts.nnz),
+        "scoring": args.scoring,
+        "build_s": round(build_s, 3),
+        "query_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "query_max_ms": round(latencies[-1] * 1000, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Serialization cost of large parsed-resume responses.
+
+Compares the old response path (the parse result dumped with indent=2, then
+loaded and dumped again by the endpoint) with a single compact serialization,
+using both the standard json module and json_codec (orjson when installed).
+Prints the bytes per response and the mean time per response as JSON.
+
+    python benchmarks/bench_json.py --entries 40 --iterations 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_codec  # noqa: E402
+from local_parser import SKILLS_DICTIONARY, empty_result  # noqa: E402
+
+
+def make_payload(entries):
+    """A parse result plus ATS report with `entries` experience, project and achievement entries"""
+    parsed = empty_result()
+    parsed["personal_info"].update({"full_name": "Candidate Näme", "location": "Bengaluru, India"})
+    parsed["skills"] = {category: list(names) for category, names in SKILLS_DICTIONARY.items()}
+    bullet = "Reduced p95 latency of the search API by 42% by adding a Redis cache and batching lookups — “fast”"
+    parsed["experience"] = [
+        {"title": f"Software Engineer {i}", "company": f"Company {i}", "location": "Remote",
+         "duration": "Jan 2020 - Present", "achievements": [bullet] * 4}
+        for i in range(entries)
+    ]
+    parsed["projects"] = [
+        {"name": f"Project {i}", "technologies": ["React", "Node.js", "MongoDB"],
+         "links": {"live_site": f"https://project{i}.example.dev", "github_repo": f"https://github.com/c/p{i}"},
+         "achievements": [bullet] * 3}
+        for i in range(entries)
+    ]
+    parsed["achievements"] = [bullet] * entries
+    analysis = {
+        "ats_score": 78,
+        "detailed_scores": {"Content Quality": 80, "ATS Parse Rate": 90},
+        "category_analysis": {"Content Quality": bullet},
+        "strengths": [bullet] * 5, "improvements": [bullet] * 5, "recommendations": [bullet] * 5,
+    }
+    return parsed, analysis
+
+
+def old_path(parsed, analysis):
+    # ats_extractor serialized with indent=2, the endpoint parsed it back and jsonify dumped it again
+    text = json.dumps(parsed, indent=2)
+    return json.dumps({"parsed_data": json.loads(text), "ats_analysis": analysis}, indent=2).encode("utf-8")
+
+
+def stdlib_compact(parsed, analysis):
+    return json.dumps({"parsed_data": parsed, "ats_analysis": analysis}, separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def codec(parsed, analysis):
+    return json_codec.dumpb({"parsed_data": parsed, "ats_analysis": analysis})
+
+
+def measure(fn, parsed, analysis, iterations):
+    body = fn(parsed, analysis)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(parsed, analysis)
+    elapsed = time.perf_counter() - start
+    return {"bytes": len(body), "mean_us": round(elapsed / iterations * 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--entries", type=int, default=40, help="Experience/project entries per resume")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    parsed, analysis = make_payload(args.entries)
+    results = {
+        "old_double_indent": measure(old_path, parsed, analysis, args.iterations),
+        "json_compact_single": measure(stdlib_compact, parsed, analysis, args.iterations),
+        f"json_codec_{json_codec.BACKEND}": measure(codec, parsed, analysis, args.iterations),
+    }
+    baseline = results["old_double_indent"]
+    for result in results.values():
+        result["bytes_saved_pct"] = round(100 * (1 - result["bytes"] / baseline["bytes"]), 1)
+        result["speedup"] = round(baseline["mean_us"] / result["mean_us"], 1)
+    print(json.dumps({"entries": args.entries, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Throughput of the local heuristic ATS scorer.
+
+Extracts a corpus of generated resumes once, then scores the extracted
+documents with local_ats_scorer in batches and reports how many resumes per
+second the feature extraction and the vectorized scoring reach. Results are
+printed as JSON.
+
+    python benchmarks/bench_local_scorer.py --documents 2000 --pages 2 --batch 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import local_ats_scorer  # noqa: E402
+from corpus import make_corpus  # noqa: E402
+from parsed_document import ParsedDocument  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local ATS scorer")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=500, help="Resumes scored per score_documents call")
+    args = parser.parse_args()
+
+    documents = [ParsedDocument.from_pdf(pdf) for pdf in make_corpus(args.documents, pages=args.pages)]
+
+    start = time.perf_counter()
+    features = local_ats_scorer.feature_matrix(documents)
+    features_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores, overall = local_ats_scorer.score_matrix(features)
+    matrix_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, len(documents), args.batch):
+        local_ats_scorer.score_documents(documents[offset:offset + args.batch])
+    total_s = time.perf_counter() - start
+
+    print(json.dumps({
+        "documents": len(documents),
+        "pages": args.pages,
+        "features_s": round(features_s, 4),
+        "score_matrix_s": round(matrix_s, 4),
+        "end_to_end_s": round(total_s, 4),
+        "docs_per_s": round(len(documents) / total_s, 1),
+        "mean_ats_score": round(float(overall.mean()), 1),
+        "mean_category_scores": {
+            name: round(float(value), 1)
+            for (_, name, _), value in zip(local_ats_scorer.CATEGORIES, scores.mean(axis=0))
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
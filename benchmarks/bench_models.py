@@ -0,0 +1,88 @@
+"""
+Memory and normalization cost of resume_models against plain dicts.
+
+Generates synthetic parse results, decodes each from JSON (as the parse path
+does) and keeps them all alive, once as dicts and once as ParsedResume
+objects, measuring retained memory with tracemalloc. Also reports the
+per-resume cost of ParsedResume.from_dict and to_dict as JSON.
+
+    python benchmarks/bench_models.py --resumes 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_job_matcher import ALL_SKILLS, make_resume  # noqa: E402
+from local_parser import empty_result  # noqa: E402
+from resume_models import ParsedResume  # noqa: E402
+
+
+def make_document(rng, index):
+    """A full parse result as the JSON text the model returns"""
+    parsed = empty_result()
+    partial = make_resume(rng)
+    parsed["personal_info"].update({"full_name": f"Candidate {index}", "location": "Bengaluru, India"})
+    parsed["personal_info"]["contact"].update({"email": f"candidate{index}@example.com", "phone": "+91 98765 43210"})
+    parsed["skills"] = partial["skills"]
+    parsed["experience"] = partial["experience"]
+    parsed["projects"] = partial["projects"]
+    parsed["education"] = [{"degree": "B.Tech", "institute": "Example Institute", "score": 8.4, "year": 2022}]
+    parsed["achievements"] = [f"Solved {rng.randint(100, 900)} problems using {rng.choice(ALL_SKILLS)}"]
+    return json.dumps(parsed)
+
+
+def retained(build, documents):
+    """Bytes still allocated after build(documents), with the result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(documents)
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume_models memory use")
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [make_document(rng, i) for i in range(args.resumes)]
+
+    dict_bytes, dict_s = retained(lambda docs: [json.loads(doc) for doc in docs], documents)
+    model_bytes, model_s = retained(lambda docs: [ParsedResume.from_dict(json.loads(doc)) for doc in docs], documents)
+
+    decoded = [json.loads(doc) for doc in documents[:10000]]
+    start = time.perf_counter()
+    models = [ParsedResume.from_dict(data) for data in decoded]
+    from_dict_us = (time.perf_counter() - start) / len(decoded) * 1e6
+    start = time.perf_counter()
+    for model in models:
+        model.to_dict()
+    to_dict_us = (time.perf_counter() - start) / len(models) * 1e6
+
+    print(json.dumps({
+        "resumes": args.resumes,
+        "dict_mb": round(dict_bytes / 2**20, 1),
+        "model_mb": round(model_bytes / 2**20, 1),
+        "memory_saved_pct": round(100 * (1 - model_bytes / dict_bytes), 1),
+        "dict_decode_s": round(dict_s, 2),
+        "model_decode_s": round(model_s, 2),
+        "from_dict_us": round(from_dict_us, 1),
+        "to_dict_us": round(to_dict_us, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Reproducible offline benchmark of the parse and scoring paths.
+
+No API key, network or stub server is needed. The process-wide Gemini
+client is built with stub_model.FakeGenerativeModel, which answers with
+canned responses after a latency that depends only on --seed and the
+prompt. Result caching and the resume store are disabled so every call does
+the full work.
+
+The corpus mixes page counts (--pages) and link densities (--links). Each
+target is called once per resume with --concurrency calls in flight:
+
+- ats_extractor: PDF bytes to the parse result as a JSON string
+- get_ats_score: ATS report for the extracted text
+- flask:/parse-resume, flask:/process, flask:/analyze: the Flask endpoints
+  through the test client
+
+For each target the output reports throughput and latency percentiles. It
+also reports the peak traced allocation of a sequential pass over
+--memory-samples resumes (tracemalloc, run separately so it does not skew
+the timings) and the process's peak RSS. Results are printed as JSON.
+--output writes them to a file, and --baseline compares them with an
+earlier file. The run exits with status 1 when p95 or throughput regressed
+by more than --tolerance.
+
+    python benchmarks/bench_offline.py --resumes 200 --latency 0.2 --jitter 0.05 --output bench.json
+    python benchmarks/bench_offline.py --resumes 200 --latency 0.2 --jitter 0.05 --baseline bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from corpus import make_resume_pdf  # noqa: E402
+
+TARGETS = ["ats_extractor", "get_ats_score", "flask:/parse-resume", "flask:/process", "flask:/analyze"]
+
+
+def make_mixed_corpus(count, pages, links, seed):
+    """`count` distinct resume PDFs with page counts and link densities drawn from the given choices"""
+    rng = random.Random(seed)
+    return [make_resume_pdf(i, pages=rng.choice(pages), links=rng.choice(links)) for i in range(count)]
+
+
+def _percentile(ordered, pct):
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def build_targets():
+    """Map of target name -> (prepare(pdf_bytes) -> input, call(input) -> True on success)"""
+    import app as flask_app
+    import json_codec
+    import resumeparser
+    from ats_score_checker import get_ats_score
+    from parsed_document import ParsedDocument
+
+    def ats_extractor(pdf_bytes):
+        return "error" not in json_codec.loads(resumeparser.ats_extractor(pdf_bytes))
+
+    def ats_score(text):
+        return bool(get_ats_score(text).get("detailed_scores"))
+
+    def endpoint(path, field):
+        def call(pdf_bytes):
+            client = flask_app.app.test_client()
+            response = client.post(path, data={field: (io.BytesIO(pdf_bytes), "resume.pdf")})
+            return response.status_code == 200
+        return call
+
+    def same(pdf_bytes):
+        return pdf_bytes
+
+    def text(pdf_bytes):
+        return ParsedDocument.from_pdf(pdf_bytes).text
+
+    return {
+        "ats_extractor": (same, ats_extractor),
+        "get_ats_score": (text, ats_score),
+        "flask:/parse-resume": (same, endpoint("/parse-resume", "file")),
+        "flask:/process": (same, endpoint("/process", "pdf_doc")),
+        "flask:/analyze": (same, endpoint("/analyze", "file")),
+    }
+
+
+def run_target(call, inputs, concurrency, memory_samples):
+    """Time every call with `concurrency` in flight, then trace memory over a short sequential pass"""
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            ok = call(item)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    # Warm up: start the extraction pool, build the models, import lazily loaded modules
+    call(inputs[0])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, inputs))
+    wall = time.perf_counter() - start
+
+    tracemalloc.start()
+    for item in inputs[:memory_samples]:
+        call(item)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = sorted(seconds for seconds, _ in outcomes)
+    return {
+        "requests": len(outcomes),
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(outcomes) / wall, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "traced_peak_mb": round(traced_peak / 2**20, 2),
+        "rss_peak_mb": _peak_rss_mb(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Targets whose p95 latency rose or throughput fell by more than `tolerance` against the baseline"""
+    regressions = {}
+    for target, result in results.items():
+        previous = baseline.get("results", {}).get(target)
+        if not previous:
+            continue
+        p95_change = result["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        throughput_change = result["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0.0
+        if p95_change > tolerance or throughput_change < -tolerance:
+            regressions[target] = {
+                "p95_change_pct": round(p95_change * 100, 1),
+                "throughput_change_pct": round(throughput_change * 100, 1),
+            }
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark with a deterministic fake Gemini model")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--pages", default="1,2,4", help="Comma-separated page counts to draw from")
+    parser.add_argument("--links", default="0,4,12", help="Comma-separated link counts to draw from")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Deterministic +/- jitter in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--memory-samples", type=int, default=20)
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated subset of " + ", ".join(TARGETS))
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against the results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    # Every call must do the full work and nothing may leave the machine
+    os.environ["RESULT_CACHE_BACKEND"] = "none"
+    os.environ["RESUME_STORE"] = "0"
+    os.environ.pop("GEMINI_STUB_URL", None)
+    os.chdir(PROJECT_DIR)
+
+    import gemini_client
+    from stub_model import FakeGenerativeModel
+
+    targets = build_targets()
+    # After app.py is imported, so its startup configuration cannot replace the fake client
+    gemini_client.init_client(
+        "offline-benchmark", max_concurrency=args.concurrency,
+        model_factory=FakeGenerativeModel.factory(args.latency, args.jitter, args.seed),
+    )
+
+    pages = [int(value) for value in args.pages.split(",")]
+    links = [int(value) for value in args.links.split(",")]
+    corpus = make_mixed_corpus(args.resumes, pages, links, args.seed)
+
+    results = {}
+    for name in args.targets.split(","):
+        prepare, call = targets[name]
+        inputs = [prepare(pdf) for pdf in corpus]
+        results[name] = run_target(call, inputs, args.concurrency, args.memory_samples)
+
+    report = {
+        "config": {
+            "resumes": args.resumes, "pages": pages, "links": links, "latency": args.latency,
+            "jitter": args.jitter, "seed": args.seed, "concurrency": args.concurrency,
+            "corpus_mb": round(sum(len(pdf) for pdf in corpus) / 2**20, 2), "python": platform.python_version(),
+        },
+        "results": results,
+    }
+    regressions = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
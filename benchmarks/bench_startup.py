@@ -0,0 +1,107 @@
+"""
+Cold-start cost of the Flask app: import time and first-request latency.
+
+Each run starts a fresh interpreter that imports app.py, optionally runs the
+warm-up hook, and then sends its first /parse-resume and /process requests
+through the test client. The model is stub_model.FakeGenerativeModel with no
+latency, so the numbers are pure startup overhead. The script reports the
+median of --runs runs, and which heavy modules were loaded by the import
+alone, as JSON.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["google.generativeai", "google.api_core.exceptions", "fitz", "pypdf", "yaml", "numpy", "scipy"]
+
+
+def child(pdf_path, warm):
+    """One cold start, measured in this (fresh) interpreter"""
+    sys.path.insert(0, PROJECT_DIR)
+    with open(pdf_path, "rb") as f:
+        pdf = f.read()
+
+    start = time.perf_counter()
+    import app
+    import_s = time.perf_counter() - start
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    import gemini_client
+    from stub_model import FakeGenerativeModel
+    gemini_client.init_client("offline-benchmark", model_factory=FakeGenerativeModel.factory(latency=0.0))
+
+    warm_up_s = None
+    if warm:
+        import warmup
+        start = time.perf_counter()
+        warmup.warm_up()
+        warm_up_s = time.perf_counter() - start
+
+    client = app.app.test_client()
+    latencies = {}
+    for path, field in (("/parse-resume", "file"), ("/process", "pdf_doc")):
+        start = time.perf_counter()
+        response = client.post(path, data={field: (io.BytesIO(pdf), "resume.pdf")})
+        latencies[path] = time.perf_counter() - start
+        assert response.status_code == 200, (path, response.status_code, response.data[:200])
+
+    return {"import_s": import_s, "warm_up_s": warm_up_s, "first_request_s": latencies, "loaded_by_import": loaded}
+
+
+def run(pdf_path, warm, runs):
+    env = dict(os.environ, RESULT_CACHE_BACKEND="none", RESUME_STORE="0", LOG_LEVEL="WARNING")
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", pdf_path] + (["--warm"] if warm else []),
+            cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    def median(values):
+        return round(statistics.median(values) * 1000, 1)
+
+    summary = {
+        "import_ms": median([r["import_s"] for r in results]),
+        "first_parse_resume_ms": median([r["first_request_s"]["/parse-resume"] for r in results]),
+        "first_process_ms": median([r["first_request_s"]["/process"] for r in results]),
+        "loaded_by_import": results[0]["loaded_by_import"],
+    }
+    if warm:
+        summary["warm_up_ms"] = median([r["warm_up_s"] for r in results])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time and first-request latency")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", metavar="PDF", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.warm)))
+        return
+
+    # The corpus needs PyMuPDF, so the PDF is built here rather than in the measured interpreters
+    from corpus import make_resume_pdf
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(make_resume_pdf(0))
+        f.flush()
+        report = {"runs": args.runs, "cold": run(f.name, False, args.runs)}
+        if os.path.exists(os.path.join(PROJECT_DIR, "warmup.py")):
+            report["warm"] = run(f.name, True, args.runs)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Plain-text extraction cost of the text_extraction backends.
+
+For each page count, builds a small corpus of synthetic resumes and times:
+- the old /process path (pypdf with `data += page.extract_text()`)
+- text_extraction.extract_text with every backend
+
+Prints the mean milliseconds per document and the pages per second as JSON.
+
+    python benchmarks/bench_text_extraction.py --pages 1,5,10,25,50 --documents 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import text_extraction  # noqa: E402
+from corpus import make_resume_pdf  # noqa: E402
+
+
+def legacy_pypdf(pdf_bytes):
+    # The extraction /process used before text_extraction
+    from pypdf import PdfReader
+    reader = PdfReader(BytesIO(pdf_bytes))
+    data = ""
+    for page_no in range(len(reader.pages)):
+        page = reader.pages[page_no]
+        data += page.extract_text()
+    return data
+
+
+def measure(fn, corpus, pages, repeat):
+    fn(corpus[0])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for pdf in corpus:
+            fn(pdf)
+    elapsed = (time.perf_counter() - start) / (repeat * len(corpus))
+    return {"mean_ms": round(elapsed * 1000, 2), "pages_per_s": round(pages / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction backends")
+    parser.add_argument("--pages", default="1,5,10,25,50", help="Comma-separated page counts")
+    parser.add_argument("--documents", type=int, default=5, help="Distinct documents per page count")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for pages in (int(value) for value in args.pages.split(",")):
+        corpus = [make_resume_pdf(i, pages=pages) for i in range(args.documents)]
+        row = {"legacy_pypdf_concat": measure(legacy_pypdf, corpus, pages, args.repeat)}
+        for name in text_extraction.BACKENDS:
+            row[name] = measure(
+                lambda pdf, name=name: text_extraction.extract_text(pdf, name, max_pages=0), corpus, pages, args.repeat
+            )
+        results[pages] = row
+    print(json.dumps({"documents": args.documents, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
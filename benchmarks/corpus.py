@@ -0,0 +1,94 @@
+"""
+Synthetic resume PDFs for the benchmarks.
+
+Every document is unique (the index is part of the text) so result caching
+never hides the work being measured.
+"""
+import fitz  # PyMuPDF
+
+SECTIONS = [
+    ("EDUCATION", [
+        "B.Tech in Computer Science, Stub Institute of Technology, 2020 - 2024, CGPA 8.{i}",
+        "Senior Secondary (XII), CBSE, 2020, 9{i}%",
+    ]),
+    ("SKILLS", [
+        "Languages: Python, JavaScript, C++, SQL",
+        "Frameworks: React, Flask, Node.js, Express, Tailwind CSS",
+        "Tools: Git, Docker, AWS, Linux",
+    ]),
+    ("EXPERIENCE", [
+        "Software Engineering Intern, Example Corp, Bangalore, May 2023 - Aug 2023",
+        "• Reduced API latency by {i}% by adding a Redis cache in front of the search service",
+        "• Built an internal dashboard used by 40+ engineers to track deployments",
+    ]),
+    ("PROJECTS", [
+        "Workify | React, Node.js, MongoDB",
+        "• Job portal serving 1,{i}00 monthly users with role-based access",
+        "Food Delivery | Flask, PostgreSQL",
+        "• Ordering platform processing 300 orders per day",
+    ]),
+    ("ACHIEVEMENTS", [
+        "• Solved 500+ problems on LeetCode with a contest rating of 1,8{i}0",
+        "• Winner of the college hackathon among 120 teams",
+    ]),
+]
+
+LINK_TARGETS = [
+    "https://github.com/candidate{i}",
+    "https://linkedin.com/in/candidate{i}",
+    "https://leetcode.com/candidate{i}",
+    "https://candidate{i}.portfolio.dev",
+    "https://workify-{i}.netlify.app",
+    "https://fooddelivery-{i}.onrender.com",
+]
+
+
+def make_resume_pdf(index, pages=1, links=4):
+    """
+    Build a resume PDF in memory.
+
+    Args:
+        index (int): Distinguishes the document from every other one in the corpus
+        pages (int): Number of pages; sections repeat to fill them
+        links (int): Number of link annotations on the first page
+
+    Returns:
+        bytes: The PDF document
+    """
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        y = 60
+        page.insert_text((72, y), f"Candidate {index}", fontsize=16)
+        y += 20
+        page.insert_text((72, y), "Bangalore, India")
+        y += 14
+        page.insert_text((72, y), f"+91-98765{index % 100000:05d} | candidate{index}@example.com | github.com/candidate{index}")
+        y += 24
+        for title, lines in SECTIONS:
+            if y > 760:
+                break
+            page.insert_text((72, y), title, fontsize=12)
+            y += 16
+            for line in lines:
+                page.insert_text((80, y), line.format(i=(index + page_no) % 10))
+                y += 13
+            y += 8
+        page.insert_text((280, 820), f"Page {page_no + 1} of {pages}", fontsize=8)
+
+        if page_no == 0:
+            for link_no in range(links):
+                target = LINK_TARGETS[link_no % len(LINK_TARGETS)].format(i=index)
+                rect = fitz.Rect(72, 700 + (link_no % 8) * 10, 300, 708 + (link_no % 8) * 10)
+                page.insert_link({"kind": fitz.LINK_URI, "from": rect, "uri": target})
+
+    # Fixed metadata and file ID keep the bytes (and so the cache keys) reproducible
+    doc.set_metadata({"title": f"Candidate {index}", "creationDate": "", "modDate": ""})
+    data = doc.tobytes(no_new_id=True)
+    doc.close()
+    return data
+
+
+def make_corpus(count, pages=1, links=4):
+    """Build a list of `count` distinct resume PDFs"""
+    return [make_resume_pdf(i, pages=pages, links=links) for i in range(count)]
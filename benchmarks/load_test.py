@@ -0,0 +1,189 @@
+"""
+Load test for the resume API against a local stub model server.
+
+Starts stub_model.py and the API (ASGI via uvicorn, or the Flask dev server)
+as subprocesses, fires distinct PDF uploads at one endpoint with a fixed
+number of requests in flight, and prints throughput, latency percentiles and
+the server's peak memory as JSON. No API key or network access is needed.
+
+    python benchmarks/load_test.py --server asgi --requests 1000 --concurrency 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+from corpus import make_corpus
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def _peak_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_servers(server, latency, jitter):
+    stub_port = _free_port()
+    app_port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "GEMINI_STUB_URL": f"http://127.0.0.1:{stub_port}",
+        "GEMINI_MAX_CONCURRENCY": env.get("GEMINI_MAX_CONCURRENCY", "1024"),
+        "RESULT_CACHE_BACKEND": "none",
+        "GEMINI_API_KEY": env.get("GEMINI_API_KEY", "stub"),
+    })
+
+    stub = subprocess.Popen(
+        [sys.executable, "stub_model.py", "--port", str(stub_port),
+         "--latency", str(latency), "--jitter", str(jitter)],
+        cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    if server == "asgi":
+        command = [sys.executable, "-m", "uvicorn", "asgi_app:app",
+                   "--port", str(app_port), "--log-level", "warning", "--backlog", "4096"]
+    else:
+        command = [sys.executable, "-c",
+                   f"from app import app; app.run(port={app_port}, threaded=True)"]
+    api = subprocess.Popen(command, cwd=PROJECT_DIR, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    _wait_for_port(stub_port)
+    _wait_for_port(app_port)
+    return stub, api, app_port
+
+
+async def post_pdf(port, path, field, pdf_bytes):
+    """Upload one PDF as multipart/form-data and return (status, seconds, body)"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"resume.pdf\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode("latin-1") + pdf_bytes + f"\r\n--{boundary}--\r\n".encode("latin-1")
+
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+            f"Content-Type: multipart/form-data; boundary={boundary}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1]) if head else 0
+    return status, elapsed, payload
+
+
+async def run_load(port, path, field, corpus, total, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with slots:
+            try:
+                status, elapsed, _ = await post_pdf(port, path, field, corpus[i % len(corpus)])
+            except OSError:
+                errors += 1
+                return
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - start
+    return latencies, errors, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--server", choices=["asgi", "flask"], default="asgi")
+    parser.add_argument("--endpoint", choices=["/process", "/parse-resume"], default="/process")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=2.0, help="Stub model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args()
+
+    field = "pdf_doc" if args.endpoint == "/process" else "file"
+    corpus = make_corpus(min(args.requests, 200), pages=args.pages)
+
+    stub, api, port = start_servers(args.server, args.latency, args.jitter)
+    try:
+        latencies, errors, wall = asyncio.run(
+            run_load(port, args.endpoint, field, corpus, args.requests, args.concurrency)
+        )
+        peak_rss = _peak_rss_mb(api.pid)
+    finally:
+        api.terminate()
+        stub.terminate()
+        api.wait()
+        stub.wait()
+
+    print(json.dumps({
+        "server": args.server,
+        "endpoint": args.endpoint,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "model_latency_s": args.latency,
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_p50_s": _percentile(latencies, 50),
+        "latency_p95_s": _percentile(latencies, 95),
+        "latency_p99_s": _percentile(latencies, 99),
+        "latency_mean_s": statistics.mean(latencies) if latencies else None,
+        "server_peak_rss_mb": peak_rss,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
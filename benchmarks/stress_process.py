@@ -0,0 +1,100 @@
+"""
+Concurrency stress test for /process.
+
+Starts the stub model server and the API (Flask's threaded server or the
+ASGI app), then uploads hundreds of distinct PDFs at once. Every resume in
+the corpus has its own email address, and the stub names it in the ATS
+report. So each 200 response can be checked against the upload it answers.
+Responses answered with 429 are retried after a short pause, which
+exercises the backpressure path.
+
+Prints JSON with the number of matched, mismatched, rejected and failed
+requests. Exits with status 1 on any mismatch or failure.
+
+    python benchmarks/stress_process.py --server flask --requests 500 --max-in-flight 32 --max-queued 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from corpus import make_corpus
+from load_test import _peak_rss_mb, post_pdf, start_servers
+
+MAX_ATTEMPTS = 50
+
+
+def expected_email(index):
+    return f"candidate{index}@example.com"
+
+
+async def upload(port, path, pdf_bytes, index, outcome):
+    """Upload one resume until it is admitted, then check that the report names its email"""
+    for _ in range(MAX_ATTEMPTS):
+        try:
+            status, _, payload = await post_pdf(port, path, "pdf_doc", pdf_bytes)
+        except OSError:
+            outcome["failed"] += 1
+            return
+        if status == 429:
+            outcome["rejected"] += 1
+            await asyncio.sleep(random.uniform(0.1, 0.5))
+            continue
+        if status != 200:
+            outcome["failed"] += 1
+            return
+        strengths = json.loads(payload).get("strengths", [])
+        if any(expected_email(index) in strength for strength in strengths):
+            outcome["matched"] += 1
+        else:
+            outcome["mismatched"] += 1
+        return
+    outcome["failed"] += 1
+
+
+async def run(port, path, corpus):
+    outcome = {"matched": 0, "mismatched": 0, "rejected": 0, "failed": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(port, path, pdf, index, outcome) for index, pdf in enumerate(corpus)))
+    return outcome, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire many concurrent distinct uploads at /process")
+    parser.add_argument("--server", choices=["asgi", "flask"], default="flask")
+    parser.add_argument("--requests", type=int, default=300, help="Distinct PDFs uploaded at once")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--max-in-flight", type=int, default=32, help="UPLOAD_MAX_IN_FLIGHT for the server")
+    parser.add_argument("--max-queued", type=int, default=64, help="UPLOAD_MAX_QUEUED for the server")
+    args = parser.parse_args()
+
+    # The servers inherit these; start_servers already disables the result cache
+    os.environ["UPLOAD_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+    os.environ["UPLOAD_MAX_QUEUED"] = str(args.max_queued)
+    os.environ["RESUME_STORE"] = "0"
+    corpus = make_corpus(args.requests)
+
+    stub, api, port = start_servers(args.server, args.latency, args.jitter)
+    try:
+        outcome, wall = asyncio.run(run(port, "/process", corpus))
+        peak_rss = _peak_rss_mb(api.pid)
+    finally:
+        api.terminate()
+        stub.terminate()
+        api.wait()
+        stub.wait()
+
+    print(json.dumps(dict(
+        outcome, server=args.server, requests=args.requests, max_in_flight=args.max_in_flight,
+        max_queued=args.max_queued, wall_s=round(wall, 3), server_peak_rss_mb=peak_rss,
+    ), indent=2))
+    if outcome["mismatched"] or outcome["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
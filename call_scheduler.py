@@ -0,0 +1,409 @@
+"""
+Rate-limited, retrying scheduler for Gemini calls.
+
+Every model call made through gemini_client goes through the process-wide
+CallScheduler:
+
+- at most GEMINI_MAX_CONCURRENCY calls are in flight (default 32, shared
+  by threads and event loops, 0 for no limit)
+- a token bucket per quota (GEMINI_RPM requests and GEMINI_TPM tokens per
+  minute, 0 disables a bucket) holds calls back instead of letting the API
+  answer with 429s
+- waiting calls are served by priority lane, for the concurrency slots and
+  the quota alike, so interactive requests go ahead of batch jobs (see
+  call_options); waiters are woken when a slot frees up, not by polling
+- transient failures (429, 5xx, dropped connections) are retried with
+  jittered exponential backoff, up to GEMINI_MAX_RETRIES times
+- every call has a deadline (GEMINI_REQUEST_TIMEOUT seconds for interactive
+  calls by default); a call that cannot start or retry before its deadline
+  fails with DeadlineExceeded instead of piling up in the queue
+"""
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+
+import telemetry
+
+log = telemetry.get_logger(__name__)
+
+INTERACTIVE = 0
+BATCH = 1
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_REQUEST_TIMEOUT = 60.0
+BASE_BACKOFF = 0.5
+MAX_BACKOFF = 16.0
+
+RETRYABLE_API_ERROR_NAMES = (
+    'TooManyRequests', 'ResourceExhausted', 'InternalServerError', 'BadGateway', 'ServiceUnavailable',
+    'GatewayTimeout',
+)
+RETRYABLE_HTTP_STATUS = {429, 500, 502, 503, 504}
+
+_call_options = contextvars.ContextVar('gemini_call_options', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """A Gemini call could not be completed before its deadline"""
+
+
+_retryable_api_error_types = None
+
+
+def _retryable_api_errors():
+    """The retryable google.api_core exception classes, once something else has imported them"""
+    global _retryable_api_error_types
+    if _retryable_api_error_types is None:
+        # Importing api_core is slow; until genai has loaded it, no call can have raised one of its errors
+        api_exceptions = sys.modules.get('google.api_core.exceptions')
+        if api_exceptions is None:
+            return ()
+        _retryable_api_error_types = tuple(getattr(api_exceptions, name) for name in RETRYABLE_API_ERROR_NAMES)
+    return _retryable_api_error_types
+
+
+def is_retryable(error):
+    """True for errors worth retrying: quota, server-side and connection failures"""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, _retryable_api_errors()):
+        return True
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRYABLE_HTTP_STATUS
+    return isinstance(error, (ConnectionError, TimeoutError, urllib.error.URLError))
+
+
+@contextlib.contextmanager
+def call_options(priority=INTERACTIVE, timeout=None):
+    """
+    Set the lane and deadline of the Gemini calls made in this context.
+
+    Args:
+        priority (int): INTERACTIVE or BATCH
+        timeout (float): Seconds every call may take, including queueing and
+            retries; None means no deadline
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    token = _call_options.set((priority, deadline))
+    try:
+        yield
+    finally:
+        _call_options.reset(token)
+
+
+def current_options():
+    """Return (priority, deadline) for a call started now"""
+    options = _call_options.get()
+    if options is not None:
+        return options
+    timeout = float(os.getenv('GEMINI_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT))
+    return INTERACTIVE, (time.monotonic() + timeout if timeout > 0 else None)
+
+
+class TokenBucket:
+    """Refills at per_minute / 60 units per second up to a burst of per_minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount units are available (0 if they are now)"""
+        self._refill(now)
+        # A single call larger than the bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount):
+        self.available -= min(amount, self.capacity)
+
+
+class _Waiter:
+    """A queued call; woken through an Event (threads) or a future of its event loop"""
+
+    def __init__(self, tokens, deadline, loop=None):
+        self.tokens = tokens
+        self.deadline = deadline
+        self.admitted = False
+        self.error = None
+        self.cancelled = False
+        self.loop = loop
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class CallScheduler:
+    """Admits Gemini calls by priority under a concurrency limit and the RPM/TPM quota, and retries transient errors"""
+
+    def __init__(self, rpm=None, tpm=None, max_retries=None, max_concurrency=None):
+        if rpm is None:
+            rpm = int(os.getenv('GEMINI_RPM', 0))
+        if tpm is None:
+            tpm = int(os.getenv('GEMINI_TPM', 0))
+        if max_retries is None:
+            max_retries = int(os.getenv('GEMINI_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+        # (priority, sequence, waiter); cancelled waiters are dropped when they reach the head
+        self._waiting = []
+        self._queued = 0
+        self._sequence = itertools.count()
+        self.in_flight = 0
+        self.retries = 0
+        self.deadline_failures = 0
+
+    @property
+    def is_limited(self):
+        return self._requests is not None or self._tokens is not None
+
+    def _wait_time(self, tokens, now):
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.wait_time(1, now))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.wait_time(tokens, now))
+        return wait
+
+    def _take(self, tokens):
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(tokens)
+        self.in_flight += 1
+
+    def _slot_free(self):
+        return self.max_concurrency <= 0 or self.in_flight < self.max_concurrency
+
+    def _dispatch(self):
+        """
+        Admit waiters from the head of the queue while slots and quota allow; call with the lock held.
+
+        Returns:
+            float | None: Seconds until the quota admits the head, or None if only a release can
+        """
+        now = time.monotonic()
+        while self._waiting:
+            waiter = self._waiting[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._waiting)
+                continue
+            if not self._slot_free():
+                return None
+            wait = self._wait_time(waiter.tokens, now)
+            if wait > 0 and (waiter.deadline is None or now + wait <= waiter.deadline):
+                return wait
+            heapq.heappop(self._waiting)
+            self._queued -= 1
+            if wait > 0:
+                waiter.error = DeadlineExceeded(f"Rate limit wait of {wait:.1f}s exceeds the call deadline")
+            else:
+                self._take(waiter.tokens)
+                waiter.admitted = True
+            waiter.wake()
+        return None
+
+    def _enqueue(self, tokens, priority, deadline, loop=None):
+        """Admit a call at once if nothing is queued and it fits, else queue it; call with the lock held"""
+        if not self._waiting and self._slot_free() and self._wait_time(tokens, time.monotonic()) == 0:
+            self._take(tokens)
+            return None, None
+        waiter = _Waiter(tokens, deadline, loop)
+        heapq.heappush(self._waiting, (priority, next(self._sequence), waiter))
+        self._queued += 1
+        return waiter, self._dispatch()
+
+    def _check(self, waiter, wait):
+        """
+        After a wake-up: dispatch again and fail the waiter if its deadline passed; call with the lock held.
+
+        Returns:
+            float | None: Seconds the waiter may sleep before looking again (None: until woken)
+        """
+        if not waiter.admitted and waiter.error is None:
+            wait = self._dispatch()
+        if waiter.admitted or waiter.error is not None:
+            return None
+        now = time.monotonic()
+        if waiter.deadline is not None:
+            if now >= waiter.deadline:
+                self._cancel(waiter)
+                waiter.error = DeadlineExceeded("Call deadline passed while queued behind other calls")
+                return None
+            wait = waiter.deadline - now if wait is None else min(wait, waiter.deadline - now)
+        return wait
+
+    def _cancel(self, waiter):
+        waiter.cancelled = True
+        self._queued -= 1
+        # The next waiter may fit now that this one is out of the way
+        self._dispatch()
+
+    def _result(self, waiter):
+        if waiter.error is not None:
+            self.deadline_failures += 1
+            raise waiter.error
+        return waiter.admitted
+
+    def acquire(self, tokens, priority=INTERACTIVE, deadline=None):
+        """Block until a slot is free, the call fits the quota and no higher-priority call is waiting"""
+        with self._lock:
+            waiter, wait = self._enqueue(tokens, priority, deadline)
+        if waiter is None:
+            return
+        while True:
+            with self._lock:
+                wait = self._check(waiter, wait)
+                if self._result(waiter):
+                    return
+            waiter.event.wait(wait)
+
+    async def acquire_async(self, tokens, priority=INTERACTIVE, deadline=None):
+        """Async variant of acquire; the waiter is woken through a future instead of blocking the event loop"""
+        with self._lock:
+            waiter, wait = self._enqueue(tokens, priority, deadline, asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            while True:
+                with self._lock:
+                    wait = self._check(waiter, wait)
+                    if self._result(waiter):
+                        return
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.admitted:
+                    self._release()
+                elif waiter.error is None:
+                    self._cancel(waiter)
+            raise
+
+    def _release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def release(self):
+        """Free the slot taken by acquire"""
+        with self._lock:
+            self._release()
+
+    def _backoff(self, attempt, error, deadline):
+        """Seconds to sleep before the next attempt, or raise if the deadline does not allow it"""
+        delay = random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            self.deadline_failures += 1
+            raise DeadlineExceeded(f"No time left to retry after: {str(error)}") from error
+        self.retries += 1
+        log.warning("Gemini call failed (%s: %s), retry %d in %.2fs", type(error).__name__, error, attempt + 1, delay)
+        return delay
+
+    def _remaining(self, deadline):
+        return None if deadline is None else max(deadline - time.monotonic(), 0.001)
+
+    def call(self, fn, tokens, priority=None, deadline=None, hold_slot=False):
+        """
+        Run fn(timeout) in a concurrency slot under the quota, retrying transient errors.
+
+        Args:
+            fn: Function performing one model call; timeout is the number of
+                seconds left before the deadline, or None
+            tokens (int): Estimated tokens the call consumes
+            priority (int): Lane; when None, lane and deadline come from call_options
+            deadline (float): time.monotonic() deadline, None for no deadline
+            hold_slot (bool): Keep the slot after a successful call (e.g. for a
+                stream still being read); the caller then calls release()
+
+        Returns:
+            The result of fn(timeout)
+
+        Raises:
+            DeadlineExceeded: If the call could not complete before the deadline
+        """
+        if priority is None:
+            priority, deadline = current_options()
+        attempt = 0
+        while True:
+            self.acquire(tokens, priority, deadline)
+            done = False
+            try:
+                result = fn(self._remaining(deadline))
+                done = True
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e, deadline)
+            finally:
+                # The slot is free while backing off; a held slot is released by the caller
+                if not (done and hold_slot):
+                    self.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, fn, tokens, priority=None, deadline=None):
+        """Async variant of call; fn(timeout) returns an awaitable"""
+        if priority is None:
+            priority, deadline = current_options()
+        attempt = 0
+        while True:
+            await self.acquire_async(tokens, priority, deadline)
+            try:
+                return await fn(self._remaining(deadline))
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e, deadline)
+            finally:
+                self.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        return {
+            'rpm': self.rpm,
+            'tpm': self.tpm,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'waiting': self._queued,
+            'retries': self.retries,
+            'deadline_failures': self.deadline_failures,
+        }
@@ -0,0 +1,151 @@
+"""
+Process pool for CPU-bound PDF extraction.
+
+PyMuPDF extraction and the text cleanup hold the GIL, so a burst of large
+PDFs parsed on request threads stalls every other request in the process.
+With the pool enabled, extraction runs in warm worker processes (fitz is
+imported once per worker by the initializer) and only a compact text/links
+payload comes back. The plain-text extraction of the ATS endpoints
+(extract_text, see text_extraction.py) runs in the same workers.
+
+PDF_POOL_SIZE sets the number of workers (default: CPU count, 0 extracts
+inline on the calling thread).
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import telemetry
+from parsed_document import ParsedDocument
+
+_pool = None
+# None until start_pool runs; 0 means extraction was configured to run inline
+_pool_size = None
+_pool_lock = threading.Lock()
+
+
+def _default_pool_size():
+    return int(os.getenv('PDF_POOL_SIZE', os.cpu_count() or 1))
+
+
+def _init_worker():
+    # Warms the worker: fitz and the compiled regexes load once per process
+    import parsed_document
+    parsed_document.pdf_engine()
+
+
+def _extract_payload(pdf_bytes):
+    return ParsedDocument.from_pdf(pdf_bytes).to_payload()
+
+
+def _extract_text(pdf_bytes):
+    import text_extraction
+    return text_extraction.extract_text(pdf_bytes)
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+def record_timings(document):
+    """Record the extraction stage timings of a document (measured in whichever process extracted it)"""
+    for stage, seconds in document.timings.items():
+        telemetry.observe_stage(stage, seconds)
+    return document
+
+
+def start_pool(size=None):
+    """
+    Create the process-wide extraction pool and start its workers.
+
+    Args:
+        size (int): Number of worker processes; defaults to PDF_POOL_SIZE
+
+    Returns:
+        ProcessPoolExecutor | None: The pool, or None when extraction runs inline
+    """
+    global _pool, _pool_size
+    if size is None:
+        size = _default_pool_size()
+    with _pool_lock:
+        if _pool_size is not None:
+            return _pool
+        if size <= 0:
+            _pool_size = 0
+            return None
+        # spawn keeps workers independent of the threads running in the web server
+        context = multiprocessing.get_context(os.getenv('PDF_POOL_START_METHOD', 'spawn'))
+        _pool = ProcessPoolExecutor(max_workers=size, mp_context=context, initializer=_init_worker)
+        _pool_size = size
+    # Start every worker now instead of on the first uploads
+    list(_pool.map(_warm_up, range(size)))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_size = None
+
+
+def get_pool():
+    """Return the running pool, starting it on first use; None when pooling is disabled"""
+    if _pool_size is None:
+        return start_pool()
+    return _pool
+
+
+async def get_pool_async():
+    """Async variant of get_pool; the first start runs off the event loop"""
+    if _pool_size is None:
+        return await asyncio.to_thread(start_pool)
+    return _pool
+
+
+def extract_document(pdf_bytes):
+    """
+    Extract a ParsedDocument from PDF bytes, in the pool when it is enabled.
+
+    Raises:
+        ValueError: If the PDF cannot be opened or contains no text
+    """
+    pool = get_pool()
+    if pool is None:
+        return record_timings(ParsedDocument.from_pdf(pdf_bytes))
+    return record_timings(ParsedDocument.from_payload(pool.submit(_extract_payload, pdf_bytes).result()))
+
+
+async def extract_document_async(pdf_bytes):
+    """Async variant of extract_document that never blocks the event loop"""
+    pool = await get_pool_async()
+    loop = asyncio.get_running_loop()
+    if pool is None:
+        return record_timings(await asyncio.to_thread(ParsedDocument.from_pdf, pdf_bytes))
+    payload = await loop.run_in_executor(pool, _extract_payload, pdf_bytes)
+    return record_timings(ParsedDocument.from_payload(payload))
+
+
+def extract_text(pdf_bytes):
+    """
+    Extract the plain text of a PDF (see text_extraction.extract_text), in the pool when it is enabled.
+
+    Raises:
+        ValueError: If the PDF cannot be read
+    """
+    pool = get_pool()
+    if pool is None:
+        return _extract_text(pdf_bytes)
+    return pool.submit(_extract_text, pdf_bytes).result()
+
+
+async def extract_text_async(pdf_bytes):
+    """Async variant of extract_text that never blocks the event loop"""
+    pool = await get_pool_async()
+    if pool is None:
+        return await asyncio.to_thread(_extract_text, pdf_bytes)
+    return await asyncio.get_running_loop().run_in_executor(pool, _extract_text, pdf_bytes)
@@ -0,0 +1,471 @@
+"""
+Process-wide Gemini client.
+
+genai.configure runs once and GenerativeModel instances are built once per
+(model, generation config, safety settings) combination, then reused by every
+request. The blocking and the async generation paths share one concurrency
+limit (GEMINI_MAX_CONCURRENCY) so a single worker can keep many resumes in
+flight without overrunning the API.
+
+Static prompt preambles are passed as system_instruction. The first call
+registers each one as cached content with a TTL (GEMINI_CONTEXT_CACHE_TTL,
+0 disables) and later calls only send the per-resume part; the TTL is
+extended once half of it has passed. When the API refuses to cache (e.g.
+the preamble is below the model's minimum cache size) the instruction is
+sent with every call instead.
+
+Every call is admitted by a CallScheduler (see call_scheduler.py), which
+hands out the concurrency slots and enforces the RPM/TPM quota, serves
+interactive calls before batch calls in both, and
+retries transient errors until the call's deadline. Slow calls can be hedged
+and failing models replaced by a fallback chain (see hedging.py).
+
+Setting GEMINI_STUB_URL points every model at a local stub server (see
+stub_model.py) so the service can be load tested without an API key. A
+model_factory (e.g. stub_model.FakeGenerativeModel.factory) replaces
+genai.GenerativeModel in process, without a server or context caching.
+
+google.generativeai takes most of a second to import, so it is loaded on
+first use; fake and stub models never load it. get_configured_client keeps
+the client configured with the API key from settings.py and picks up a new
+key when config.yaml changes.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from call_scheduler import CallScheduler
+from hedging import HedgePolicy, fallback_models_from_env, run_hedged, run_hedged_async, should_fall_back
+from prompt_compaction import estimate_tokens
+import settings
+import telemetry
+
+log = telemetry.get_logger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_CONTEXT_CACHE_TTL = 3600
+
+
+def _genai():
+    import google.generativeai as genai
+    return genai
+
+
+def _model_key(model_name, generation_config, safety_settings, instruction_key=None):
+    return (
+        model_name,
+        json.dumps(generation_config or {}, sort_keys=True),
+        json.dumps(safety_settings or [], sort_keys=True),
+        instruction_key,
+    )
+
+
+def _call_tokens(prompt, system_instruction):
+    # An estimate is enough for the TPM bucket
+    prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+    return estimate_tokens(prompt_text) + estimate_tokens(system_instruction or "")
+
+
+def _response_text(response):
+    try:
+        return response.text or ""
+    except (AttributeError, ValueError):
+        # Blocked responses have no text
+        return ""
+
+
+def _record_usage(response, prompt, system_instruction, output_text=None):
+    """Record the token counts of a call: the API's usage metadata, or estimates when it has none"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None and getattr(usage, 'prompt_token_count', 0):
+        telemetry.observe_tokens(
+            usage.prompt_token_count,
+            getattr(usage, 'candidates_token_count', 0) or 0,
+            getattr(usage, 'cached_content_token_count', 0) or 0,
+        )
+        return
+    if output_text is None:
+        output_text = _response_text(response)
+    telemetry.observe_tokens(_call_tokens(prompt, system_instruction), estimate_tokens(output_text))
+
+
+# Returned by _get_context when the context has to be registered first
+_REGISTER = object()
+
+
+class _CachedContext:
+    """A registered system instruction (None if caching failed) and when to check it again"""
+
+    def __init__(self, cached_content, check_in):
+        self.cached_content = cached_content
+        self.check_at = time.monotonic() + check_in
+
+
+class GeminiClient:
+    """Long-lived wrapper around genai that reuses configured models"""
+
+    def __init__(self, api_key=None, max_concurrency=None, stub_url=None, context_cache_ttl=None, scheduler=None,
+                 hedging=None, fallback_models=None, model_factory=None):
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        if context_cache_ttl is None:
+            context_cache_ttl = int(os.getenv('GEMINI_CONTEXT_CACHE_TTL', DEFAULT_CONTEXT_CACHE_TTL))
+        self.max_concurrency = max_concurrency
+        self.context_cache_ttl = context_cache_ttl
+        self.stub_url = stub_url or os.getenv('GEMINI_STUB_URL')
+        # Called like genai.GenerativeModel(model_name, generation_config, safety_settings, system_instruction=...)
+        self.model_factory = model_factory
+        self.scheduler = scheduler or CallScheduler(max_concurrency=max_concurrency)
+        self.hedging = hedging or HedgePolicy()
+        self.fallback_models = fallback_models if fallback_models is not None else fallback_models_from_env()
+        self._hedge_executor = None
+        self.api_key = None
+        self._lock = threading.Lock()
+        self._models = {}
+        # Registering cached content is a network call, so it gets its own lock
+        self._context_lock = threading.Lock()
+        self._contexts = {}
+        # grpc.aio channels belong to the event loop that created them, so async
+        # models are kept per loop
+        self._async_models = weakref.WeakKeyDictionary()
+        if api_key:
+            self.configure(api_key)
+
+    @property
+    def is_configured(self):
+        return self.api_key is not None
+
+    def configure(self, api_key):
+        """Configure genai with the API key; repeated calls with the same key are no-ops"""
+        with self._lock:
+            if api_key == self.api_key:
+                return
+            if self.model_factory is None and not self.stub_url:
+                _genai().configure(api_key=api_key)
+            self.api_key = api_key
+            self._models.clear()
+            self._async_models.clear()
+        with self._context_lock:
+            self._contexts.clear()
+
+    def _create_context(self, model_name, system_instruction):
+        if self.stub_url:
+            from stub_model import StubCachedContent
+            return StubCachedContent.create(
+                self.stub_url, model_name, system_instruction=system_instruction, ttl=self.context_cache_ttl
+            )
+        return _genai().caching.CachedContent.create(
+            model=model_name, system_instruction=system_instruction, ttl=self.context_cache_ttl
+        )
+
+    def _register_context(self, model_name, system_instruction, previous):
+        """Extend the TTL of a registered instruction, or register it (again)"""
+        ttl = self.context_cache_ttl
+        if previous is not None and previous.cached_content is not None:
+            try:
+                previous.cached_content.update(ttl=ttl)
+                return _CachedContext(previous.cached_content, ttl / 2)
+            except Exception as e:
+                log.warning("Failed to refresh cached context %s: %s", previous.cached_content.name, e)
+            self._forget_models(previous.cached_content.name)
+        try:
+            cached_content = self._create_context(model_name, system_instruction)
+            log.info("Registered cached context %s for %s (ttl %ss)", cached_content.name, model_name, ttl)
+            return _CachedContext(cached_content, ttl / 2)
+        except Exception as e:
+            # Retry later; until then the instruction is sent with every call
+            log.warning("Context caching unavailable for %s, sending the system instruction per call: %s", model_name, e)
+            return _CachedContext(None, ttl / 2)
+
+    def _get_context(self, model_name, system_instruction, digest, register=True):
+        key = (model_name, digest)
+        context = self._contexts.get(key)
+        if context is None or time.monotonic() >= context.check_at:
+            if not register:
+                return _REGISTER
+            with self._context_lock:
+                context = self._contexts.get(key)
+                if context is None or time.monotonic() >= context.check_at:
+                    context = self._register_context(model_name, system_instruction, context)
+                    self._contexts[key] = context
+        return context.cached_content
+
+    def _forget_models(self, instruction_key):
+        with self._lock:
+            for models in [self._models, *self._async_models.values()]:
+                for key in [key for key in models if key[3] == instruction_key]:
+                    del models[key]
+
+    def _resolve(self, model_name, generation_config, safety_settings, system_instruction, register=True):
+        """
+        Return the model cache key and the cached content to build the model from.
+
+        With register=False, returns None instead of registering or refreshing
+        the cached context, which is a blocking network call.
+        """
+        if not system_instruction:
+            return _model_key(model_name, generation_config, safety_settings), None
+        digest = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()
+        cached_content = None
+        if self.context_cache_ttl > 0 and self.model_factory is None:
+            cached_content = self._get_context(model_name, system_instruction, digest, register)
+            if cached_content is _REGISTER:
+                return None
+        instruction_key = cached_content.name if cached_content is not None else digest
+        return _model_key(model_name, generation_config, safety_settings, instruction_key), cached_content
+
+    def _build_model(self, model_name, generation_config, safety_settings, system_instruction=None, cached_content=None):
+        if self.model_factory is not None:
+            return self.model_factory(
+                model_name, generation_config, safety_settings, system_instruction=system_instruction
+            )
+        if self.stub_url:
+            from stub_model import StubGenerativeModel
+            return StubGenerativeModel(
+                self.stub_url, model_name, generation_config, safety_settings,
+                system_instruction=system_instruction, cached_content=cached_content
+            )
+        genai = _genai()
+        if cached_content is not None:
+            return genai.GenerativeModel.from_cached_content(
+                cached_content,
+                generation_config=generation_config,
+                safety_settings=safety_settings
+            )
+        return genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            system_instruction=system_instruction
+        )
+
+    def get_model(self, model_name, generation_config=None, safety_settings=None, system_instruction=None):
+        """Return the shared model instance for this configuration, creating it on first use"""
+        key, cached_content = self._resolve(model_name, generation_config, safety_settings, system_instruction)
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = self._build_model(
+                        model_name, generation_config, safety_settings, system_instruction, cached_content
+                    )
+                    self._models[key] = model
+        return model
+
+    async def _get_async_model(self, model_name, generation_config, safety_settings, system_instruction=None):
+        loop = asyncio.get_running_loop()
+        resolved = self._resolve(model_name, generation_config, safety_settings, system_instruction, register=False)
+        if resolved is None:
+            # The context is new or due for a refresh; the API call must not block the event loop
+            resolved = await asyncio.to_thread(
+                self._resolve, model_name, generation_config, safety_settings, system_instruction
+            )
+        key, cached_content = resolved
+        with self._lock:
+            models = self._async_models.setdefault(loop, {})
+            model = models.get(key)
+            if model is None:
+                model = self._build_model(
+                    model_name, generation_config, safety_settings, system_instruction, cached_content
+                )
+                models[key] = model
+        return model
+
+    def _request_kwargs(self, kwargs, timeout):
+        # Bound each API call by the time left before the deadline
+        if timeout is None or self.stub_url or 'request_options' in kwargs:
+            return kwargs
+        return dict(kwargs, request_options={'timeout': timeout})
+
+    def _get_hedge_executor(self):
+        if self._hedge_executor is None:
+            with self._lock:
+                if self._hedge_executor is None:
+                    # Room for a primary and a hedge per concurrency slot
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency * 2, thread_name_prefix='gemini-hedge'
+                    )
+        return self._hedge_executor
+
+    def _model_chain(self, model_name):
+        return [model_name] + [name for name in self.fallback_models if name != model_name]
+
+    def _can_fall_back(self, chain, index, error):
+        """Record a fallback and return True if the next model in the chain should be tried"""
+        if index == len(chain) - 1 or not should_fall_back(error):
+            return False
+        log.warning("%s failed (%s: %s), falling back to %s", chain[index], type(error).__name__, error, chain[index + 1])
+        self.hedging.count(chain[index], 'fallbacks_from')
+        self.hedging.count(chain[index + 1], 'fallbacks_to')
+        return True
+
+    def _generate_once(self, prompt, model_name, generation_config, safety_settings, system_instruction, kwargs):
+        model = self.get_model(model_name, generation_config, safety_settings, system_instruction)
+        tokens = _call_tokens(prompt, system_instruction)
+
+        def attempt(timeout):
+            return model.generate_content(prompt, **self._request_kwargs(kwargs, timeout))
+
+        def scheduled():
+            return self.hedging.timed(model_name, lambda: self.scheduler.call(attempt, tokens))
+
+        self.hedging.count(model_name, 'calls')
+        if self.hedging.enabled:
+            return run_hedged(scheduled, model_name, self.hedging, self._get_hedge_executor())
+        return scheduled()
+
+    def generate_content(self, prompt, model_name, generation_config=None, safety_settings=None,
+                         system_instruction=None, **kwargs):
+        """Blocking generation, limited to max_concurrency calls in flight"""
+        chain = self._model_chain(model_name)
+        with telemetry.span('model'):
+            for index, name in enumerate(chain):
+                try:
+                    response = self._generate_once(
+                        prompt, name, generation_config, safety_settings, system_instruction, kwargs
+                    )
+                    break
+                except Exception as e:
+                    if not self._can_fall_back(chain, index, e):
+                        raise
+        _record_usage(response, prompt, system_instruction)
+        return response
+
+    def _start_stream(self, prompt, model_name, generation_config, safety_settings, system_instruction, kwargs):
+        model = self.get_model(model_name, generation_config, safety_settings, system_instruction)
+
+        def start(timeout):
+            # Retries are only possible until the first chunk has been handed out
+            chunks = iter(model.generate_content(prompt, stream=True, **self._request_kwargs(kwargs, timeout)))
+            return chunks, next(chunks, None)
+
+        self.hedging.count(model_name, 'calls')
+        # The slot stays taken until generate_content_stream has read the stream
+        return self.scheduler.call(start, _call_tokens(prompt, system_instruction), hold_slot=True)
+
+    def generate_content_stream(self, prompt, model_name, generation_config=None, safety_settings=None,
+                                system_instruction=None, **kwargs):
+        """Yield response chunks as they arrive, holding a concurrency slot until the stream ends"""
+        chain = self._model_chain(model_name)
+        start = time.perf_counter()
+        for index, name in enumerate(chain):
+            try:
+                chunks, first = self._start_stream(
+                    prompt, name, generation_config, safety_settings, system_instruction, kwargs
+                )
+                break
+            except Exception as e:
+                if not self._can_fall_back(chain, index, e):
+                    raise
+        last = first
+        output = []
+        try:
+            if first is not None:
+                output.append(_response_text(first))
+                yield first
+            for chunk in chunks:
+                last = chunk
+                output.append(_response_text(chunk))
+                yield chunk
+        finally:
+            self.scheduler.release()
+            telemetry.observe_stage('model', time.perf_counter() - start)
+            # The usage metadata of a stream arrives with its last chunk
+            _record_usage(last, prompt, system_instruction, ''.join(output))
+
+    async def _generate_once_async(self, prompt, model_name, generation_config, safety_settings,
+                                   system_instruction, kwargs):
+        model = await self._get_async_model(model_name, generation_config, safety_settings, system_instruction)
+        tokens = _call_tokens(prompt, system_instruction)
+
+        async def attempt(timeout):
+            return await model.generate_content_async(prompt, **self._request_kwargs(kwargs, timeout))
+
+        def scheduled():
+            return self.hedging.timed_async(model_name, lambda: self.scheduler.call_async(attempt, tokens))
+
+        self.hedging.count(model_name, 'calls')
+        if self.hedging.enabled:
+            return await run_hedged_async(scheduled, model_name, self.hedging)
+        return await scheduled()
+
+    async def generate_content_async(self, prompt, model_name, generation_config=None, safety_settings=None,
+                                     system_instruction=None, **kwargs):
+        """Async generation, limited to max_concurrency calls in flight"""
+        chain = self._model_chain(model_name)
+        with telemetry.span('model'):
+            for index, name in enumerate(chain):
+                try:
+                    response = await self._generate_once_async(
+                        prompt, name, generation_config, safety_settings, system_instruction, kwargs
+                    )
+                    break
+                except Exception as e:
+                    if not self._can_fall_back(chain, index, e):
+                        raise
+        _record_usage(response, prompt, system_instruction)
+        return response
+
+    def stats(self):
+        """Scheduler, hedging and fallback figures of this client"""
+        return {
+            'scheduler': self.scheduler.stats(),
+            'hedging': self.hedging.stats(),
+            'fallback_models': self.fallback_models,
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+# The key get_configured_client last applied; a client holding any other key was set up by init_client
+_settings_key = None
+
+
+def get_client():
+    """Return the process-wide GeminiClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeminiClient()
+    return _client
+
+
+def init_client(api_key, max_concurrency=None, **options):
+    """Create and configure the process-wide client; call once at startup. options go to GeminiClient"""
+    global _client
+    with _client_lock:
+        _client = GeminiClient(api_key=api_key, max_concurrency=max_concurrency, **options)
+    return _client
+
+
+def get_configured_client():
+    """
+    Return the process-wide client, configured with the API key from settings.
+
+    Settings are re-read when config.yaml changes (see settings.py), and a new
+    key reconfigures the client. A client that init_client configured with
+    its own key is left as it is.
+
+    Returns:
+        GeminiClient: The configured client
+
+    Raises:
+        FileNotFoundError, KeyError, ValueError: If no valid API key is configured
+    """
+    global _settings_key
+    client = get_client()
+    if client.is_configured and client.api_key != _settings_key:
+        return client
+    api_key = settings.get_settings().gemini_api_key
+    if api_key != client.api_key:
+        log.info("Configuring the Gemini client from the settings")
+        client.configure(api_key)
+        _settings_key = api_key
+    return client
@@ -0,0 +1,182 @@
+"""
+Hedged requests and the fallback model chain for Gemini calls.
+
+With hedging enabled (GEMINI_HEDGE=1), a call that has not answered after
+the GEMINI_HEDGE_PERCENTILE latency of recent calls to the same model gets a
+duplicate request; whichever answers first wins and the other is cancelled
+(async) or abandoned (blocking calls cannot be interrupted). Until enough
+calls have been timed, GEMINI_HEDGE_INITIAL_DELAY seconds is used instead.
+
+GEMINI_FALLBACK_MODELS is a comma-separated list of models tried in order
+when the requested model still fails after its retries.
+
+HedgePolicy.stats() reports per-model call counts, latency percentiles, how
+often hedges fired and won, and how often the fallback chain was used.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+
+from call_scheduler import DeadlineExceeded, is_retryable
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_INITIAL_DELAY = 10.0
+DEFAULT_MIN_DELAY = 1.0
+# Latencies kept per model, and how many are needed before percentiles are trusted
+LATENCY_WINDOW = 500
+MIN_SAMPLES = 20
+
+
+def should_fall_back(error):
+    """True when another model might succeed where this one failed"""
+    return is_retryable(error) or isinstance(error, DeadlineExceeded)
+
+
+def fallback_models_from_env():
+    return [name.strip() for name in os.getenv('GEMINI_FALLBACK_MODELS', '').split(',') if name.strip()]
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class HedgePolicy:
+    """Decides when to hedge a call and keeps the latency and hedge/fallback counters"""
+
+    def __init__(self, enabled=None, percentile=None, initial_delay=None, min_delay=None):
+        if enabled is None:
+            enabled = os.getenv('GEMINI_HEDGE', '0').lower() in ('1', 'true', 'yes', 'on')
+        if percentile is None:
+            percentile = float(os.getenv('GEMINI_HEDGE_PERCENTILE', DEFAULT_PERCENTILE))
+        if initial_delay is None:
+            initial_delay = float(os.getenv('GEMINI_HEDGE_INITIAL_DELAY', DEFAULT_INITIAL_DELAY))
+        if min_delay is None:
+            min_delay = float(os.getenv('GEMINI_HEDGE_MIN_DELAY', DEFAULT_MIN_DELAY))
+        self.enabled = enabled
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._counts = defaultdict(Counter)
+
+    def delay(self, model_name):
+        """Seconds to wait for the first answer before sending a hedge"""
+        with self._lock:
+            samples = list(self._latencies[model_name])
+        if len(samples) < MIN_SAMPLES:
+            return self.initial_delay
+        return max(self.min_delay, _percentile(sorted(samples), self.percentile))
+
+    def record_latency(self, model_name, seconds):
+        with self._lock:
+            self._latencies[model_name].append(seconds)
+
+    def count(self, model_name, event):
+        with self._lock:
+            self._counts[model_name][event] += 1
+
+    def timed(self, model_name, call):
+        """Run call() and record its latency when it succeeds"""
+        start = time.perf_counter()
+        result = call()
+        self.record_latency(model_name, time.perf_counter() - start)
+        return result
+
+    async def timed_async(self, model_name, call):
+        start = time.perf_counter()
+        result = await call()
+        self.record_latency(model_name, time.perf_counter() - start)
+        return result
+
+    def stats(self):
+        """Per-model counters and latency percentiles"""
+        with self._lock:
+            models = set(self._counts) | set(self._latencies)
+            snapshot = {name: (dict(self._counts[name]), sorted(self._latencies[name])) for name in models}
+        result = {}
+        for name, (counts, ordered) in snapshot.items():
+            calls = counts.get('calls', 0)
+            hedges = counts.get('hedges', 0)
+            result[name] = {
+                'calls': calls,
+                'hedges_fired': hedges,
+                'hedge_wins': counts.get('hedge_wins', 0),
+                'hedge_rate': round(hedges / calls, 4) if calls else 0.0,
+                'fallbacks_to': counts.get('fallbacks_to', 0),
+                'fallbacks_from': counts.get('fallbacks_from', 0),
+                'latency_p50_s': round(_percentile(ordered, 50), 4) if ordered else None,
+                'latency_p95_s': round(_percentile(ordered, 95), 4) if ordered else None,
+                'latency_p99_s': round(_percentile(ordered, 99), 4) if ordered else None,
+                'hedge_delay_s': round(self.delay(name), 4),
+            }
+        return {'enabled': self.enabled, 'percentile': self.percentile, 'models': result}
+
+
+def run_hedged(call, model_name, policy, executor):
+    """
+    Run call() and send a duplicate if it is slower than the hedge delay.
+
+    Args:
+        call: Function performing one (scheduled) model call
+        model_name (str): Model the latency threshold is looked up for
+        policy (HedgePolicy): Provides the delay and records the outcome
+        executor: Thread pool both requests run on
+
+    Returns:
+        The result of whichever request answered first
+    """
+    # Each request runs in a copy of the caller's context so call_options still apply
+    primary = executor.submit(contextvars.copy_context().run, call)
+    try:
+        return primary.result(timeout=policy.delay(model_name))
+    except FutureTimeout:
+        pass
+
+    policy.count(model_name, 'hedges')
+    hedge = executor.submit(contextvars.copy_context().run, call)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    policy.count(model_name, 'hedge_wins')
+                # A blocking call that already started cannot be interrupted; its result is dropped
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+async def run_hedged_async(call, model_name, policy):
+    """Async variant of run_hedged; the losing request is cancelled"""
+    primary = asyncio.ensure_future(call())
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=policy.delay(model_name))
+        if done:
+            return primary.result()
+
+        policy.count(model_name, 'hedges')
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        policy.count(model_name, 'hedge_wins')
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,485 @@
+"""
+Rank parsed resumes against a job description.
+
+CandidateIndex turns the skills, experience, projects and achievements of
+every resume into a row of a sparse term matrix and weights it once with
+BM25 (default) or TF-IDF. Ranking a job description is then one sparse
+matrix-vector product over the columns of the terms it mentions, followed by
+a partial sort for the top k, so a query against 100k resumes takes a few
+milliseconds once the index is built.
+
+Every ranked candidate comes with the job-description keywords its resume
+matches and the most important ones it is missing.
+
+    python job_matcher.py batch_results.jsonl job.txt --top 10
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+import json_codec
+from local_parser import SKILL_ALIASES as ALIASES, SKILLS_DICTIONARY
+
+# Parsed-resume sections that describe what a candidate can do
+MATCH_SECTIONS = ("skills", "experience", "projects", "achievements", "positions_of_responsibility")
+# Fields inside those sections that carry no keywords
+SKIPPED_FIELDS = {"links", "duration", "location", "score", "year"}
+
+DEFAULT_TOP_K = 10
+# Indexes kept by IndexCache (RANK_INDEX_CACHE_SIZE, 0 disables)
+DEFAULT_INDEX_CACHE_SIZE = 4
+# Matched/missing keywords reported per candidate
+DEFAULT_KEYWORDS = 15
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+    a about above across after all also an and any are as at be been being both but by can
+    could did do does during each either etc for from had has have having he her his how if
+    in into is it its just may me more most must my no not of on one or other our out over
+    own per should so some such than that the their them then there these they this those
+    through to too under up us very via was we were what when where which while who will with
+    within would you your
+    ability able apply candidate candidates company strong good great excellent years year
+    experience experienced work working team teams role roles responsibilities responsible
+    requirements required preferred plus knowledge skills skill understanding looking join
+    including etc using use used new help build building develop developing developer
+    opportunity ideal familiarity familiar proficiency proficient hands-on hands
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-/]*[a-z0-9+#]|[a-z0-9]")
+
+# Multi-word dictionary skills, by number of words, kept as one term ("spring boot")
+_PHRASES = {}
+for _names in SKILLS_DICTIONARY.values():
+    for _name in _names:
+        _words = _name.lower().split()
+        if len(_words) > 1:
+            _PHRASES.setdefault(len(_words), set()).add(" ".join(_words))
+_PHRASES.setdefault(2, set()).update(phrase for phrase in ALIASES if " " in phrase)
+_PHRASE_SIZES = sorted(_PHRASES, reverse=True)
+_PHRASE_STARTS = {phrase.split()[0] for phrases in _PHRASES.values() for phrase in phrases}
+
+
+def tokenize(text):
+    """
+    Split text into match terms.
+
+    Words are lowercased and folded through ALIASES; multi-word dictionary
+    skills become a single term and stopwords are dropped.
+
+    Returns:
+        list: Terms in order of appearance, with repeats
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    terms = []
+    index = 0
+    while index < len(words):
+        # Only words that can start a phrase pay for the n-gram lookups
+        for size in (_PHRASE_SIZES if words[index] in _PHRASE_STARTS else ()):
+            phrase = " ".join(words[index:index + size])
+            if phrase in _PHRASES[size]:
+                terms.append(ALIASES.get(phrase, phrase))
+                index += size
+                break
+        else:
+            word = ALIASES.get(words[index], words[index])
+            # Single letters are noise except for the languages C and R
+            if (word not in STOPWORDS and not word.isdigit() and len(word) > 1) or word in ("c", "r"):
+                terms.append(word)
+            index += 1
+    return terms
+
+
+def _collect_text(value, parts):
+    if isinstance(value, str):
+        parts.append(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in SKIPPED_FIELDS:
+                _collect_text(item, parts)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_text(item, parts)
+
+
+def resume_text(resume):
+    """
+    Text of a parsed resume that is matched against job descriptions.
+
+    Args:
+        resume (dict | ParsedResume | str): A parse result (the parse schema, a
+            resume_models.ParsedResume or a record with "parsed_data") or plain resume text
+
+    Returns:
+        str: The skills, experience, projects and achievements text
+    """
+    if isinstance(resume, str):
+        return resume
+    if hasattr(resume, "to_dict"):
+        resume = resume.to_dict()
+    if "parsed_data" in resume:
+        resume = resume["parsed_data"]
+        if isinstance(resume, str):
+            return resume
+    if not isinstance(resume, dict):
+        raise ValueError(f"Expected a parsed resume or resume text, got {type(resume).__name__}")
+    parts = []
+    for section in MATCH_SECTIONS:
+        _collect_text(resume.get(section), parts)
+    return "\n".join(parts)
+
+
+def _candidate_id(resume, position):
+    if isinstance(resume, dict):
+        for key in ("id", "file", "sha256"):
+            if resume.get(key):
+                return resume[key]
+        parsed = resume.get("parsed_data", resume)
+        info = parsed.get("personal_info") if isinstance(parsed, dict) else None
+        name = info.get("full_name") if isinstance(info, dict) else None
+        if name:
+            return name
+    return position
+
+
+class CandidateIndex:
+    """Sparse BM25/TF-IDF index of a resume corpus"""
+
+    def __init__(self, ids, counts, terms, scoring="bm25", k1=BM25_K1, b=BM25_B):
+        """
+        Args:
+            ids (list): Candidate id of every row
+            counts (scipy.sparse.csr_matrix): Term counts, one row per candidate
+            terms (list): Term of every column
+            scoring (str): "bm25" or "tfidf"
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 length normalization
+        """
+        if scoring not in ("bm25", "tfidf"):
+            raise ValueError(f"Unknown scoring {scoring!r}, expected 'bm25' or 'tfidf'")
+        self.ids = list(ids)
+        self.counts = counts
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.scoring = scoring
+
+        documents = counts.shape[0]
+        document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+        row_lengths = np.diff(counts.indptr)
+        tf = counts.data.astype(np.float64)
+        if scoring == "bm25":
+            self.idf = np.log1p((documents - document_frequency + 0.5) / (document_frequency + 0.5))
+            lengths = np.asarray(counts.sum(axis=1)).ravel()
+            average = lengths.mean() if documents else 0.0
+            norm = k1 * (1 - b + b * lengths / average) if average else np.full(documents, k1)
+            weights = tf * (k1 + 1) / (tf + np.repeat(norm, row_lengths)) * self.idf[counts.indices]
+        else:
+            self.idf = np.log((1 + documents) / (1 + document_frequency)) + 1
+            weights = (1 + np.log(tf)) * self.idf[counts.indices]
+            # Rows are L2-normalized so the query product is a cosine similarity
+            squares = sparse.csr_matrix((weights ** 2, counts.indices, counts.indptr), shape=counts.shape).sum(axis=1)
+            row_norms = np.sqrt(np.asarray(squares).ravel())
+            weights = weights / np.repeat(np.where(row_norms > 0, row_norms, 1), row_lengths)
+        # Column-major, so a query only touches the columns of its own terms
+        self.weights = sparse.csr_matrix((weights, counts.indices, counts.indptr), shape=counts.shape).tocsc()
+
+    @classmethod
+    def build(cls, resumes, ids=None, scoring="bm25", k1=BM25_K1, b=BM25_B):
+        """
+        Index a corpus of resumes.
+
+        Args:
+            resumes (list): Parse results, batch records or resume texts (see resume_text)
+            ids (list): Candidate ids; by default taken from "id", "file",
+                "sha256" or the candidate's name, else the position in the list
+            scoring (str): "bm25" or "tfidf"
+
+        Returns:
+            CandidateIndex: The index
+        """
+        term_counts = []
+        candidate_ids = []
+        for position, resume in enumerate(resumes):
+            term_counts.append(Counter(tokenize(resume_text(resume))))
+            candidate_ids.append(ids[position] if ids is not None else _candidate_id(resume, position))
+        return cls.from_term_counts(candidate_ids, term_counts, scoring, k1, b)
+
+    @classmethod
+    def from_term_counts(cls, ids, term_counts, scoring="bm25", k1=BM25_K1, b=BM25_B):
+        """
+        Index already tokenized resumes.
+
+        Args:
+            ids (list): Candidate id of every resume
+            term_counts (list): A Counter of terms per resume (tokenize(resume_text(resume)))
+
+        Returns:
+            CandidateIndex: The index
+        """
+        vocabulary = {}
+        indptr = [0]
+        indices = []
+        data = []
+        for counts in term_counts:
+            for term, count in counts.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                data.append(count)
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(ids), len(vocabulary)),
+        )
+        counts.sort_indices()
+        return cls(ids, counts, list(vocabulary), scoring, k1, b)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _query(self, job_description):
+        """Return (term, count, importance, column) per query term, most important first; column is -1 if unseen"""
+        unseen_idf = self.idf.max() if self.idf.size else 1.0
+        keywords = []
+        for term, count in Counter(tokenize(job_description)).items():
+            column = self.vocabulary.get(term, -1)
+            idf = self.idf[column] if column >= 0 else unseen_idf
+            keywords.append((term, count, count * idf, column))
+        keywords.sort(key=lambda keyword: (-keyword[2], keyword[0]))
+        return keywords
+
+    def _scores(self, query):
+        known = [(count, column) for _, count, _, column in query if column >= 0]
+        if not known or not len(self):
+            return np.zeros(len(self))
+        columns = np.array([column for _, column in known], dtype=np.int64)
+        weights = np.array([count for count, _ in known], dtype=np.float64)
+        if self.scoring == "tfidf":
+            weights = (1 + np.log(weights)) * self.idf[columns]
+            weights /= np.linalg.norm(weights)
+        else:
+            # Repeating a term in the job description counts, but saturates like a document term
+            weights = weights * (BM25_K1 + 1) / (weights + BM25_K1)
+        return self.weights[:, columns] @ weights
+
+    def score(self, job_description):
+        """
+        Score every candidate against a job description.
+
+        Returns:
+            numpy.ndarray: One score per candidate, in index order
+        """
+        return self._scores(self._query(job_description))
+
+    def rank(self, job_description, top_k=DEFAULT_TOP_K, keywords=DEFAULT_KEYWORDS):
+        """
+        Rank candidates against a job description.
+
+        Args:
+            job_description (str): Job description text
+            top_k (int): Number of candidates returned
+            keywords (int): Maximum matched and missing keywords per candidate
+
+        Returns:
+            list: {"id", "rank", "score", "matched_keywords", "missing_keywords"}
+                for the best candidates with a non-zero score, best first
+        """
+        query = self._query(job_description)
+        scores = self._scores(query)
+        top_k = min(top_k, int(np.count_nonzero(scores)))
+        if top_k <= 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k] if top_k < len(scores) else np.arange(len(scores))
+        # Highest score first; ties keep index order
+        best = best[np.lexsort((best, -scores[best]))]
+
+        ranked = []
+        for rank, row in enumerate(best, start=1):
+            present = set(self.counts.indices[self.counts.indptr[row]:self.counts.indptr[row + 1]])
+            matched = [term for term, _, _, column in query if column in present]
+            missing = [term for term, _, _, column in query if column not in present]
+            ranked.append({
+                "id": self.ids[row],
+                "rank": rank,
+                "score": round(float(scores[row]), 4),
+                "matched_keywords": matched[:keywords],
+                "missing_keywords": missing[:keywords],
+            })
+        return ranked
+
+
+def rank_candidates(job_description, resumes, top_k=DEFAULT_TOP_K, scoring="bm25", ids=None):
+    """
+    Index a corpus and rank it against one job description.
+
+    Build a CandidateIndex once instead when the same corpus is ranked
+    against several job descriptions.
+
+    Returns:
+        list: See CandidateIndex.rank
+    """
+    return CandidateIndex.build(resumes, ids=ids, scoring=scoring).rank(job_description, top_k)
+
+
+def _check_resumes(resumes):
+    """Raise ValueError naming the first item of a ranking request that holds no resume"""
+    if not isinstance(resumes, list):
+        raise ValueError('"resumes" must be a list of parsed resumes or resume texts')
+    for position, resume in enumerate(resumes):
+        if isinstance(resume, str):
+            continue
+        if not isinstance(resume, dict):
+            raise ValueError(f'"resumes"[{position}] must be a parsed resume or resume text')
+        if "parsed_data" in resume and not isinstance(resume["parsed_data"], (dict, str)):
+            # e.g. a /resumes/<sha256> record that only holds an ATS report ("parsed_data": null)
+            raise ValueError(f'"resumes"[{position}]["parsed_data"] must be a parsed resume or resume text')
+
+
+class IndexCache:
+    """The most recently built indexes, so a corpus is tokenized once rather than on every request"""
+
+    def __init__(self, size=None):
+        if size is None:
+            size = int(os.getenv("RANK_INDEX_CACHE_SIZE", DEFAULT_INDEX_CACHE_SIZE))
+        self.size = size
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """Return the index cached under key, calling build() to create it on a miss"""
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                self.hits += 1
+                return index
+            self.misses += 1
+        index = build()
+        if self.size > 0:
+            with self._lock:
+                self._indexes[key] = index
+                while len(self._indexes) > self.size:
+                    self._indexes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+index_cache = IndexCache()
+
+
+def corpus_key(resumes):
+    """Digest of a request corpus; serializing it is far cheaper than tokenizing it"""
+    return hashlib.blake2b(json_codec.dumpb(resumes), digest_size=16).hexdigest()
+
+
+# Term counts of stored resumes by store path, then SHA-256: (parsed_hash, Counter)
+_store_terms = {}
+_store_terms_lock = threading.Lock()
+
+
+def store_index(store, scoring="bm25"):
+    """
+    Index every parsed resume of a ResumeStore, rebuilt only when the store changes.
+
+    A rebuild only tokenizes the resumes whose parse result changed since the
+    last one; the term counts of the others are kept.
+
+    Returns:
+        CandidateIndex: Rows are keyed by the resume's SHA-256
+    """
+    def build():
+        with _store_terms_lock:
+            previous = _store_terms.get(store.path, {})
+            current = {}
+            for sha256, parsed_hash, parsed_json in store.iter_parsed():
+                known = previous.get(sha256)
+                if known is None or known[0] != parsed_hash:
+                    known = (parsed_hash, Counter(tokenize(resume_text(json.loads(parsed_json)))))
+                current[sha256] = known
+            _store_terms[store.path] = current
+        return CandidateIndex.from_term_counts(
+            list(current), [counts for _, counts in current.values()], scoring=scoring
+        )
+    return index_cache.get(("store", store.path, store.version(), scoring), build)
+
+
+def rank_request(payload, store=None):
+    """
+    Handle a ranking API request body.
+
+    Indexes are cached (see IndexCache): ranking the same corpus again only
+    runs the query. Without "resumes", the resumes in `store` are ranked, and
+    that index is rebuilt only after the store changes.
+
+    Args:
+        payload (dict): {"job_description": str, "resumes": [...], "top_k": int,
+            "scoring": "bm25" | "tfidf"}; resumes are parse results, batch
+            records or texts, optionally with an "id"
+        store (ResumeStore): Store ranked when the body has no "resumes"
+
+    Returns:
+        dict: {"candidates": ranked candidates, "total": number of resumes ranked}
+
+    Raises:
+        ValueError: If the request is malformed
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    job_description = payload.get("job_description")
+    resumes = payload.get("resumes")
+    if not isinstance(job_description, str) or not job_description.strip():
+        raise ValueError('"job_description" must be a non-empty string')
+    try:
+        top_k = int(payload.get("top_k", DEFAULT_TOP_K))
+    except (TypeError, ValueError):
+        raise ValueError('"top_k" must be an integer')
+    scoring = payload.get("scoring", "bm25")
+    if scoring not in ("bm25", "tfidf"):
+        raise ValueError(f'"scoring" must be "bm25" or "tfidf", got {scoring!r}')
+    if resumes is None and store is not None:
+        index = store_index(store, scoring)
+    else:
+        _check_resumes(resumes)
+        index = index_cache.get(
+            ("request", corpus_key(resumes), scoring), lambda: CandidateIndex.build(resumes, scoring=scoring)
+        )
+    return {"candidates": index.rank(job_description, top_k), "total": len(index)}
+
+
+def _load_records(path):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("status", "ok") == "ok" and ("parsed_data" in record or "skills" in record):
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank parsed resumes against a job description")
+    parser.add_argument("results", help="JSON Lines file of parse results (e.g. batch.py output)")
+    parser.add_argument("job_description", help="Text file with the job description")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_K, help="Candidates to print")
+    parser.add_argument("--scoring", choices=["bm25", "tfidf"], default="bm25")
+    args = parser.parse_args()
+
+    with open(args.job_description) as f:
+        job_description = f.read()
+    index = CandidateIndex.build(list(_load_records(args.results)), scoring=args.scoring)
+    print(json.dumps(index.rank(job_description, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
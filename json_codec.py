@@ -0,0 +1,90 @@
+"""
+JSON encoding for the HTTP boundary, the result cache and batch output.
+
+Results travel through the app as Python objects and are serialized exactly
+once, here. orjson is used when it is installed (it is several times faster
+than the standard library and writes bytes directly); otherwise the standard
+json module is used with the same compact separators.
+
+Output is compact by default; JSON_PRETTY=1 indents responses for debugging.
+
+Sets, objects with to_dict, Decimals and numpy values are converted
+explicitly, and both backends accept the same types. Anything else raises
+TypeError, as the json module does, instead of being written as its str().
+"""
+import dataclasses
+import datetime
+import json
+import os
+import uuid
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PRETTY = os.getenv('JSON_PRETTY', '0').lower() in ('1', 'true', 'yes', 'on')
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+if orjson is not None:
+    # Dataclasses go through _default, so the result models serialize via to_dict as with json
+    _OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATACLASS
+        | (orjson.OPT_INDENT_2 if PRETTY else 0)
+    )
+
+    def _default(value):
+        # Objects orjson does not know natively, and dataclasses (passed through);
+        # datetimes, UUIDs and contiguous numpy arrays are handled by orjson itself
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        if hasattr(value, 'to_dict'):
+            return value.to_dict()
+        if isinstance(value, Decimal):
+            return str(value)
+        if hasattr(value, 'tolist'):
+            # numpy values OPT_SERIALIZE_NUMPY rejects (e.g. non-contiguous arrays)
+            return value.tolist()
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return dataclasses.asdict(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def dumpb(value):
+        """Serialize to UTF-8 bytes"""
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    _SEPARATORS = (', ', ': ') if PRETTY else (',', ':')
+
+    def _default(value):
+        # The types orjson serializes natively, converted the way orjson does
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        if hasattr(value, 'to_dict'):
+            return value.to_dict()
+        if isinstance(value, Decimal):
+            return str(value)
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return dataclasses.asdict(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def dumpb(value):
+        """Serialize to UTF-8 bytes"""
+        return json.dumps(
+            value, default=_default, ensure_ascii=False, separators=_SEPARATORS, indent=2 if PRETTY else None
+        ).encode('utf-8')
+
+    loads = json.loads
+
+
+def dumps(value):
+    """Serialize to a str"""
+    return dumpb(value).decode('utf-8')
@@ -0,0 +1,367 @@
+"""
+Local heuristic ATS scorer that runs without Gemini.
+
+Scores the same eight weighted categories as the ATS prompt (see
+ats_score_checker.CATEGORIES) from signals that are cheap to read off the
+extracted text: section presence, quantified bullets, action verbs, repeated
+lines and phrases, extraction quality, skill keyword density and length.
+
+Each resume is reduced to a row of FEATURES with a few precompiled regexes;
+a batch of rows is then scored as one numpy matrix, so thousands of resumes
+per second can be pre-screened on a single core.
+
+ats_score_checker uses it according to ATS_SCORER: "llm" (Gemini only, the
+default), "local" (this scorer only) or "gate" (this scorer first, Gemini
+only for resumes scoring at least ATS_GATE_THRESHOLD).
+"""
+import re
+
+import numpy as np
+
+from ats_score_checker import CATEGORIES
+from local_parser import SECTION_ALIASES, SKILLS_DICTIONARY
+from parsed_document import ParsedDocument
+from prompt_compaction import is_section_header, page_lines
+
+VERSION = "local-ats-v1"
+
+# Column order of the feature matrix
+FEATURES = [
+    "characters",          # extracted characters
+    "words",
+    "lines",
+    "pages",
+    "bullets",             # lines starting with a bullet marker
+    "quantified_bullets",  # bullets containing a number, percentage or amount
+    "action_bullets",      # bullets starting with an action verb
+    "long_bullets",        # bullets over LONG_BULLET_WORDS words
+    "bullet_words",        # words in bullets
+    "sections_required",   # of REQUIRED_SECTIONS present
+    "sections_optional",   # of OPTIONAL_SECTIONS present
+    "duplicate_lines",     # lines repeating an earlier line
+    "top_word_count",      # occurrences of the most repeated content word
+    "content_words",       # words counted for repetition
+    "broken_tokens",       # stray single letters and glued words, typical of bad extraction
+    "odd_characters",      # characters outside printable ASCII and common bullets/dashes
+    "skills",              # distinct dictionary skills
+    "first_person",        # I, me, my, we, our
+    "lowercase_bullets",   # bullets starting with a lowercase letter
+    "double_punctuation",  # ",,", "..", " ," and similar
+    "email",
+    "phone",
+    "links",
+]
+_COLUMN = {name: index for index, name in enumerate(FEATURES)}
+
+REQUIRED_SECTIONS = ("education", "experience", "skills", "projects")
+OPTIONAL_SECTIONS = ("achievements", "positions_of_responsibility", "summary")
+LONG_BULLET_WORDS = 30
+# Text shorter than this is treated as a failed extraction (scanned or image-only PDF)
+MIN_EXTRACTED_CHARACTERS = 200
+
+ACTION_VERBS = frozenset("""
+    accelerated achieved added analyzed architected automated boosted built collaborated conducted
+    configured created cut debugged decreased delivered deployed designed developed drove enabled
+    engineered enhanced established executed expanded grew handled implemented improved increased
+    integrated introduced launched led maintained managed mentored migrated modernized optimized
+    orchestrated organized owned participated planned practiced presented reduced refactored
+    resolved revamped scaled secured served shipped simplified solved spearheaded streamlined
+    tested trained transformed wrote
+""".split())
+
+STOPWORDS = frozenset("""
+    the and for with from that this into using used use was were are has have had its our their
+    also over under within across based per via more than which while will your they them such
+    each been being other some most very
+""".split())
+
+_BULLET_RE = re.compile(r'^[•●▪◦‣⁃∙·○■►*\-–—>➢✓]\s*')
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?\s*(?:%|\+|x\b|k\b|K\b|M\b)|[$₹€£]\s?\d|\b\d{2,}\b|\b\d+(?:\.\d+)?\b')
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'+#.-]*")
+_BROKEN_RE = re.compile(r'(?<![\w.])[b-hj-z](?=\s[a-z])|\b[a-z]{3,}[A-Z][a-z]{3,}')
+_ODD_RE = re.compile(r'[^\x20-\x7e\s•●▪◦‣⁃∙·○■►➢✓–—’‘“”₹€£|]')
+_FIRST_PERSON_RE = re.compile(r"\b(?:I|me|my|we|our|I'm|I've)\b")
+_DOUBLE_PUNCT_RE = re.compile(r'[,;:]{2,}|\.{2}(?!\.)|\s[,;:.](?=\s|$)')
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_PHONE_RE = re.compile(r'(?:\+?\d{1,3}[\s-]?)?(?:\d[\s-]?){10}')
+_LINK_RE = re.compile(r'https?://|www\.|github\.com|linkedin\.com|leetcode\.com', re.IGNORECASE)
+_HEADER_STRIP_RE = re.compile(r'[^a-z ]')
+_TOKEN_SPLIT_RE = re.compile(r'[\s,;|()]+')
+
+# Dictionary skills by number of words; matching token n-grams against these sets is
+# much cheaper than local_parser.find_skills and only the count is needed here
+_SKILL_TERMS = {}
+for _names in SKILLS_DICTIONARY.values():
+    for _name in _names:
+        _SKILL_TERMS.setdefault(len(_name.split()), set()).add(_name.lower())
+
+
+def _lines(source):
+    pages = page_lines(source)
+    return [line for page in pages for line in page], max(len(pages), 1)
+
+
+def count_skills(text):
+    """Number of distinct SKILLS_DICTIONARY skills mentioned in the text"""
+    tokens = [token.rstrip('.:').lower() for token in _TOKEN_SPLIT_RE.split(text) if token]
+    found = set()
+    for size, terms in _SKILL_TERMS.items():
+        if size == 1:
+            found.update(terms.intersection(tokens))
+        else:
+            found.update(term for term in (' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+                         if term in terms)
+    return len(found)
+
+
+def _section_key(line):
+    name = ' '.join(_HEADER_STRIP_RE.sub(' ', line.strip().rstrip(':').lower()).split())
+    if name in ("summary", "professional summary", "profile", "objective", "career objective"):
+        return "summary"
+    return SECTION_ALIASES.get(name)
+
+
+def extract_features(source):
+    """
+    Reduce one resume to its row of FEATURES.
+
+    Args:
+        source (str | ParsedDocument): Resume text or an extracted document
+
+    Returns:
+        list: One float per entry of FEATURES
+    """
+    lines, pages = _lines(source)
+    text = "\n".join(lines)
+    words = _WORD_RE.findall(text)
+
+    bullets = quantified = action = long_bullets = bullet_words = lowercase = 0
+    sections = set()
+    seen = set()
+    duplicates = 0
+    for line in lines:
+        if is_section_header(line):
+            key = _section_key(line)
+            if key:
+                sections.add(key)
+            continue
+        normalized = ' '.join(line.lower().split())
+        if len(normalized) >= 25:
+            if normalized in seen:
+                duplicates += 1
+            seen.add(normalized)
+        match = _BULLET_RE.match(line)
+        if not match:
+            continue
+        body = line[match.end():]
+        bullets += 1
+        body_words = body.split()
+        bullet_words += len(body_words)
+        if len(body_words) > LONG_BULLET_WORDS:
+            long_bullets += 1
+        if _NUMBER_RE.search(body):
+            quantified += 1
+        if body_words and body_words[0].lower().strip(',.:') in ACTION_VERBS:
+            action += 1
+        if body[:1].islower():
+            lowercase += 1
+
+    counts = {}
+    for word in words:
+        word = word.lower()
+        if len(word) > 3 and word not in STOPWORDS:
+            counts[word] = counts.get(word, 0) + 1
+
+    row = [0.0] * len(FEATURES)
+    row[_COLUMN["characters"]] = len(text)
+    row[_COLUMN["words"]] = len(words)
+    row[_COLUMN["lines"]] = len(lines)
+    row[_COLUMN["pages"]] = pages
+    row[_COLUMN["bullets"]] = bullets
+    row[_COLUMN["quantified_bullets"]] = quantified
+    row[_COLUMN["action_bullets"]] = action
+    row[_COLUMN["long_bullets"]] = long_bullets
+    row[_COLUMN["bullet_words"]] = bullet_words
+    row[_COLUMN["sections_required"]] = sum(name in sections for name in REQUIRED_SECTIONS)
+    row[_COLUMN["sections_optional"]] = sum(name in sections for name in OPTIONAL_SECTIONS)
+    row[_COLUMN["duplicate_lines"]] = duplicates
+    row[_COLUMN["top_word_count"]] = max(counts.values(), default=0)
+    row[_COLUMN["content_words"]] = sum(counts.values())
+    row[_COLUMN["broken_tokens"]] = len(_BROKEN_RE.findall(text))
+    row[_COLUMN["odd_characters"]] = len(_ODD_RE.findall(text))
+    row[_COLUMN["skills"]] = count_skills(text)
+    row[_COLUMN["first_person"]] = len(_FIRST_PERSON_RE.findall(text))
+    row[_COLUMN["lowercase_bullets"]] = lowercase
+    row[_COLUMN["double_punctuation"]] = len(_DOUBLE_PUNCT_RE.findall(text))
+    row[_COLUMN["email"]] = 1.0 if _EMAIL_RE.search(text) else 0.0
+    row[_COLUMN["phone"]] = 1.0 if _PHONE_RE.search(text) else 0.0
+    row[_COLUMN["links"]] = min(len(_LINK_RE.findall(text)), 3)
+    if isinstance(source, ParsedDocument):
+        row[_COLUMN["links"]] = max(row[_COLUMN["links"]], min(len(source.links), 3))
+    return row
+
+
+def feature_matrix(sources):
+    """Stack the feature rows of several resumes into an (n, len(FEATURES)) array"""
+    return np.array([extract_features(source) for source in sources], dtype=np.float64).reshape(-1, len(FEATURES))
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _band(value, low, high, falloff):
+    """1 inside [low, high], falling linearly to 0 at `falloff` outside the band"""
+    below = np.clip(1 - (low - value) / falloff, 0, 1)
+    above = np.clip(1 - (value - high) / falloff, 0, 1)
+    return np.where(value < low, below, np.where(value > high, above, 1.0))
+
+
+def score_matrix(features):
+    """
+    Score a feature matrix.
+
+    Args:
+        features (numpy.ndarray): (n, len(FEATURES)) array from feature_matrix
+
+    Returns:
+        tuple: ((n, len(CATEGORIES)) category scores in CATEGORIES order,
+                (n,) weighted overall scores), both 0-100 integers
+    """
+    f = {name: features[:, index] for name, index in _COLUMN.items()}
+    extracted = (f["characters"] >= MIN_EXTRACTED_CHARACTERS).astype(np.float64)
+    bullets = f["bullets"]
+    words = f["words"]
+
+    quantified_share = _ratio(f["quantified_bullets"], bullets)
+    action_share = _ratio(f["action_bullets"], bullets)
+    avg_bullet_words = _ratio(f["bullet_words"], bullets)
+    words_per_page = _ratio(words, f["pages"])
+
+    content_quality = (
+        35 * np.minimum(f["skills"] / 12, 1)
+        + 35 * action_share
+        + 30 * _band(words, 350, 900, 400)
+    )
+    ats_parse_rate = extracted * (
+        40
+        + 30 * np.clip(1 - _ratio(f["odd_characters"], f["characters"]) * 50, 0, 1)
+        + 30 * np.clip(1 - _ratio(f["broken_tokens"], words) * 20, 0, 1)
+    )
+    # Resumes without bullets are judged on the numbers in the whole text
+    quantifying_impact = np.where(
+        bullets > 0,
+        100 * np.minimum(quantified_share / 0.6, 1),
+        20 * np.minimum(f["content_words"] / 200, 1),
+    )
+    repetition_check = 100 - np.minimum(
+        60 * np.minimum(_ratio(f["duplicate_lines"], f["lines"]) * 5, 1)
+        + 40 * np.clip((_ratio(f["top_word_count"], f["content_words"]) - 0.02) * 25, 0, 1),
+        100,
+    )
+    spelling_grammar = 100 - np.minimum(
+        40 * np.minimum(_ratio(f["broken_tokens"], words) * 20, 1)
+        + 30 * _ratio(f["lowercase_bullets"], bullets)
+        + 30 * np.minimum(_ratio(f["double_punctuation"], f["lines"]) * 5, 1),
+        100,
+    )
+    format_score = (
+        30 * np.minimum(bullets / 8, 1)
+        + 25 * _band(avg_bullet_words, 8, 25, 12)
+        + 20 * (1 - _ratio(f["long_bullets"], bullets))
+        + 25 * _band(f["pages"], 1, 2, 2) * _band(words_per_page, 250, 700, 400)
+    )
+    sections = 80 * f["sections_required"] / len(REQUIRED_SECTIONS) + 20 * np.minimum(f["sections_optional"], 1)
+    style = (
+        40 * (1 - np.minimum(_ratio(f["first_person"], words) * 50, 1))
+        + 20 * f["email"]
+        + 20 * f["phone"]
+        + 20 * np.minimum(f["links"] / 2, 1)
+    )
+
+    scores = np.stack([
+        content_quality, ats_parse_rate, quantifying_impact, repetition_check,
+        spelling_grammar, format_score, sections, style,
+    ], axis=1)
+    # Nothing but the parse rate can be judged from a failed extraction
+    scores = np.where(extracted[:, None] > 0, scores, 0)
+    scores = np.rint(np.clip(scores, 0, 100))
+    weights = np.array([weight for _, _, weight in CATEGORIES])
+    overall = np.rint(scores @ weights)
+    return scores.astype(np.int64), overall.astype(np.int64)
+
+
+# Feedback per category: (strength when the score is high, improvement when it is low)
+_FEEDBACK = {
+    'content_quality': ("Relevant technical skills and action-oriented bullets",
+                        "Lead bullets with action verbs and name the technologies you used"),
+    'ats_parse_rate': ("Text extracts cleanly for ATS parsers",
+                       "Use a single-column layout with standard fonts so ATS parsers can read the text"),
+    'quantifying_impact': ("Achievements are backed by numbers",
+                           "Quantify results with numbers, percentages or scale (users, time saved, revenue)"),
+    'repetition_check': ("Varied wording without repeated lines",
+                         "Remove repeated bullets and vary frequently repeated words"),
+    'spelling_grammar': ("Clean punctuation and capitalization",
+                         "Proofread punctuation and start every bullet with a capital letter"),
+    'format': ("Concise bullet-point layout of a suitable length",
+               "Keep bullets to one or two lines and the resume to one or two pages"),
+    'sections': ("All key sections are present",
+                 "Add clearly titled Education, Experience, Skills and Projects sections"),
+    'style': ("Professional tone with complete contact details",
+              "Avoid first-person pronouns and include email, phone and profile links"),
+}
+STRENGTH_THRESHOLD = 80
+IMPROVEMENT_THRESHOLD = 60
+
+
+def _analysis(scores, overall):
+    detailed = {name: int(score) for (_, name, _), score in zip(CATEGORIES, scores)}
+    strengths, improvements, category_analysis = [], [], {}
+    for (key, name, _), score in zip(CATEGORIES, scores):
+        strength, improvement = _FEEDBACK[key]
+        if score >= STRENGTH_THRESHOLD:
+            strengths.append(strength)
+            category_analysis[name] = f"{strength} ({int(score)}/100, local estimate)"
+        else:
+            category_analysis[name] = f"{improvement} ({int(score)}/100, local estimate)"
+            if score < IMPROVEMENT_THRESHOLD:
+                improvements.append(improvement)
+    # The three weakest categories carry the most weight for the overall score
+    weakest = sorted(zip(scores, CATEGORIES), key=lambda item: item[0])[:3]
+    recommendations = [_FEEDBACK[key][1] for score, (key, _, _) in weakest if score < STRENGTH_THRESHOLD]
+    return {
+        'ats_score': int(overall),
+        'detailed_scores': detailed,
+        'category_analysis': category_analysis,
+        'strengths': strengths,
+        'improvements': improvements,
+        'recommendations': recommendations,
+        'scorer': VERSION,
+    }
+
+
+def score_documents(sources):
+    """
+    Score several resumes at once.
+
+    Args:
+        sources (list): Resume texts or ParsedDocuments
+
+    Returns:
+        list: One analysis dict per resume, in the shape analyze_resume returns
+    """
+    scores, overall = score_matrix(feature_matrix(sources))
+    return [_analysis(row, total) for row, total in zip(scores, overall)]
+
+
+def score_resume(source):
+    """
+    Score one resume without calling the model.
+
+    Args:
+        source (str | ParsedDocument): Resume text or an extracted document
+
+    Returns:
+        dict: Analysis results in the shape analyze_resume returns
+    """
+    return score_documents([source])[0]
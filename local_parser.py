@@ -0,0 +1,349 @@
+"""
+Deterministic resume parser that runs without Gemini.
+
+Fills the parts of the parse schema that can be read straight from the
+document: personal_info from the pre-extracted fields and link annotations,
+and education, skills, experience, projects, achievements and positions of
+responsibility from the sections found by header detection. Skills are
+matched against SKILLS_DICTIONARY. A resume parses in a few milliseconds
+once its text has been extracted.
+
+resumeparser uses it according to PARSER_MODE: "llm" (model only, the
+default), "local" (this parser only) or "hybrid" (this parser first, the
+model only when sections are missing, and its answer only fills the gaps).
+"""
+import re
+
+from parsed_document import ParsedDocument, extract_field_info
+from prompt_compaction import dedupe_lines, is_section_header, page_lines, remove_page_furniture
+
+SKILLS_DICTIONARY = {
+    "programming_languages": [
+        "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust", "Kotlin",
+        "Swift", "Ruby", "PHP", "Scala", "Dart", "SQL", "Bash", "MATLAB", "Perl", "Haskell",
+        "Objective-C", "Solidity",
+    ],
+    "frontend_technologies": [
+        "React", "React.js", "Next.js", "Angular", "Vue", "Vue.js", "Svelte", "Redux", "HTML",
+        "HTML5", "CSS", "CSS3", "Tailwind CSS", "Tailwind", "Bootstrap", "Sass", "jQuery",
+        "Material UI", "Chakra UI", "Vite", "Webpack", "React Native", "Flutter",
+    ],
+    "backend_technologies": [
+        "Node.js", "Express", "Express.js", "Flask", "Django", "FastAPI", "Spring", "Spring Boot",
+        "NestJS", "Ruby on Rails", "Laravel", "ASP.NET", ".NET", "GraphQL", "REST", "REST APIs",
+        "MongoDB", "Mongoose", "PostgreSQL", "MySQL", "SQLite", "Redis", "Firebase", "Supabase",
+        "Prisma", "Kafka", "RabbitMQ", "Socket.io", "Elasticsearch",
+    ],
+    "version_control_deployment": [
+        "Git", "GitHub", "GitLab", "Bitbucket", "Docker", "Kubernetes", "AWS", "Azure", "GCP",
+        "Google Cloud", "Heroku", "Netlify", "Vercel", "Render", "Linux", "Nginx", "Jenkins",
+        "GitHub Actions", "CI/CD", "Terraform", "Postman",
+    ],
+    "computer_science_fundamentals": [
+        "Data Structures", "Algorithms", "DSA", "OOP", "OOPS", "Object Oriented Programming",
+        "DBMS", "Operating Systems", "OS", "Computer Networks", "CN", "System Design",
+        "Machine Learning", "Deep Learning", "Software Engineering",
+    ],
+}
+
+# Skill spellings folded onto one term (job_matcher, resume_store), so "ReactJS"
+# in a job description matches "React" in a resume
+SKILL_ALIASES = {
+    "reactjs": "react", "react.js": "react", "nodejs": "node.js", "node": "node.js",
+    "expressjs": "express", "express.js": "express", "vuejs": "vue", "vue.js": "vue",
+    "nextjs": "next.js", "js": "javascript", "ts": "typescript", "golang": "go",
+    "postgres": "postgresql", "mongo": "mongodb", "k8s": "kubernetes", "py": "python",
+    "html5": "html", "css3": "css", "ml": "machine learning", "dl": "deep learning",
+    "rest apis": "rest", "restful": "rest", "oops": "oop", "gcp": "google cloud",
+}
+
+# Canonical section for each header name; headers not listed here are ignored
+SECTION_ALIASES = {
+    "education": "education", "academics": "education", "academic details": "education",
+    "skills": "skills", "technical skills": "skills", "key skills": "skills",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment history": "experience", "internships": "experience", "internship": "experience",
+    "projects": "projects", "personal projects": "projects", "academic projects": "projects",
+    "achievements": "achievements", "awards": "achievements", "honors": "achievements",
+    "certifications": "achievements", "positions of responsibility": "positions_of_responsibility",
+    "leadership": "positions_of_responsibility", "extracurricular activities": "positions_of_responsibility",
+}
+
+PROFESSIONAL_LINK_KEYS = ["github", "leetcode", "linkedin", "gfg", "portfolio", "codechef", "hackerrank", "website"]
+
+_BULLET_RE = re.compile(r'^[\s•●▪◦‣⁃∙·○■►*\-–—>➢✓]+')
+_SPLIT_RE = re.compile(r'\s*[,|;]\s*|\s+[–—]\s+')
+_YEAR_RANGE_RE = re.compile(
+    r'(?:(?:[A-Z][a-z]{2,8}\.?\s+)?(?:19|20)\d{2})'
+    r'(?:\s*(?:-|–|—|to)\s*(?:(?:[A-Z][a-z]{2,8}\.?\s+)?(?:19|20)\d{2}|[Pp]resent|[Cc]urrent))?'
+)
+_SCORE_RE = re.compile(r'((?:C?GPA|SGPA|CPI)\s*:?\s*\d+(?:\.\d+)?(?:\s*/\s*\d+)?|\d+(?:\.\d+)?\s*(?:%|C?GPA|CPI))', re.IGNORECASE)
+_DEGREE_RE = re.compile(
+    r'\b(?:B\.?\s?Tech|M\.?\s?Tech|B\.?\s?E\b|M\.?\s?E\b|B\.?\s?Sc|M\.?\s?Sc|B\.?\s?C\.?\s?A|M\.?\s?C\.?\s?A|'
+    r'B\.?\s?Com|M\.?\s?Com|MBA|BBA|Ph\.?\s?D|Bachelor|Master|Diploma|Senior Secondary|Higher Secondary|'
+    r'Secondary|Intermediate|Matriculation|Class\s+(?:X|XII|10|12)|\(X{1,2}I{0,2}\)|1[02]th)',
+    re.IGNORECASE
+)
+_INSTITUTE_RE = re.compile(r'\b(?:Institute|College|School|Academy|IIT|NIT|IIIT|Vidyalaya)\b', re.IGNORECASE)
+_BOARD_RE = re.compile(r'\b(?:University|CBSE|ICSE|ISC|Board|State Board)\b', re.IGNORECASE)
+_URL_RE = re.compile(
+    r'(?:https?://|www\.)[^\s,|)]+|[\w-]+(?:\.[\w-]+)*\.(?:com|io|dev|app|org|net|in|me|co|ai|tech|site|xyz)\b(?:/[^\s,|)]*)?'
+)
+
+
+def _compile_skills(dictionary):
+    compiled = {}
+    for category, names in dictionary.items():
+        canonical = {name.lower(): name for name in names}
+        # Longest names first, so "React Native" wins over "React"
+        alternatives = "|".join(re.escape(name) for name in sorted(canonical, key=len, reverse=True))
+        pattern = re.compile(r'(?<![\w+#.])(?:' + alternatives + r')(?![\w+#]|\.\w)', re.IGNORECASE)
+        compiled[category] = (pattern, canonical)
+    return compiled
+
+
+_SKILL_PATTERNS = _compile_skills(SKILLS_DICTIONARY)
+
+
+def empty_result():
+    """The parse schema with every field empty"""
+    return {
+        "personal_info": {
+            "full_name": "",
+            "location": "",
+            "contact": {
+                "phone": "",
+                "email": "",
+                "professional_links": {key: "" for key in PROFESSIONAL_LINK_KEYS}
+            }
+        },
+        "education": [],
+        "skills": {category: [] for category in SKILLS_DICTIONARY},
+        "experience": [],
+        "projects": [],
+        "achievements": [],
+        "positions_of_responsibility": []
+    }
+
+
+def find_skills(text):
+    """Return {category: [skills]} for every dictionary skill mentioned in the text, in order of appearance"""
+    skills = {}
+    for category, (pattern, canonical) in _SKILL_PATTERNS.items():
+        found = []
+        for match in pattern.findall(text):
+            name = canonical[match.lower()]
+            if name not in found:
+                found.append(name)
+        skills[category] = found
+    return skills
+
+
+def _is_bullet(line):
+    return bool(_BULLET_RE.match(line)) and not line.lstrip().startswith(("-1", "--"))
+
+
+def _strip_bullet(line):
+    return _BULLET_RE.sub('', line).strip()
+
+
+def _section_name(line):
+    name = re.sub(r'[^a-z ]', ' ', line.strip().rstrip(':').lower())
+    return SECTION_ALIASES.get(re.sub(r'\s+', ' ', name).strip())
+
+
+def split_sections(lines):
+    """
+    Group lines under the section header they follow.
+
+    Returns:
+        dict: {section: [lines]}; lines before the first header are under "header"
+    """
+    sections = {"header": []}
+    current = "header"
+    for line in lines:
+        if is_section_header(line):
+            current = _section_name(line) or "other"
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _document_lines(source):
+    pages, _ = remove_page_furniture(page_lines(source))
+    lines, _ = dedupe_lines([line for page in pages for line in page])
+    return lines
+
+
+def _parse_personal_info(result, fields, links):
+    info = result["personal_info"]
+    info["full_name"] = fields.get("full_name", "")
+    info["location"] = fields.get("location", "")
+    contact = info["contact"]
+    contact["phone"] = fields.get("phone", "")
+    contact["email"] = fields.get("email", "")
+    professional_links = contact["professional_links"]
+    for key, url in (fields.get("professional_links") or {}).items():
+        professional_links[key] = url
+    # Link annotations carry the full URL, so they win over the visible text
+    for key in PROFESSIONAL_LINK_KEYS:
+        if isinstance(links.get(key), str):
+            professional_links[key] = links[key]
+
+
+def _parse_education(lines):
+    entries = []
+    for line in lines:
+        line = _strip_bullet(line)
+        if _DEGREE_RE.search(line) or not entries:
+            entries.append({"degree": "", "institute": "", "board_university": "", "score": "", "year": ""})
+        entry = entries[-1]
+        score = _SCORE_RE.search(line)
+        if score and not entry["score"]:
+            entry["score"] = score.group(1).strip()
+        for part in _SPLIT_RE.split(line):
+            part = part.strip()
+            if not part:
+                continue
+            year = _YEAR_RANGE_RE.fullmatch(part)
+            if year:
+                entry["year"] = entry["year"] or part
+            elif _DEGREE_RE.search(part) and not entry["degree"]:
+                entry["degree"] = part
+            elif _INSTITUTE_RE.search(part) and not entry["institute"]:
+                entry["institute"] = part
+            elif _BOARD_RE.search(part) and not entry["board_university"]:
+                entry["board_university"] = part
+            elif not entry["year"] and _YEAR_RANGE_RE.search(part) and not _SCORE_RE.fullmatch(part):
+                entry["year"] = _YEAR_RANGE_RE.search(part).group(0)
+    return [entry for entry in entries if entry["degree"] or entry["institute"]]
+
+
+def _entries(lines):
+    """Split a section into (title line, [bullet texts]) entries"""
+    entries = []
+    for line in lines:
+        if _is_bullet(line) and entries:
+            entries[-1][1].append(_strip_bullet(line))
+        elif _is_bullet(line):
+            entries.append(("", [_strip_bullet(line)]))
+        else:
+            entries.append((line, []))
+    return entries
+
+
+def _parse_experience(lines):
+    experience = []
+    for title_line, bullets in _entries(lines):
+        parts = [part.strip() for part in _SPLIT_RE.split(title_line) if part.strip()]
+        duration = ""
+        rest = []
+        for part in parts:
+            if not duration and _YEAR_RANGE_RE.search(part) and len(part) <= 40:
+                duration = part
+            else:
+                rest.append(part)
+        rest += [""] * 3
+        experience.append({
+            "title": rest[0],
+            "company": rest[1],
+            "location": rest[2],
+            "duration": duration,
+            "achievements": bullets
+        })
+    return experience
+
+
+def _project_links(name, title_line, links):
+    project_links = {"live_site": "", "github_repo": ""}
+    for url in _URL_RE.findall(title_line):
+        if "github.com" in url.lower():
+            project_links["github_repo"] = url
+        else:
+            project_links["live_site"] = url
+    key = name.strip().lower()
+    if not key:
+        # "" is a substring of every project name, so a blank name matches nothing
+        return project_links
+    for project, urls in links.items():
+        if isinstance(urls, dict) and project and (project in key or key in project):
+            project_links["live_site"] = project_links["live_site"] or urls.get("live", "")
+            project_links["github_repo"] = project_links["github_repo"] or urls.get("github", "")
+    return project_links
+
+
+def _parse_projects(lines, links):
+    projects = []
+    for title_line, bullets in _entries(lines):
+        name = re.split(r'\s*[|(]\s*|\s+[–—-]\s+', title_line, maxsplit=1)[0].strip() if title_line else ""
+        technologies = []
+        for skills in find_skills(" , ".join([title_line] + bullets)).values():
+            technologies.extend(skills)
+        projects.append({
+            "name": name,
+            "technologies": technologies,
+            "links": _project_links(name, title_line, links),
+            "achievements": bullets
+        })
+    return projects
+
+
+def parse_document(source):
+    """
+    Parse a resume without calling the model.
+
+    Args:
+        source (str | ParsedDocument): Resume text or an extracted document
+
+    Returns:
+        dict: A result in the same schema as the model output
+    """
+    links = source.links if isinstance(source, ParsedDocument) else {}
+    lines = _document_lines(source)
+    # Page text is whitespace-collapsed, so the fields are read from the layout lines instead
+    fields = extract_field_info("\n".join(lines))
+    sections = split_sections(lines)
+    result = empty_result()
+    _parse_personal_info(result, fields, links)
+
+    result["education"] = _parse_education(sections.get("education", []))
+    # Prefer the skills section; fall back to the whole resume when there is none
+    skills_text = "\n".join(sections.get("skills") or lines)
+    result["skills"] = find_skills(skills_text)
+    result["experience"] = _parse_experience(sections.get("experience", []))
+    result["projects"] = _parse_projects(sections.get("projects", []), links)
+    result["achievements"] = [_strip_bullet(line) for line in sections.get("achievements", [])]
+    result["positions_of_responsibility"] = [
+        _strip_bullet(line) for line in sections.get("positions_of_responsibility", [])
+    ]
+    return result
+
+
+def _is_empty(value):
+    if isinstance(value, dict):
+        return all(_is_empty(item) for item in value.values())
+    return value in (None, "", [])
+
+
+def missing_sections(result):
+    """Top-level sections the local parser could not fill"""
+    return [key for key, value in result.items() if _is_empty(value)]
+
+
+def fill_gaps(local, model):
+    """
+    Fill the empty fields of a local result with the model's answer.
+
+    Values the local parser found are kept; the model only supplies what is missing.
+    """
+    if not isinstance(model, dict):
+        return local
+    merged = dict(local)
+    for key, value in model.items():
+        current = merged.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merged[key] = fill_gaps(current, value)
+        elif _is_empty(current):
+            merged[key] = value
+    return merged
@@ -0,0 +1,260 @@
+"""
+Single-pass document model for uploaded resumes.
+
+A ParsedDocument walks the pages of a PDF exactly once and keeps everything
+the later stages need: the cleaned text of each page, span layout, link
+annotations with their page and bounding box, the categorized links and the
+pre-extracted contact fields. Prompt building, link enrichment and ATS
+scoring all read from this object instead of reopening the PDF.
+"""
+import os
+import re
+import time
+from collections import namedtuple
+
+import telemetry
+
+log = telemetry.get_logger(__name__)
+
+Span = namedtuple("Span", ["text", "bbox", "font", "size", "flags"])
+LinkAnnotation = namedtuple("LinkAnnotation", ["url", "page", "bbox"])
+PageContent = namedtuple("PageContent", ["number", "text", "lines", "spans"])
+
+# Pages read from an upload; the rest of a huge document is ignored (0 reads every page)
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+
+# Projects whose links are grouped under their own key, matched against the URL with spaces removed
+KNOWN_PROJECTS = ["workify", "school management", "food delivery"]
+
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_WHITESPACE_RE = re.compile(r'\s+')
+_PHONE_RE = re.compile(r'(\+\d{1,4}-\d{10})')
+_EMAIL_RE = re.compile(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)')
+
+
+def pdf_engine():
+    """Return the PyMuPDF module, importing it on first use so startup does not pay for it"""
+    import fitz  # PyMuPDF
+    return fitz
+
+
+def open_pdf(source):
+    """Open a PDF from raw bytes (e.g. an upload stream) or from a file path"""
+    fitz = pdf_engine()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"PDF file not found at {source}")
+    return fitz.open(source)
+
+
+def raise_pdf_error(e):
+    """Translate PyMuPDF errors into the ValueErrors reported to the user"""
+    fitz = pdf_engine()
+    if isinstance(e, fitz.FileDataError):
+        log.warning("PDF file is corrupted or invalid: %s", e)
+        raise ValueError("The PDF file appears to be corrupted or invalid. Please ensure it's a valid PDF file.")
+    if isinstance(e, fitz.EmptyFileError):
+        log.warning("PDF file is empty: %s", e)
+        raise ValueError("The PDF file is empty. Please upload a non-empty PDF file.")
+    log.warning("Error extracting text from PDF (%s): %s", type(e).__name__, e)
+    raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+
+def clean_page_text(page_text):
+    """Collapse the whitespace of a page the same way for every extraction path"""
+    page_text = page_text.strip()
+    # Remove multiple newlines
+    page_text = _BLANK_LINES_RE.sub('\n', page_text)
+    # Remove multiple spaces
+    return _WHITESPACE_RE.sub(' ', page_text)
+
+
+def add_categorized_link(links, url):
+    """Add a URL to a links dict under its category (github, linkedin, project, ...)"""
+    lower_url = url.lower()
+    if "github.com" in lower_url:
+        links["github"] = url
+    elif "linkedin.com" in lower_url:
+        links["linkedin"] = url
+    elif "leetcode.com" in lower_url:
+        links["leetcode"] = url
+    elif "geeksforgeeks.org" in lower_url or "gfg" in lower_url:
+        links["gfg"] = url
+    elif "portfolio" in lower_url or "personal" in lower_url:
+        links["portfolio"] = url
+    else:
+        # Store project links
+        for project in KNOWN_PROJECTS:
+            if project.replace(" ", "") in lower_url:
+                # github.com URLs are caught by the first branch, so project links are live sites
+                links.setdefault(project, {})["live"] = url
+    return links
+
+
+def categorize_links(urls):
+    """Categorize a sequence of URLs into the links dict used by the prompt"""
+    links = {}
+    for url in urls:
+        add_categorized_link(links, url)
+    return links
+
+
+def extract_field_info(resume_text):
+    """Extract basic fields before sending to AI to ensure accurate information"""
+    info = {}
+
+    # Split text into lines and clean them
+    lines = [line.strip() for line in resume_text.split('\n') if line.strip()]
+
+    # Extract name (usually first line)
+    if lines:
+        info["full_name"] = lines[0]
+
+    # Extract location (usually second line)
+    if len(lines) > 1:
+        info["location"] = lines[1]
+
+    # Extract contact info
+    for line in lines:
+        # Extract phone number
+        phone_match = _PHONE_RE.search(line)
+        if phone_match:
+            info["phone"] = phone_match.group(1)
+
+        # Extract email
+        email_match = _EMAIL_RE.search(line)
+        if email_match:
+            info["email"] = email_match.group(1)
+
+        # Extract professional links
+        if '|' in line:
+            info["professional_links"] = {}
+            for link in line.split('|'):
+                link = link.strip()
+                lower_link = link.lower()
+                if 'github' in lower_link:
+                    info["professional_links"]["github"] = link
+                elif 'linkedin' in lower_link:
+                    info["professional_links"]["linkedin"] = link
+                elif 'leetcode' in lower_link:
+                    info["professional_links"]["leetcode"] = link
+                elif 'portfolio' in lower_link:
+                    info["professional_links"]["portfolio"] = link
+                elif 'gfg' in lower_link:
+                    info["professional_links"]["gfg"] = link
+
+    return info
+
+
+def _read_page(page, number):
+    """Collect text lines, spans and link annotations of a page from one layout pass"""
+    lines = []
+    spans = []
+    layout = page.get_text("dict", flags=pdf_engine().TEXTFLAGS_TEXT)
+    for block in layout["blocks"]:
+        for line in block.get("lines", ()):
+            line_text = ""
+            for span in line["spans"]:
+                line_text += span["text"]
+                spans.append(Span(span["text"], tuple(span["bbox"]), span["font"], span["size"], span["flags"]))
+            lines.append(line_text)
+
+    text = clean_page_text("\n".join(lines))
+
+    annotations = [
+        LinkAnnotation(link["uri"], number, tuple(link["from"]))
+        for link in page.get_links()
+        if "uri" in link
+    ]
+    return PageContent(number, text, lines, spans), annotations
+
+
+class ParsedDocument:
+    """Everything extracted from a resume PDF in a single walk over its pages"""
+
+    def __init__(self, pages, link_annotations, timings=None):
+        self.pages = pages
+        self.link_annotations = link_annotations
+        self.text = "".join(page.text + "\n" for page in pages if page.text)
+        start = time.perf_counter()
+        self.links = categorize_links(link.url for link in link_annotations)
+        self.fields = extract_field_info(self.text)
+        # Seconds per extraction stage; from_pdf adds pdf_open and text_extraction
+        self.timings = dict(timings or {})
+        self.timings["link_extraction"] = time.perf_counter() - start
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def to_payload(self):
+        """
+        Compact, picklable form used to ship a document between processes.
+
+        Span layout is dropped; pages keep their number, text and lines, and
+        links keep their URL, page and bbox. Stage timings travel along so
+        the parent process can record them.
+        """
+        return (
+            [(page.number, page.text, page.lines) for page in self.pages],
+            [tuple(link) for link in self.link_annotations],
+            {stage: seconds for stage, seconds in self.timings.items() if stage != "link_extraction"},
+        )
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Rebuild a document from to_payload() output"""
+        pages, links, timings = payload
+        return cls(
+            [PageContent(number, text, lines, ()) for number, text, lines in pages],
+            [LinkAnnotation(*link) for link in links],
+            timings,
+        )
+
+    @classmethod
+    def from_pdf(cls, source):
+        """
+        Build a ParsedDocument from a PDF.
+
+        Args:
+            source (bytes | str): Raw PDF bytes or a path to a PDF file
+
+        Returns:
+            ParsedDocument: The extracted document
+
+        Raises:
+            ValueError: If the PDF cannot be opened or contains no text
+        """
+        start = time.perf_counter()
+        try:
+            doc = open_pdf(source)
+        except Exception as e:
+            raise_pdf_error(e)
+        opened = time.perf_counter()
+
+        try:
+            if doc.page_count == 0:
+                raise ValueError("PDF file is empty or corrupted")
+
+            pages = []
+            link_annotations = []
+            for number, page in enumerate(doc, start=1):
+                if MAX_PAGES and number > MAX_PAGES:
+                    log.info("Ignoring pages after %d of %d", MAX_PAGES, doc.page_count)
+                    break
+                page_content, annotations = _read_page(page, number)
+                pages.append(page_content)
+                link_annotations.extend(annotations)
+        except Exception as e:
+            raise_pdf_error(e)
+        finally:
+            doc.close()
+
+        timings = {"pdf_open": opened - start, "text_extraction": time.perf_counter() - opened}
+        document = cls(pages, link_annotations, timings)
+        if not document.text.strip():
+            raise ValueError("No text content found in PDF. The file might be scanned or contain only images.")
+
+        log.debug("Extracted %d characters and %d links from %d pages", len(document.text), len(link_annotations), len(pages))
+        return document
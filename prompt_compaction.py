@@ -0,0 +1,263 @@
+"""
+Token-budgeted compaction of resume text before it is put into a prompt.
+
+Long CVs are dominated by text the model does not need: the same header and
+footer on every page, page numbers and bullets pasted twice. compact_resume
+removes those, then trims the remaining text to a token budget section by
+section, so every section header survives and long sections give up their
+last lines first.
+
+PROMPT_TOKEN_BUDGET sets the budget (default 4000, 0 disables trimming) and
+PROMPT_COMPACTION=0 turns the whole stage off.
+"""
+import os
+import re
+from collections import Counter, namedtuple
+
+from parsed_document import ParsedDocument
+import telemetry
+from text_extraction import PAGE_BREAK
+
+log = telemetry.get_logger(__name__)
+
+VERSION = "compact-v1"
+DEFAULT_TOKEN_BUDGET = 4000
+
+ENABLED = os.getenv('PROMPT_COMPACTION', '1').lower() not in ('0', 'false', 'no', 'off')
+TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET))
+
+# Part of the prompt versions, so cached results are keyed by the compaction settings
+CACHE_TAG = f"{VERSION}:{TOKEN_BUDGET}" if ENABLED else "raw"
+
+# Lines looked at for headers and footers at each end of a page
+EDGE_LINES = 3
+# Duplicate lines shorter than this are kept: they are usually skills or dates
+MIN_DUPLICATE_CHARS = 25
+TRUNCATION_MARKER = "[...]"
+
+SECTION_NAMES = {
+    "summary", "professional summary", "profile", "objective", "career objective",
+    "education", "experience", "work experience", "professional experience",
+    "employment history", "internships", "internship", "projects", "personal projects",
+    "academic projects", "skills", "technical skills", "key skills", "achievements",
+    "awards", "honors", "certifications", "certificates", "publications",
+    "positions of responsibility", "leadership", "extracurricular activities",
+    "activities", "volunteering", "languages", "interests", "hobbies", "contact",
+    "coursework", "relevant coursework", "references",
+}
+
+_PAGE_NUMBER_RE = re.compile(r'^(?:page\s*)?[-–— ]*\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?[-–— ]*$', re.IGNORECASE)
+_DIGITS_RE = re.compile(r'\d+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_BULLET_RE = re.compile(r'^[\s•●▪◦‣⁃∙·○■►*\-–—>➢✓]+')
+_HEADER_STRIP_RE = re.compile(r'[^a-z ]')
+
+CompactedText = namedtuple("CompactedText", ["text", "original_tokens", "tokens", "removed_lines", "truncated"])
+
+
+def estimate_tokens(text):
+    """Approximate the Gemini token count of a text (about 4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _normalize(line):
+    line = _BULLET_RE.sub('', line)
+    return _WHITESPACE_RE.sub(' ', line).strip().lower()
+
+
+def is_section_header(line):
+    """True for short lines that name a resume section (e.g. "EDUCATION", "Projects:")"""
+    stripped = line.strip().rstrip(':').strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    name = _WHITESPACE_RE.sub(' ', _HEADER_STRIP_RE.sub(' ', stripped.lower())).strip()
+    if name in SECTION_NAMES:
+        return True
+    letters = stripped.replace(' ', '').replace('&', '')
+    return letters.isalpha() and letters.isupper() and len(letters) > 3
+
+
+def page_lines(source):
+    """
+    Split resume text into pages of non-empty stripped lines.
+
+    Args:
+        source (str | ParsedDocument): A document, or text with PAGE_BREAK
+            between its pages (text_extraction output); other text is one page
+
+    Returns:
+        list: One list of lines per page
+    """
+    if isinstance(source, ParsedDocument):
+        pages = [page.lines or page.text.split('\n') for page in source.pages]
+    else:
+        pages = [page.split('\n') for page in source.split(PAGE_BREAK)]
+    return [[line.strip() for line in lines if line.strip()] for lines in pages]
+
+
+def remove_page_furniture(pages):
+    """
+    Drop page numbers and the header/footer lines repeated across pages.
+
+    A line at the top or bottom of a page that shows up (digits ignored) on at
+    least half of the pages is kept only on the first page it appears on, so a
+    name in the running header still reaches the model once.
+
+    Returns:
+        tuple: (pages, number of removed lines)
+    """
+    removed = 0
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter()
+        for lines in pages:
+            edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+            counts.update({_DIGITS_RE.sub('#', _normalize(line)) for line in edges})
+        threshold = max(2, (len(pages) + 1) // 2)
+        repeated = {key for key, count in counts.items() if count >= threshold and key}
+
+    seen = set()
+    cleaned = []
+    for lines in pages:
+        kept = []
+        for index, line in enumerate(lines):
+            at_edge = index < EDGE_LINES or index >= len(lines) - EDGE_LINES
+            if at_edge and _PAGE_NUMBER_RE.match(line):
+                removed += 1
+                continue
+            key = _DIGITS_RE.sub('#', _normalize(line))
+            if at_edge and key in repeated:
+                if key in seen:
+                    removed += 1
+                    continue
+                seen.add(key)
+            kept.append(line)
+        cleaned.append(kept)
+    return cleaned, removed
+
+
+def dedupe_lines(lines):
+    """
+    Drop bullets and sentences that repeat an earlier line.
+
+    Returns:
+        tuple: (lines, number of removed lines)
+    """
+    seen = set()
+    kept = []
+    for line in lines:
+        key = _normalize(line)
+        if len(key) >= MIN_DUPLICATE_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return kept, len(lines) - len(kept)
+
+
+def trim_to_budget(lines, budget):
+    """
+    Trim lines to a token budget while keeping every section header.
+
+    The text is split at section headers and the section with the most
+    tokens loses its last line until the whole text fits. Trimmed sections
+    end with a "[...]" marker.
+
+    Returns:
+        tuple: (lines, True if anything was trimmed)
+    """
+    total = sum(estimate_tokens(line) + 1 for line in lines)
+    if budget <= 0 or total <= budget:
+        return lines, False
+
+    # Each section is [header or None, body lines, body tokens, trimmed]
+    sections = [[None, [], 0, False]]
+    for line in lines:
+        if is_section_header(line):
+            sections.append([line, [], 0, False])
+        else:
+            sections[-1][1].append(line)
+            sections[-1][2] += estimate_tokens(line) + 1
+    marker_tokens = estimate_tokens(TRUNCATION_MARKER) + 1
+
+    while total > budget:
+        section = max(sections, key=lambda s: s[2])
+        if not section[1]:
+            break
+        line = section[1].pop()
+        cost = estimate_tokens(line) + 1
+        section[2] -= cost
+        total -= cost
+        if not section[3]:
+            section[3] = True
+            total += marker_tokens
+
+    trimmed = []
+    for header, body, _, truncated in sections:
+        if header is not None:
+            trimmed.append(header)
+        trimmed.extend(body)
+        if truncated:
+            trimmed.append(TRUNCATION_MARKER)
+    return trimmed, True
+
+
+def _trim_characters(text, budget):
+    # Text without line breaks (e.g. a collapsed page) can only be cut at a word boundary
+    limit = budget * 4
+    if budget <= 0 or len(text) <= limit:
+        return text, False
+    cut = text.rfind(' ', 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip() + " " + TRUNCATION_MARKER, True
+
+
+def compact_resume(source, budget=None):
+    """
+    Compact resume text for a prompt.
+
+    Args:
+        source (str | ParsedDocument): Resume text or an extracted document;
+            both are compacted per page (see page_lines)
+        budget (int): Token budget; defaults to PROMPT_TOKEN_BUDGET, 0 disables trimming
+
+    Returns:
+        CompactedText: The compacted text with its token counts before and after
+    """
+    budget = TOKEN_BUDGET if budget is None else budget
+    original = source.text if isinstance(source, ParsedDocument) else source
+    original_tokens = estimate_tokens(original)
+
+    pages, removed = remove_page_furniture(page_lines(source))
+    lines = [line for page in pages for line in page]
+    lines, duplicates = dedupe_lines(lines)
+    if len(lines) == 1:
+        text, truncated = _trim_characters(lines[0], budget)
+    else:
+        lines, truncated = trim_to_budget(lines, budget)
+        text = "\n".join(lines)
+
+    return CompactedText(text, original_tokens, estimate_tokens(text), removed + duplicates, truncated)
+
+
+def prepare_resume_text(source, label="resume"):
+    """
+    Return the resume text to put in a prompt, compacted when compaction is enabled.
+
+    Args:
+        source (str | ParsedDocument): Resume text or an extracted document
+        label (str): Name of the caller, used in the log line and as the
+            prompt label of the resume_prompt_tokens_saved metric
+
+    Returns:
+        str: The text for the prompt
+    """
+    if not ENABLED:
+        return source.text if isinstance(source, ParsedDocument) else source.replace(PAGE_BREAK, '\n')
+    result = compact_resume(source)
+    telemetry.PROMPT_TOKENS_SAVED.observe(max(result.original_tokens - result.tokens, 0), label.lower())
+    log.debug(
+        "Compacted %s text: %d -> %d tokens (saved %d, removed %d lines%s)",
+        label, result.original_tokens, result.tokens, result.original_tokens - result.tokens,
+        result.removed_lines, ", trimmed to budget" if result.truncated else "",
+    )
+    return result.text
@@ -0,0 +1,216 @@
+"""
+Content-addressed cache for model results.
+
+Results are keyed on a hash of the uploaded PDF bytes together with the model
+name, generation config, prompt version and the text extraction settings, so
+re-uploading the same resume returns the stored result without another Gemini
+round trip. Changing the model, its config, the prompt or how the PDF is read
+(PDF_TEXT_BACKEND, PDF_MAX_PAGES) produces a new key and the old entries
+simply age out.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import json_codec
+import telemetry
+
+log = telemetry.get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+def make_cache_key(data, model_name, generation_config=None, prompt_version="", extraction=None):
+    """
+    Build a cache key for an uploaded document.
+
+    Args:
+        data (bytes): Raw bytes of the uploaded file
+        model_name (str): Name of the model that produces the result
+        generation_config (dict): Generation parameters passed to the model
+        prompt_version (str): Version tag of the prompt template
+        extraction (dict): Settings that change the text sent to the model,
+            e.g. the PDF text backend and page cap
+
+    Returns:
+        str: Hex digest identifying the (document, extraction, model, prompt) combination
+    """
+    digest = hashlib.sha256(data)
+    meta = json.dumps({
+        "model": model_name,
+        "generation_config": generation_config or {},
+        "prompt_version": prompt_version,
+        "extraction": extraction or {},
+    }, sort_keys=True)
+    digest.update(b"\0")
+    digest.update(meta.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MemoryCacheBackend:
+    """In-process LRU store with a size limit and per-entry TTL."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk store backed by SQLite, so cached results survive restarts."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json_codec.loads(value)
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        payload = json_codec.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM result_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+
+
+class NullCacheBackend:
+    """Backend used when caching is disabled."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class ResultCache:
+    """Front end over a cache backend that also counts hits and misses."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            log.warning("Error reading result cache: %s", e)
+            value = None
+        if value is None:
+            self.misses += 1
+            telemetry.CACHE_REQUESTS.inc('miss')
+        else:
+            self.hits += 1
+            telemetry.CACHE_REQUESTS.inc('hit')
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            log.warning("Error writing result cache: %s", e)
+
+    def clear(self):
+        self.backend.clear()
+
+
+def create_cache_from_env(default_path=None):
+    """
+    Build a ResultCache from environment variables.
+
+    RESULT_CACHE_BACKEND selects the backend (memory, sqlite or none),
+    RESULT_CACHE_MAX_ENTRIES and RESULT_CACHE_TTL tune the memory LRU and
+    RESULT_CACHE_PATH sets the SQLite file location.
+    """
+    backend_name = os.getenv("RESULT_CACHE_BACKEND", "memory").lower()
+    ttl = int(os.getenv("RESULT_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+    if backend_name == "sqlite":
+        path = os.getenv("RESULT_CACHE_PATH", default_path or "result_cache.sqlite3")
+        backend = SQLiteCacheBackend(path, ttl=ttl)
+    elif backend_name == "memory":
+        max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        backend = MemoryCacheBackend(max_entries=max_entries, ttl=ttl)
+    elif backend_name in ("none", "off", "disabled"):
+        backend = NullCacheBackend()
+    else:
+        raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {backend_name}")
+
+    return ResultCache(backend)
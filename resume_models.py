@@ -0,0 +1,308 @@
+"""
+Typed, slotted models of the parse result and the ATS report.
+
+The models mirror the JSON schema the parse prompt asks for. from_dict is a
+tolerant normalizer: missing or null keys get their defaults, numbers become
+strings where the schema has strings, a single string becomes a one-item
+list, malformed entries are dropped and unknown keys are ignored. Code that
+reads a normalized result can therefore use plain attribute access without
+guarding against KeyError. Only the top level of a parse result must be a
+dict; ParsedResume.from_dict raises ValueError for anything else.
+
+Every class uses __slots__, string lists are tuples and skill and technology
+names are interned, so a batch pipeline can hold hundreds of thousands of
+parsed resumes in a fraction of the memory the equivalent dicts take.
+to_dict() converts back to the JSON schema.
+"""
+import sys
+from dataclasses import dataclass, field
+
+SKILL_CATEGORIES = (
+    "programming_languages", "frontend_technologies", "backend_technologies",
+    "version_control_deployment", "computer_science_fundamentals",
+)
+PROFESSIONAL_LINK_KEYS = ("github", "leetcode", "linkedin", "gfg", "portfolio", "codechef", "hackerrank", "website")
+
+
+def _str(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, bool):
+        return ""
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        return ", ".join(item for item in (_str(item) for item in value) if item)
+    return ""
+
+
+def _strings(value, intern=False):
+    """Tuple of the non-empty strings in a list (or a single string)"""
+    if value is None:
+        return ()
+    if not isinstance(value, (list, tuple)):
+        value = (value,)
+    items = (_str(item) for item in value if not isinstance(item, dict))
+    if intern:
+        return tuple(sys.intern(item) for item in items if item)
+    return tuple(item for item in items if item)
+
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _entries(value, model):
+    """Models built from the dict items of a list (or a single dict)"""
+    if isinstance(value, dict):
+        value = (value,)
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [model.from_dict(item) for item in value if isinstance(item, dict)]
+
+
+def _clamp_score(value):
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass(slots=True)
+class ProfessionalLinks:
+    github: str = ""
+    leetcode: str = ""
+    linkedin: str = ""
+    gfg: str = ""
+    portfolio: str = ""
+    codechef: str = ""
+    hackerrank: str = ""
+    website: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        data = _dict(data)
+        return cls(*(_str(data.get(key)) for key in PROFESSIONAL_LINK_KEYS))
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in PROFESSIONAL_LINK_KEYS}
+
+
+@dataclass(slots=True)
+class Contact:
+    phone: str = ""
+    email: str = ""
+    professional_links: ProfessionalLinks = field(default_factory=ProfessionalLinks)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = _dict(data)
+        return cls(_str(data.get("phone")), _str(data.get("email")),
+                   ProfessionalLinks.from_dict(data.get("professional_links")))
+
+    def to_dict(self):
+        return {"phone": self.phone, "email": self.email, "professional_links": self.professional_links.to_dict()}
+
+
+@dataclass(slots=True)
+class PersonalInfo:
+    full_name: str = ""
+    location: str = ""
+    contact: Contact = field(default_factory=Contact)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = _dict(data)
+        return cls(_str(data.get("full_name")), _str(data.get("location")), Contact.from_dict(data.get("contact")))
+
+    def to_dict(self):
+        return {"full_name": self.full_name, "location": self.location, "contact": self.contact.to_dict()}
+
+
+@dataclass(slots=True)
+class Education:
+    degree: str = ""
+    institute: str = ""
+    board_university: str = ""
+    score: str = ""
+    year: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(_str(data.get("degree")), _str(data.get("institute")), _str(data.get("board_university")),
+                   _str(data.get("score")), _str(data.get("year")))
+
+    def to_dict(self):
+        return {"degree": self.degree, "institute": self.institute, "board_university": self.board_university,
+                "score": self.score, "year": self.year}
+
+
+@dataclass(slots=True)
+class Skills:
+    programming_languages: tuple = ()
+    frontend_technologies: tuple = ()
+    backend_technologies: tuple = ()
+    version_control_deployment: tuple = ()
+    computer_science_fundamentals: tuple = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        data = _dict(data)
+        return cls(*(_strings(data.get(key), intern=True) for key in SKILL_CATEGORIES))
+
+    def to_dict(self):
+        return {key: list(getattr(self, key)) for key in SKILL_CATEGORIES}
+
+    def all(self):
+        """Every skill, in category order"""
+        return [skill for key in SKILL_CATEGORIES for skill in getattr(self, key)]
+
+
+@dataclass(slots=True)
+class Experience:
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    duration: str = ""
+    achievements: tuple = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(_str(data.get("title")), _str(data.get("company")), _str(data.get("location")),
+                   _str(data.get("duration")), _strings(data.get("achievements")))
+
+    def to_dict(self):
+        return {"title": self.title, "company": self.company, "location": self.location,
+                "duration": self.duration, "achievements": list(self.achievements)}
+
+
+@dataclass(slots=True)
+class ProjectLinks:
+    live_site: str = ""
+    github_repo: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        data = _dict(data)
+        return cls(_str(data.get("live_site")), _str(data.get("github_repo")))
+
+    def to_dict(self):
+        return {"live_site": self.live_site, "github_repo": self.github_repo}
+
+
+@dataclass(slots=True)
+class Project:
+    name: str = ""
+    technologies: tuple = ()
+    links: ProjectLinks = field(default_factory=ProjectLinks)
+    achievements: tuple = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(_str(data.get("name")), _strings(data.get("technologies"), intern=True),
+                   ProjectLinks.from_dict(data.get("links")), _strings(data.get("achievements")))
+
+    def to_dict(self):
+        return {"name": self.name, "technologies": list(self.technologies), "links": self.links.to_dict(),
+                "achievements": list(self.achievements)}
+
+
+@dataclass(slots=True)
+class ParsedResume:
+    personal_info: PersonalInfo = field(default_factory=PersonalInfo)
+    education: list = field(default_factory=list)
+    skills: Skills = field(default_factory=Skills)
+    experience: list = field(default_factory=list)
+    projects: list = field(default_factory=list)
+    achievements: tuple = ()
+    positions_of_responsibility: tuple = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Normalize a parse result (e.g. the model's JSON) into a ParsedResume.
+
+        Args:
+            data (dict): Parse result
+
+        Returns:
+            ParsedResume: The normalized resume
+
+        Raises:
+            ValueError: If data is not a dict (e.g. the model answered with a list)
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Parse result is not an object: {type(data).__name__}")
+        return cls(
+            PersonalInfo.from_dict(data.get("personal_info")),
+            _entries(data.get("education"), Education),
+            Skills.from_dict(data.get("skills")),
+            _entries(data.get("experience"), Experience),
+            _entries(data.get("projects"), Project),
+            _strings(data.get("achievements")),
+            _strings(data.get("positions_of_responsibility")),
+        )
+
+    def to_dict(self):
+        return {
+            "personal_info": self.personal_info.to_dict(),
+            "education": [entry.to_dict() for entry in self.education],
+            "skills": self.skills.to_dict(),
+            "experience": [entry.to_dict() for entry in self.experience],
+            "projects": [entry.to_dict() for entry in self.projects],
+            "achievements": list(self.achievements),
+            "positions_of_responsibility": list(self.positions_of_responsibility),
+        }
+
+
+@dataclass(slots=True)
+class AtsReport:
+    ats_score: int = 0
+    detailed_scores: dict = field(default_factory=dict)
+    category_analysis: dict = field(default_factory=dict)
+    strengths: tuple = ()
+    improvements: tuple = ()
+    recommendations: tuple = ()
+    # Set by local_ats_scorer; empty for Gemini reports
+    scorer: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        """Normalize an ATS report: scores are clamped to 0-100 integers and lists hold only strings"""
+        data = _dict(data)
+        return cls(
+            _clamp_score(data.get("ats_score")),
+            {sys.intern(_str(name)): _clamp_score(score)
+             for name, score in _dict(data.get("detailed_scores")).items() if _str(name)},
+            {sys.intern(_str(name)): _str(text)
+             for name, text in _dict(data.get("category_analysis")).items() if _str(name)},
+            _strings(data.get("strengths")),
+            _strings(data.get("improvements")),
+            _strings(data.get("recommendations")),
+            _str(data.get("scorer")),
+        )
+
+    def to_dict(self):
+        report = {
+            "ats_score": self.ats_score,
+            "detailed_scores": dict(self.detailed_scores),
+            "category_analysis": dict(self.category_analysis),
+            "strengths": list(self.strengths),
+            "improvements": list(self.improvements),
+            "recommendations": list(self.recommendations),
+        }
+        if self.scorer:
+            report["scorer"] = self.scorer
+        return report
+
+
+def normalize_resume(data):
+    """Return a parse result with every schema key present and well-typed"""
+    return ParsedResume.from_dict(data).to_dict()
+
+
+def normalize_report(data):
+    """Return an ATS report with every key present and well-typed"""
+    return AtsReport.from_dict(data).to_dict()
@@ -0,0 +1,512 @@
+"""
+Persistent, queryable store of parsed resumes and ATS reports.
+
+Every resume is keyed by the SHA-256 of its PDF bytes. Parse results and ATS
+reports are upserted independently as they are produced, so a later /process
+call adds the score to a resume /parse-resume stored earlier. Re-storing an
+unchanged parse result is a no-op.
+
+Next to the JSON documents, SQLite keeps:
+
+- secondary indexes on skills, companies and education years
+- the total years of experience and the ATS score as indexed columns
+- an FTS5 full-text index over name, skills, experience, projects and education
+
+So "who has React and Flask with 2+ years" is an indexed query instead of a
+re-parse of every upload:
+
+    store.search(skills=["React", "Flask"], min_experience_years=2)
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from local_parser import SKILL_ALIASES
+
+SCHEMA_VERSION = 1
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    sha256 TEXT PRIMARY KEY,
+    file_name TEXT,
+    full_name TEXT,
+    email TEXT,
+    parsed_json TEXT,
+    parsed_hash TEXT,
+    analysis_json TEXT,
+    ats_score INTEGER,
+    experience_years REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_ats_score ON resumes (ats_score);
+CREATE INDEX IF NOT EXISTS resumes_experience_years ON resumes (experience_years);
+CREATE INDEX IF NOT EXISTS resumes_updated_at ON resumes (updated_at);
+
+CREATE TABLE IF NOT EXISTS resume_skills (
+    sha256 TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    PRIMARY KEY (sha256, skill)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resume_skills_skill ON resume_skills (skill, sha256);
+
+CREATE TABLE IF NOT EXISTS resume_companies (
+    sha256 TEXT NOT NULL,
+    company TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (sha256, company)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resume_companies_company ON resume_companies (company, sha256);
+
+CREATE TABLE IF NOT EXISTS resume_education (
+    sha256 TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    degree TEXT,
+    institute TEXT
+);
+CREATE INDEX IF NOT EXISTS resume_education_year ON resume_education (year, sha256);
+CREATE INDEX IF NOT EXISTS resume_education_sha256 ON resume_education (sha256);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+    sha256 UNINDEXED, full_name, skills, experience, projects, education
+);
+"""
+
+MONTHS = {
+    name: number for number, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",),
+        ("jun", "june"), ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"),
+        ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ], start=1) for name in names
+}
+_DATE = r'(?:([A-Za-z]{3,9})\.?\s+)?((?:19|20)\d{2})'
+_RANGE_RE = re.compile(_DATE + r'\s*(?:-|–|—|to)\s*(?:' + _DATE + r'|(present|current|now|ongoing))', re.IGNORECASE)
+_YEAR_RE = re.compile(r'(?:19|20)\d{2}')
+
+
+def normalize_skill(name):
+    """Lowercase a skill and fold common spellings ("ReactJS" -> "react")"""
+    key = ' '.join(name.lower().split())
+    return SKILL_ALIASES.get(key, key)
+
+
+def _month_index(month, year):
+    number = MONTHS.get((month or '').lower(), 1)
+    return int(year) * 12 + number - 1
+
+
+def duration_months(duration, now=None):
+    """
+    Length in months of a duration such as "May 2023 - Aug 2023" or "2021 - Present".
+
+    Returns:
+        int: Months covered (both ends inclusive), 0 if no range is found or
+        the duration is not a string
+    """
+    if not isinstance(duration, str):
+        return 0
+    match = _RANGE_RE.search(duration)
+    if not match:
+        return 0
+    start_month, start_year, end_month, end_year, present = match.groups()
+    start = _month_index(start_month, start_year)
+    if present:
+        now = time.gmtime(now)
+        end = now.tm_year * 12 + now.tm_mon - 1
+    else:
+        # A bare end year counts to the end of that year
+        end = _month_index(end_month or 'dec', end_year)
+    return max(end - start + 1, 0)
+
+
+def experience_years(parsed, now=None):
+    """Total years of experience across the experience entries of a parse result"""
+    months = sum(duration_months(entry.get('duration'), now) for entry in _entries(parsed, 'experience'))
+    return round(months / 12, 2)
+
+
+def _entries(parsed, section):
+    """The dict entries of a list section; models sometimes return strings or nulls"""
+    return [entry for entry in parsed.get(section) or [] if isinstance(entry, dict)]
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(_text(item) for key, item in value.items() if key != 'links')
+    if isinstance(value, list):
+        return ' '.join(_text(item) for item in value)
+    return ''
+
+
+def _as_dict(value):
+    # Results may arrive as JSON strings, dicts or resume_models objects
+    if isinstance(value, str):
+        value = json.loads(value)
+        if not isinstance(value, dict):
+            raise ValueError('"parsed_data" must be an object')
+        return value
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return value
+
+
+class ResumeStore:
+    """SQLite store of parsed resumes with full-text and secondary indexes"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def _write_parsed(self, sha256, parsed):
+        info = parsed.get('personal_info') or {}
+        contact = info.get('contact') or {}
+        full_name = info.get('full_name') or ''
+        self._conn.execute(
+            "UPDATE resumes SET full_name = ?, email = ?, experience_years = ? WHERE sha256 = ?",
+            (full_name, contact.get('email') or '', experience_years(parsed), sha256),
+        )
+        for table in ('resume_skills', 'resume_companies', 'resume_education', 'resumes_fts'):
+            self._conn.execute(f"DELETE FROM {table} WHERE sha256 = ?", (sha256,))
+
+        skills = {}
+        groups = parsed.get('skills') or {}
+        if isinstance(groups, list):
+            groups = {'other': groups}
+        for category, names in groups.items():
+            for name in names if isinstance(names, list) else []:
+                if isinstance(name, str) and name.strip():
+                    skills.setdefault(normalize_skill(name), (name.strip(), category))
+        # Project technologies count as skills too
+        for project in _entries(parsed, 'projects'):
+            for name in project.get('technologies') or []:
+                if isinstance(name, str) and name.strip():
+                    skills.setdefault(normalize_skill(name), (name.strip(), 'projects'))
+        self._conn.executemany(
+            "INSERT INTO resume_skills (sha256, skill, name, category) VALUES (?, ?, ?, ?)",
+            [(sha256, skill, name, category) for skill, (name, category) in skills.items()],
+        )
+
+        companies = {}
+        for entry in _entries(parsed, 'experience'):
+            company = (entry.get('company') or '').strip()
+            if company:
+                companies.setdefault(' '.join(company.lower().split()), company)
+        self._conn.executemany(
+            "INSERT INTO resume_companies (sha256, company, name) VALUES (?, ?, ?)",
+            [(sha256, key, name) for key, name in companies.items()],
+        )
+
+        education = []
+        for entry in _entries(parsed, 'education'):
+            years = _YEAR_RE.findall(str(entry.get('year') or ''))
+            if years:
+                # The graduation year is the last year mentioned ("2020 - 2024")
+                education.append((sha256, int(years[-1]), entry.get('degree') or '', entry.get('institute') or ''))
+        self._conn.executemany(
+            "INSERT INTO resume_education (sha256, year, degree, institute) VALUES (?, ?, ?, ?)", education
+        )
+
+        self._conn.execute(
+            "INSERT INTO resumes_fts (sha256, full_name, skills, experience, projects, education) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (sha256, full_name, ' '.join(name for name, _ in skills.values()),
+             _text(parsed.get('experience')), _text(parsed.get('projects')), _text(parsed.get('education'))),
+        )
+
+    def upsert(self, sha256, parsed=None, analysis=None, file_name=None):
+        """
+        Insert or update one resume.
+
+        Only the parts passed are written: storing an ATS report keeps the
+        parse result stored earlier and vice versa. A parse result identical
+        to the stored one does not rewrite the indexes.
+
+        Args:
+            sha256 (str): SHA-256 of the PDF bytes
+            parsed (dict | str): Parse result, as a dict or the ats_extractor JSON string
+            analysis (dict): ATS report
+            file_name (str): Name of the uploaded file
+
+        Returns:
+            bool: True if anything changed
+        """
+        record = {'sha256': sha256, 'parsed_data': parsed, 'ats_analysis': analysis, 'file': file_name}
+        return self.upsert_many([record]) > 0
+
+    def upsert_many(self, records):
+        """
+        Upsert many resumes in one transaction.
+
+        Args:
+            records (list): Dicts with "sha256" and any of "parsed_data",
+                "ats_analysis" and "file" (the shape of batch.py records)
+
+        Returns:
+            int: Number of resumes that changed
+
+        Raises:
+            ValueError: If a "parsed_data" string is not a JSON object; no
+                record of the batch is written
+        """
+        changed = 0
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                for record in records:
+                    sha256 = record['sha256']
+                    parsed = _as_dict(record.get('parsed_data'))
+                    analysis = record.get('ats_analysis')
+                    row = self._conn.execute(
+                        "SELECT parsed_hash, analysis_json, file_name FROM resumes WHERE sha256 = ?", (sha256,)
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute(
+                            "INSERT INTO resumes (sha256, created_at, updated_at) VALUES (?, ?, ?)", (sha256, now, now)
+                        )
+                    updates = {}
+                    if record.get('file') and (row is None or row['file_name'] != record['file']):
+                        updates['file_name'] = record['file']
+                    if parsed is not None:
+                        parsed_json = json.dumps(parsed, sort_keys=True)
+                        parsed_hash = hashlib.sha256(parsed_json.encode('utf-8')).hexdigest()
+                        if row is None or row['parsed_hash'] != parsed_hash:
+                            updates['parsed_json'] = parsed_json
+                            updates['parsed_hash'] = parsed_hash
+                            self._write_parsed(sha256, parsed)
+                    if analysis is not None:
+                        analysis_json = json.dumps(analysis, sort_keys=True)
+                        if row is None or row['analysis_json'] != analysis_json:
+                            updates['analysis_json'] = analysis_json
+                            updates['ats_score'] = analysis.get('ats_score')
+                    if updates or row is None:
+                        updates['updated_at'] = now
+                        assignments = ', '.join(f"{column} = ?" for column in updates)
+                        self._conn.execute(
+                            f"UPDATE resumes SET {assignments} WHERE sha256 = ?", (*updates.values(), sha256)
+                        )
+                        changed += 1
+        return changed
+
+    def get(self, sha256):
+        """Return the stored record of one resume, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM resumes WHERE sha256 = ?", (sha256,)).fetchone()
+            skills = self._conn.execute(
+                "SELECT name FROM resume_skills WHERE sha256 = ? ORDER BY name", (sha256,)
+            ).fetchall() if row else []
+        if row is None:
+            return None
+        record = self._summary(row, [skill['name'] for skill in skills])
+        record['parsed_data'] = json.loads(row['parsed_json']) if row['parsed_json'] else None
+        record['ats_analysis'] = json.loads(row['analysis_json']) if row['analysis_json'] else None
+        return record
+
+    def delete(self, sha256):
+        with self._lock:
+            with self._conn:
+                for table in ('resume_skills', 'resume_companies', 'resume_education', 'resumes_fts', 'resumes'):
+                    self._conn.execute(f"DELETE FROM {table} WHERE sha256 = ?", (sha256,))
+
+    @staticmethod
+    def _summary(row, skills):
+        return {
+            'sha256': row['sha256'],
+            'file': row['file_name'],
+            'full_name': row['full_name'],
+            'email': row['email'],
+            'skills': skills,
+            'experience_years': row['experience_years'],
+            'ats_score': row['ats_score'],
+            'updated_at': row['updated_at'],
+        }
+
+    def search(self, text=None, skills=(), companies=(), min_experience_years=None, min_ats_score=None,
+               education_year_min=None, education_year_max=None, limit=DEFAULT_LIMIT, offset=0):
+        """
+        Find resumes matching every given filter.
+
+        Args:
+            text (str): FTS5 query (e.g. "react AND flask", "fintech*") over name, skills, experience, projects and
+                education; results are then ordered by relevance
+            skills (list): Skills the resume must all list (aliases are folded)
+            companies (list): Companies the candidate must all have worked at (case-insensitive)
+            min_experience_years (float): Minimum total years of experience
+            min_ats_score (int): Minimum stored ATS score
+            education_year_min (int): Earliest graduation year of any education entry
+            education_year_max (int): Latest graduation year of any education entry
+            limit (int): Page size, at most MAX_LIMIT
+            offset (int): Results skipped
+
+        Returns:
+            dict: {"results": [summaries], "total": number of matching resumes}
+        """
+        where = []
+        params = []
+        for skill in skills:
+            where.append("r.sha256 IN (SELECT sha256 FROM resume_skills WHERE skill = ?)")
+            params.append(normalize_skill(skill))
+        for company in companies:
+            where.append("r.sha256 IN (SELECT sha256 FROM resume_companies WHERE company = ?)")
+            params.append(' '.join(company.lower().split()))
+        if min_experience_years is not None:
+            where.append("r.experience_years >= ?")
+            params.append(min_experience_years)
+        if min_ats_score is not None:
+            where.append("r.ats_score >= ?")
+            params.append(min_ats_score)
+        if education_year_min is not None or education_year_max is not None:
+            where.append("r.sha256 IN (SELECT sha256 FROM resume_education WHERE year BETWEEN ? AND ?)")
+            params.extend([education_year_min if education_year_min is not None else 0,
+                           education_year_max if education_year_max is not None else 9999])
+
+        source = "resumes r"
+        order = "r.updated_at DESC"
+        if text:
+            source = "resumes_fts f JOIN resumes r ON r.sha256 = f.sha256"
+            where.insert(0, "resumes_fts MATCH ?")
+            params.insert(0, text)
+            order = "bm25(resumes_fts)"
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        with self._lock:
+            try:
+                total = self._conn.execute(f"SELECT COUNT(*) FROM {source}{clause}", params).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT r.* FROM {source}{clause} ORDER BY {order} LIMIT ? OFFSET ?",
+                    (*params, limit, max(int(offset), 0)),
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                # Malformed FTS5 syntax in the text query
+                raise ValueError(f"Invalid search query: {str(e)}")
+            skills_by_resume = {}
+            if rows:
+                placeholders = ', '.join('?' for _ in rows)
+                for skill in self._conn.execute(
+                    f"SELECT sha256, name FROM resume_skills WHERE sha256 IN ({placeholders}) ORDER BY name",
+                    [row['sha256'] for row in rows],
+                ):
+                    skills_by_resume.setdefault(skill['sha256'], []).append(skill['name'])
+        return {
+            'results': [self._summary(row, skills_by_resume.get(row['sha256'], [])) for row in rows],
+            'total': total,
+        }
+
+    def iter_parsed(self):
+        """
+        Yield (sha256, parsed_hash, parsed_json) for every resume with a parse result.
+
+        The parse result is left as stored JSON text, so a caller that already
+        knows a resume by its parsed_hash can skip decoding it.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, parsed_hash, parsed_json FROM resumes WHERE parsed_json IS NOT NULL ORDER BY sha256"
+            ).fetchall()
+        for row in rows:
+            yield row['sha256'], row['parsed_hash'], row['parsed_json']
+
+    def version(self):
+        """A value that changes whenever a resume is added, updated or deleted (by any process)"""
+        with self._lock:
+            return tuple(self._conn.execute(
+                "SELECT COUNT(*), MAX(updated_at), TOTAL(updated_at) FROM resumes"
+            ).fetchone())
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+
+def search_params(args):
+    """
+    Turn query-string arguments into ResumeStore.search keyword arguments.
+
+    Args:
+        args (dict): {name: [values]}, e.g. request.args.to_dict(flat=False)
+            or urllib.parse.parse_qs output. "skill" and "company" may repeat
+            or hold comma-separated lists.
+
+    Raises:
+        ValueError: If a numeric parameter is not a number
+    """
+    def first(name, convert):
+        values = args.get(name)
+        if not values or values[0] == '':
+            return None
+        try:
+            return convert(values[0])
+        except ValueError:
+            raise ValueError(f'"{name}" must be a number')
+
+    def listed(name):
+        return [item.strip() for value in args.get(name, []) for item in value.split(',') if item.strip()]
+
+    return {
+        'text': first('q', str),
+        'skills': listed('skill'),
+        'companies': listed('company'),
+        'min_experience_years': first('min_years', float),
+        'min_ats_score': first('min_score', int),
+        'education_year_min': first('education_year_min', int),
+        'education_year_max': first('education_year_max', int),
+        'limit': first('limit', int) or DEFAULT_LIMIT,
+        'offset': first('offset', int) or 0,
+    }
+
+
+class NullResumeStore:
+    """Store used when RESUME_STORE is disabled"""
+    path = None
+
+    def upsert(self, sha256, parsed=None, analysis=None, file_name=None):
+        return False
+
+    def upsert_many(self, records):
+        return 0
+
+    def get(self, sha256):
+        return None
+
+    def search(self, **filters):
+        return {'results': [], 'total': 0}
+
+    def iter_parsed(self):
+        return iter(())
+
+    def version(self):
+        return None
+
+    def __len__(self):
+        return 0
+
+
+def create_store_from_env(default_path=None):
+    """
+    Build the resume store from environment variables.
+
+    RESUME_STORE=0 disables it; RESUME_STORE_PATH sets the SQLite file.
+    """
+    if os.getenv("RESUME_STORE", "1").lower() in ("0", "false", "no", "off"):
+        return NullResumeStore()
+    return ResumeStore(os.getenv("RESUME_STORE_PATH", default_path or "resumes.sqlite3"))
@@ -1,23 +1,53 @@
-import google.generativeai as genai
-import yaml
+import asyncio
 import json
 import re
-import fitz  # PyMuPDF for extracting links from PDF
 import os
+from parsed_document import ParsedDocument, extract_field_info
+import extraction_pool
+import gemini_client
+import json_codec
+import local_parser
+import prompt_compaction
+import settings
+import telemetry
+from resume_models import ParsedResume
+
+log = telemetry.get_logger(__name__)
+
+MODEL_NAME = "gemini-1.5-flash"
+# Bump whenever the prompt in parse_resume or the cached result format changes so
+# cached results are invalidated (v3: results are cached as objects, not JSON strings)
+PROMPT_VERSION = "parse-v3+" + prompt_compaction.CACHE_TAG
+
+# "llm" sends every resume to Gemini, "local" only runs local_parser and "hybrid"
+# runs local_parser first and calls Gemini only when a required section is missing
+PARSER_MODE = os.getenv("PARSER_MODE", "llm").lower()
+PARSER_REQUIRED_SECTIONS = [
+    name.strip()
+    for name in os.getenv("PARSER_REQUIRED_SECTIONS", "personal_info,education,skills,projects").split(",")
+    if name.strip()
+]
+if PARSER_MODE != "llm":
+    PROMPT_VERSION += "+" + PARSER_MODE
+
+GENERATION_CONFIG = {
+    "temperature": 0.1,  # Reduced temperature for more consistent output
+    "top_p": 1,
+    "top_k": 1,
+    "max_output_tokens": 2048,
+}
+
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"}
+]
 
 # Configuration loading
 def load_config(config_path=None):
-    if config_path is None:
-        config_path = "config.yaml"
-    
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"Config file not found at {config_path}")
-        
-    with open(config_path) as file:
-        data = yaml.load(file, Loader=yaml.SafeLoader)
-        if 'GEMINI_API_KEY' not in data:
-            raise KeyError("GEMINI_API_KEY not found in config file")
-        return data['GEMINI_API_KEY']
+    """Return the Gemini API key from the config file (cached and validated, see settings.py)"""
+    return settings.get_settings(config_path).gemini_api_key
 
 # Text cleaning and JSON parsing functions
 def clean_json_string(text):
@@ -26,145 +56,41 @@ def clean_json_string(text):
     text = re.sub(r'```\s*$', '', text)
     return text.strip()
 
+def load_document(source):
+    """Return a ParsedDocument for raw PDF bytes, a file path or an already parsed document"""
+    if isinstance(source, ParsedDocument):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return extraction_pool.extract_document(source)
+    return extraction_pool.record_timings(ParsedDocument.from_pdf(source))
+
+def extract_pdf_content(source):
+    """
+    Extract text and links from a PDF in a single pass.
+
+    Args:
+        source (bytes | str): Raw PDF bytes or a path to a PDF file
+
+    Returns:
+        tuple: (resume_text, extracted_links)
+    """
+    document = load_document(source)
+    return document.text, document.links
+
 def extract_text_from_pdf(pdf_path):
     """Extract text from PDF with improved error handling and text processing"""
-    try:
-        print(f"Attempting to open PDF at: {pdf_path}")
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF file not found at {pdf_path}")
-            
-        print("Opening PDF document...")
-        doc = fitz.open(pdf_path)
-        print(f"PDF opened successfully. Page count: {doc.page_count}")
-        
-        if doc.page_count == 0:
-            raise ValueError("PDF file is empty or corrupted")
-            
-        text = ""
-        for page_num, page in enumerate(doc):
-            print(f"Processing page {page_num + 1}...")
-            # Get text with layout preservation
-            page_text = page.get_text("text")
-            if page_text:
-                # Clean the text
-                page_text = page_text.strip()
-                # Remove multiple newlines
-                page_text = re.sub(r'\n\s*\n', '\n', page_text)
-                # Remove multiple spaces
-                page_text = re.sub(r'\s+', ' ', page_text)
-                text += page_text + "\n"
-                print(f"Extracted {len(page_text)} characters from page {page_num + 1}")
-            else:
-                print(f"Warning: No text found on page {page_num + 1}")
-                
-        doc.close()
-        
-        if not text.strip():
-            raise ValueError("No text content found in PDF. The file might be scanned or contain only images.")
-            
-        print(f"Successfully extracted {len(text)} characters total")
-        return text
-        
-    except fitz.FileDataError as e:
-        print(f"PDF file is corrupted or invalid: {str(e)}")
-        raise ValueError("The PDF file appears to be corrupted or invalid. Please ensure it's a valid PDF file.")
-    except fitz.EmptyFileError as e:
-        print(f"PDF file is empty: {str(e)}")
-        raise ValueError("The PDF file is empty. Please upload a non-empty PDF file.")
-    except Exception as e:
-        print(f"Error extracting text from PDF: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+    return load_document(pdf_path).text
 
 def extract_links_from_pdf(pdf_path):
     try:
-        doc = fitz.open(pdf_path)
-        links = {}
-        
-        # Extract hyperlinks from PDF
-        for page_num, page in enumerate(doc):
-            for link in page.get_links():
-                if "uri" in link:
-                    url = link["uri"]
-                    # Try to categorize the link
-                    if "github.com" in url.lower():
-                        links["github"] = url
-                    elif "linkedin.com" in url.lower():
-                        links["linkedin"] = url
-                    elif "leetcode.com" in url.lower():
-                        links["leetcode"] = url
-                    elif "geeksforgeeks.org" in url.lower() or "gfg" in url.lower():
-                        links["gfg"] = url
-                    elif "portfolio" in url.lower() or "personal" in url.lower():
-                        links["portfolio"] = url
-                    else:
-                        # Store project links
-                        for project in ["workify", "school management", "food delivery"]:
-                            if project.lower().replace(" ", "") in url.lower():
-                                if project not in links:
-                                    links[project] = {}
-                                
-                                if "github.com" in url.lower():
-                                    links[project]["github"] = url
-                                else:
-                                    links[project]["live"] = url
-        
-        return links
+        return load_document(pdf_path).links
     except Exception as e:
-        print(f"Error extracting links from PDF: {str(e)}")
+        log.warning("Error extracting links from PDF: %s", e)
         return {}
 
-def extract_field_info(resume_text):
-    """Extract basic fields before sending to AI to ensure accurate information"""
-    info = {}
-    
-    # Split text into lines and clean them
-    lines = [line.strip() for line in resume_text.split('\n') if line.strip()]
-    
-    # Extract name (usually first line)
-    if lines:
-        info["full_name"] = lines[0].strip()
-    
-    # Extract location (usually second line)
-    if len(lines) > 1:
-        info["location"] = lines[1].strip()
-    
-    # Extract contact info
-    for line in lines:
-        # Extract phone number
-        phone_match = re.search(r'(\+\d{1,4}-\d{10})', line)
-        if phone_match:
-            info["phone"] = phone_match.group(1)
-        
-        # Extract email
-        email_match = re.search(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)', line)
-        if email_match:
-            info["email"] = email_match.group(1)
-        
-        # Extract professional links
-        if '|' in line:
-            links = line.split('|')
-            info["professional_links"] = {}
-            for link in links:
-                link = link.strip()
-                if 'github' in link.lower():
-                    info["professional_links"]["github"] = link
-                elif 'linkedin' in link.lower():
-                    info["professional_links"]["linkedin"] = link
-                elif 'leetcode' in link.lower():
-                    info["professional_links"]["leetcode"] = link
-                elif 'portfolio' in link.lower():
-                    info["professional_links"]["portfolio"] = link
-                elif 'gfg' in link.lower():
-                    info["professional_links"]["gfg"] = link
-    
-    return info
-
-def parse_resume(resume_text, extracted_links=None, basic_info=None):
-    """Enhanced resume parsing function with improved prompt"""
-    
-    # Create a detailed prompt with specific instructions
-    prompt = '''
+# Static part of the parsing prompt. It is sent as the system instruction, which
+# gemini_client registers once as cached content, so only the resume is sent per call
+PARSE_INSTRUCTIONS = '''
     You are an AI expert in resume parsing. Extract the following information from the resume text and format it as a structured JSON object. Your task is to identify and extract all relevant information accurately.
 
     Extract the following fields:
@@ -243,6 +169,21 @@ def parse_resume(resume_text, extracted_links=None, basic_info=None):
     12. Maintain the original order of information as it appears in the resume
     '''
 
+def build_resume_prompt(resume_text, extracted_links=None, basic_info=None):
+    """
+    Build the per-resume part of the parsing prompt.
+
+    resume_text may also be a ParsedDocument, in which case its text, links
+    and pre-extracted fields are used unless given explicitly. The resume text
+    is compacted to the prompt token budget (see prompt_compaction).
+    """
+    if isinstance(resume_text, ParsedDocument):
+        document = resume_text
+        extracted_links = document.links if extracted_links is None else extracted_links
+        basic_info = document.fields if basic_info is None else basic_info
+    resume_text = prompt_compaction.prepare_resume_text(resume_text)
+    prompt = ""
+
     # If we have pre-extracted info, include it in the prompt
     if basic_info:
         prompt += f"\n\nPRE-EXTRACTED INFORMATION:\n"
@@ -263,122 +204,201 @@ def parse_resume(resume_text, extracted_links=None, basic_info=None):
 
     return prompt
 
-def ats_extractor(resume_path):
-    """Main function to extract resume information"""
+def parse_resume(resume_text, extracted_links=None, basic_info=None):
+    """
+    Enhanced resume parsing function with improved prompt.
+
+    Returns the full prompt: PARSE_INSTRUCTIONS followed by build_resume_prompt().
+    """
+    return PARSE_INSTRUCTIONS + build_resume_prompt(resume_text, extracted_links, basic_info)
+
+def enrich_with_links(resume, extracted_links):
+    """
+    Fill professional and project links the model left empty with links found in the PDF.
+
+    Args:
+        resume (ParsedResume): Normalized parse result, updated in place
+        extracted_links (dict): Links found in the PDF by extract_field_info
+
+    Returns:
+        ParsedResume: The same resume
+    """
+    # Update professional links
+    professional_links = resume.personal_info.contact.professional_links
+    for link_type, url in extracted_links.items():
+        if link_type in ["github", "linkedin", "leetcode", "gfg", "portfolio"] and isinstance(url, str):
+            if not getattr(professional_links, link_type):
+                setattr(professional_links, link_type, url)
+
+    # Update project links
+    for project_name, project_links in extracted_links.items():
+        if isinstance(project_links, dict):
+            # Find matching project in parsed data
+            for project in resume.projects:
+                if project_name.lower() in project.name.lower():
+                    if "github" in project_links and not project.links.github_repo:
+                        project.links.github_repo = project_links["github"]
+                    if "live" in project_links and not project.links.live_site:
+                        project.links.live_site = project_links["live"]
+    return resume
+
+def get_client():
+    """Return the shared Gemini client, configured from config.yaml"""
+    return gemini_client.get_configured_client()
+
+def _extraction_error(resume_source, e):
+    error = {
+        "error": "Failed to extract text from PDF",
+        "details": str(e)
+    }
+    if isinstance(resume_source, str):
+        error["path"] = resume_source
+    return error
+
+def _build_extraction_prompt(document):
+    log.debug("Extracted %d characters and %d links from PDF", len(document.text), len(document.links))
+
+    with telemetry.span("prompt_build"):
+        return build_resume_prompt(document)
+
+def _process_model_response(response, extracted_links, local_result=None):
+    """
+    Clean and parse the model output and enhance it with the extracted links.
+
+    In hybrid mode local_result holds what local_parser found; the model's
+    answer is only used for the fields it left empty.
+    """
+    data = response.text.strip()
+
+    # Clean and parse the JSON, then enhance it with the extracted links
+    cleaned_data = clean_json_string(data)
+    try:
+        with telemetry.span("json_parse"):
+            resume = ParsedResume.from_dict(json.loads(cleaned_data))
+
+        with telemetry.span("enrichment"):
+            # Enhance with extracted links if not already populated
+            if extracted_links:
+                enrich_with_links(resume, extracted_links)
+            parsed_json = resume.to_dict()
+
+            if local_result is not None:
+                parsed_json = local_parser.fill_gaps(local_result, parsed_json)
+
+        log.debug("Model response parsed and enriched")
+        return parsed_json
+
+    except ValueError as e:
+        # json.JSONDecodeError, or valid JSON that is not a resume object
+        log.warning("JSON Parse Error: %s", e)
+        return {
+            "error": "Failed to parse resume data",
+            "details": str(e),
+            "raw_response": cleaned_data
+        }
+
+def _processing_error(e):
+    log.error("Failed to process resume (%s): %s", type(e).__name__, e)
+    return {
+        "error": "Failed to process resume",
+        "details": str(e)
+    }
+
+def _parse_locally(document, parser_mode):
+    """
+    Run the local parser for the "local" and "hybrid" modes.
+
+    Returns:
+        tuple: (local result or None, True if the model still has to be called)
+    """
+    if parser_mode == "llm":
+        return None, True
+    local_result = local_parser.parse_document(document)
+    missing = [name for name in local_parser.missing_sections(local_result) if name in PARSER_REQUIRED_SECTIONS]
+    if parser_mode == "local" or not missing:
+        log.debug("Resume parsed locally, no model call needed")
+        return local_result, False
+    log.info("Local parser could not fill %s; asking the model to fill the gaps", ", ".join(missing))
+    return local_result, True
+
+def extract_resume(resume_source, parser_mode=None):
+    """
+    Main function to extract resume information.
+
+    Args:
+        resume_source (bytes | str | ParsedDocument): Raw PDF bytes of an upload,
+            a path to a PDF file or a document that has already been extracted
+        parser_mode (str): "llm", "local" or "hybrid"; defaults to PARSER_MODE
+
+    Returns:
+        dict: The parse result, or {"error": ..., "details": ...} on failure
+    """
+    parser_mode = parser_mode or PARSER_MODE
     try:
-        print(f"\nStarting resume extraction for: {resume_path}")
-        
-        # Load configuration
-        print("Loading configuration...")
-        api_key = load_config()
-        print("Configuration loaded successfully")
-        
-        # Extract text from PDF
-        print("\nExtracting text from PDF...")
+        if isinstance(resume_source, str):
+            log.debug("Starting resume extraction for: %s", resume_source)
+
+        # Extract text, links and basic fields from PDF in one pass
         try:
-            resume_text = extract_text_from_pdf(resume_path)
+            document = load_document(resume_source)
         except ValueError as e:
-            return json.dumps({
-                "error": "Failed to extract text from PDF",
-                "details": str(e),
-                "path": resume_path
-            })
-        
-        print(f"Successfully extracted {len(resume_text)} characters from PDF")
-        
-        # Extract links from PDF
-        print("\nExtracting links from PDF...")
-        extracted_links = extract_links_from_pdf(resume_path)
-        print(f"Found {len(extracted_links)} links in PDF")
-        
-        # Extract basic information
-        print("\nExtracting basic information...")
-        basic_info = extract_field_info(resume_text)
-        print(f"Extracted basic info: {basic_info}")
-        
-        # Create the prompt
-        print("\nCreating prompt for AI...")
-        prompt = parse_resume(resume_text, extracted_links, basic_info)
-        
-        # Configure Gemini
-        print("\nConfiguring Gemini AI...")
-        genai.configure(api_key=api_key)
-        
-        generation_config = {
-            "temperature": 0.1,  # Reduced temperature for more consistent output
-            "top_p": 1,
-            "top_k": 1,
-            "max_output_tokens": 2048,
-        }
+            return _extraction_error(resume_source, e)
 
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"}
-        ]
-
-        # Initialize the model
-        print("Initializing Gemini model...")
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            generation_config=generation_config,
-            safety_settings=safety_settings
-        )
+        local_result, needs_model = _parse_locally(document, parser_mode)
+        if not needs_model:
+            return local_result
+
+        client = get_client()
+        prompt = _build_extraction_prompt(document)
 
         # Generate the response
-        print("Generating AI response...")
-        response = model.generate_content(prompt)
-        data = response.text.strip()
-        print("AI response generated successfully")
+        response = client.generate_content(
+            prompt, MODEL_NAME, GENERATION_CONFIG, SAFETY_SETTINGS, system_instruction=PARSE_INSTRUCTIONS
+        )
+        return _process_model_response(response, document.links, local_result)
+            
+    except Exception as e:
+        return _processing_error(e)
 
-        # Clean and parse the JSON
-        print("\nCleaning and parsing JSON...")
-        cleaned_data = clean_json_string(data)
+async def extract_resume_async(resume_source, parser_mode=None):
+    """
+    Async variant of extract_resume.
 
-        # Further process the JSON to enhance it with the extracted links
+    PDF extraction runs in a worker thread and the model call is awaited, so
+    the event loop stays free while Gemini is generating.
+    """
+    parser_mode = parser_mode or PARSER_MODE
+    try:
         try:
-            parsed_json = json.loads(cleaned_data)
-            print("JSON parsed successfully")
-            
-            # Enhance with extracted links if not already populated
-            if extracted_links:
-                print("Enhancing JSON with extracted links...")
-                # Update professional links
-                for link_type, url in extracted_links.items():
-                    if link_type in ["github", "linkedin", "leetcode", "gfg", "portfolio"]:
-                        if not parsed_json["personal_info"]["contact"]["professional_links"][link_type]:
-                            parsed_json["personal_info"]["contact"]["professional_links"][link_type] = url
-                
-                # Update project links
-                for project_name, project_links in extracted_links.items():
-                    if isinstance(project_links, dict):
-                        # Find matching project in parsed data
-                        for i, project in enumerate(parsed_json["projects"]):
-                            if project_name.lower() in project["name"].lower():
-                                if "github" in project_links and not project["links"]["github_repo"]:
-                                    parsed_json["projects"][i]["links"]["github_repo"] = project_links["github"]
-                                if "live" in project_links and not project["links"]["live_site"]:
-                                    parsed_json["projects"][i]["links"]["live_site"] = project_links["live"]
-            
-            print("JSON processing completed successfully")
-            return json.dumps(parsed_json, indent=2)
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON Parse Error: {str(e)}")
-            return json.dumps({
-                "error": "Failed to parse resume data",
-                "details": str(e),
-                "raw_response": cleaned_data
-            })
-            
+            if isinstance(resume_source, (bytes, bytearray)):
+                document = await extraction_pool.extract_document_async(resume_source)
+            else:
+                document = await asyncio.to_thread(load_document, resume_source)
+        except ValueError as e:
+            return _extraction_error(resume_source, e)
+
+        local_result, needs_model = _parse_locally(document, parser_mode)
+        if not needs_model:
+            return local_result
+
+        client = get_client()
+        prompt = _build_extraction_prompt(document)
+
+        response = await client.generate_content_async(
+            prompt, MODEL_NAME, GENERATION_CONFIG, SAFETY_SETTINGS, system_instruction=PARSE_INSTRUCTIONS
+        )
+        return _process_model_response(response, document.links, local_result)
+
     except Exception as e:
-        print(f"Error: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        return json.dumps({
-            "error": "Failed to process resume",
-            "details": str(e)
-        })
+        return _processing_error(e)
+
+def ats_extractor(resume_source, parser_mode=None):
+    """Like extract_resume, but returns the result serialized as a JSON string"""
+    return json_codec.dumps(extract_resume(resume_source, parser_mode))
+
+async def ats_extractor_async(resume_source, parser_mode=None):
+    """Like extract_resume_async, but returns the result serialized as a JSON string"""
+    return json_codec.dumps(await extract_resume_async(resume_source, parser_mode))
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""
+Application settings, loaded once and reloaded when the config file changes.
+
+get_settings reads config.yaml (CONFIG_PATH) on first use, validates it and
+caches the result as a Settings object, so requests no longer open and parse
+the YAML file on their own. At most every CONFIG_RELOAD_INTERVAL seconds
+(default 2) the file's modification time is checked, and a changed file is
+loaded again. If the new file is invalid, the previous settings stay in
+place and a warning is logged.
+
+GEMINI_API_KEY from the environment (or .env) is used when the file has no
+key. .env is loaded on the first load_settings call rather than at import,
+and yaml and dotenv are imported only when there is a file for them to read.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import telemetry
+
+log = telemetry.get_logger(__name__)
+
+DEFAULT_CONFIG_PATH = "config.yaml"
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+_dotenv_loaded = False
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Validated contents of the config file"""
+    gemini_api_key: str
+    # The file the settings came from (None if only the environment was used) and its mtime
+    path: str = None
+    mtime: float = None
+
+
+def load_dotenv(path=None):
+    """Load .env (from the working directory, else next to this module) if there is one; existing variables win"""
+    if path is None:
+        candidates = [".env", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")]
+        path = next((candidate for candidate in candidates if os.path.exists(candidate)), None)
+    if path is None or not os.path.exists(path):
+        return False
+    from dotenv import load_dotenv as _load_dotenv
+    return _load_dotenv(path)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def load_settings(path=None):
+    """
+    Read and validate the config file.
+
+    Args:
+        path (str): Config file; defaults to CONFIG_PATH or config.yaml
+
+    Returns:
+        Settings: The validated settings
+
+    Raises:
+        FileNotFoundError: If the file does not exist and GEMINI_API_KEY is not set
+        KeyError: If neither the file nor the environment has GEMINI_API_KEY
+        ValueError: If the file is not a mapping or the key is not a non-empty string
+    """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        _dotenv_loaded = True
+        load_dotenv()
+    path = path or os.getenv("CONFIG_PATH", DEFAULT_CONFIG_PATH)
+    mtime = _mtime(path)
+    if mtime is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise FileNotFoundError(f"Config file not found at {path}")
+        return Settings(gemini_api_key=api_key)
+
+    import yaml
+    with open(path) as file:
+        data = yaml.load(file, Loader=yaml.SafeLoader)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ValueError(f"Config file {path} must contain a mapping")
+    api_key = data.get("GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
+    if api_key is None:
+        raise KeyError("GEMINI_API_KEY not found in config file")
+    if not isinstance(api_key, str) or not api_key.strip():
+        raise ValueError(f"GEMINI_API_KEY in {path} must be a non-empty string")
+    return Settings(gemini_api_key=api_key.strip(), path=path, mtime=mtime)
+
+
+class _SettingsCache:
+    """The settings of one config file and when to look at the file again"""
+
+    def __init__(self, path, reload_interval):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.settings = None
+        self.check_at = 0.0
+        # mtime of an invalid version of the file, so it is not read (and reported) again
+        self.rejected_mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        settings = self.settings
+        if settings is not None and time.monotonic() < self.check_at:
+            return settings
+        with self._lock:
+            if self.settings is not None and time.monotonic() < self.check_at:
+                return self.settings
+            self.check_at = time.monotonic() + self.reload_interval
+            if self.settings is None:
+                self.settings = load_settings(self.path)
+                return self.settings
+            mtime = _mtime(self.path)
+            if mtime != self.settings.mtime and mtime != self.rejected_mtime:
+                try:
+                    self.settings = load_settings(self.path)
+                    log.info("Reloaded settings from %s", self.path)
+                except Exception as e:
+                    self.rejected_mtime = mtime
+                    log.warning("Keeping the previous settings, %s is invalid: %s", self.path, e)
+            return self.settings
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_settings(path=None):
+    """
+    Return the cached settings, reloading them if the config file changed.
+
+    Args:
+        path (str): Config file; defaults to CONFIG_PATH or config.yaml
+
+    Returns:
+        Settings: The current settings
+
+    Raises:
+        FileNotFoundError, KeyError, ValueError: If the first load fails (see load_settings)
+    """
+    path = path or os.getenv("CONFIG_PATH", DEFAULT_CONFIG_PATH)
+    cache = _caches.get(path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                reload_interval = float(os.getenv("CONFIG_RELOAD_INTERVAL", DEFAULT_RELOAD_INTERVAL))
+                cache = _caches[path] = _SettingsCache(path, reload_interval)
+    return cache.get()
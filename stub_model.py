@@ -0,0 +1,477 @@
+"""
+Local stand-in for the Gemini API, used to measure the service offline.
+
+Run the server with:
+
+    python stub_model.py --port 8500 --latency 2.0
+
+and point the app at it with GEMINI_STUB_URL=http://127.0.0.1:8500. The
+gemini_client then builds StubGenerativeModel instances instead of
+genai.GenerativeModel, so every code path above the model call is exercised
+exactly as in production while the "model" answers after a fixed delay.
+
+The server also emulates context caching: system instructions registered
+through /cachedContents are prepended to every request that references them,
+and GET /stats reports how many prompt characters were sent versus served
+from a cached prefix.
+
+FakeGenerativeModel is the in-process variant for benchmarks that must not
+depend on a server: it answers with the same canned responses after a
+latency that is a deterministic function of the seed and the prompt.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+PARSE_RESPONSE = {
+    "personal_info": {
+        "full_name": "Stub Candidate",
+        "location": "Bangalore, India",
+        "contact": {
+            "phone": "+91-9876543210",
+            "email": "stub.candidate@example.com",
+            "professional_links": {
+                "github": "",
+                "leetcode": "",
+                "linkedin": "",
+                "gfg": "",
+                "portfolio": "",
+                "codechef": "",
+                "hackerrank": "",
+                "website": ""
+            }
+        }
+    },
+    "education": [
+        {
+            "degree": "B.Tech in Computer Science",
+            "institute": "Stub Institute of Technology",
+            "board_university": "Stub University",
+            "score": "8.5 CGPA",
+            "year": "2024"
+        }
+    ],
+    "skills": {
+        "programming_languages": ["Python", "JavaScript"],
+        "frontend_technologies": ["React"],
+        "backend_technologies": ["Flask", "Node.js"],
+        "version_control_deployment": ["Git", "Docker"],
+        "computer_science_fundamentals": ["DSA", "DBMS"]
+    },
+    "experience": [],
+    "projects": [
+        {
+            "name": "Workify",
+            "technologies": ["React", "Node.js"],
+            "links": {"live_site": "", "github_repo": ""},
+            "achievements": ["Served 1,000 users"]
+        }
+    ],
+    "achievements": [],
+    "positions_of_responsibility": []
+}
+
+ATS_RESPONSE = """Overall ATS Score: 78
+
+Detailed Scores (out of 100 for each category):
+- Content Quality: 80/100 (15% weight)
+- ATS Parse Rate: 85/100 (15% weight)
+- Quantifying Impact: 70/100 (15% weight)
+- Repetition Check: 80/100 (10% weight)
+- Spelling & Grammar: 90/100 (10% weight)
+- Format: 75/100 (10% weight)
+- Sections: 80/100 (12.5% weight)
+- Style: 70/100 (12.5% weight)
+
+Key Strengths:
+1. Clear technical skills section
+
+Areas for Improvement:
+1. Add more quantified achievements
+
+Actionable Recommendations:
+1. Quantify the impact of each project
+"""
+
+
+ATS_JSON_RESPONSE = {
+    "ats_score": 78,
+    "detailed_scores": {
+        "content_quality": 80,
+        "ats_parse_rate": 85,
+        "quantifying_impact": 70,
+        "repetition_check": 80,
+        "spelling_grammar": 90,
+        "format": 75,
+        "sections": 80,
+        "style": 70
+    },
+    "category_analysis": {
+        "quantifying_impact": "Most project bullets describe features without measurable outcomes."
+    },
+    "strengths": ["Clear technical skills section"],
+    "improvements": ["Add more quantified achievements"],
+    "recommendations": ["Quantify the impact of each project"]
+}
+
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+
+def stub_response_text(prompt, json_output=False):
+    """
+    Pick a canned answer that matches the kind of prompt that was sent.
+
+    ATS answers name the first email address of the resume as a strength, so
+    load tests can check that every answer belongs to the upload it came back for.
+    """
+    if "resume parsing" in prompt:
+        return json.dumps(PARSE_RESPONSE)
+    email = _EMAIL_RE.search(prompt)
+    strength = f"Contact email {email.group(0)} is easy to find" if email else None
+    if json_output:
+        if strength is None:
+            return json.dumps(ATS_JSON_RESPONSE)
+        return json.dumps(dict(ATS_JSON_RESPONSE, strengths=ATS_JSON_RESPONSE["strengths"] + [strength]))
+    if strength is None:
+        return ATS_RESPONSE
+    return ATS_RESPONSE.replace("1. Clear technical skills section\n", f"1. Clear technical skills section\n2. {strength}\n")
+
+
+class StubResponse:
+    """Minimal stand-in for GenerateContentResponse"""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        if usage_metadata is not None:
+            self.usage_metadata = usage_metadata
+
+
+def split_chunks(text, size=120):
+    """Split a response into stream chunks, breaking after newlines where possible"""
+    chunks = []
+    while text:
+        cut = text.rfind("\n", 0, size)
+        cut = size if cut <= 0 or len(text) <= size else cut + 1
+        chunks.append(text[:cut])
+        text = text[cut:]
+    return chunks
+
+
+def _post_json(url, payload, method="POST"):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method=method,
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+class StubCachedContent:
+    """Stand-in for genai.caching.CachedContent backed by the stub server"""
+
+    def __init__(self, base_url, name):
+        self.base_url = base_url.rstrip("/")
+        self.name = name
+
+    @classmethod
+    def create(cls, base_url, model, system_instruction=None, ttl=None):
+        result = _post_json(f"{base_url.rstrip('/')}/cachedContents", {
+            "model": model,
+            "system_instruction": system_instruction,
+            "ttl": ttl,
+        })
+        return cls(base_url, result["name"])
+
+    def update(self, ttl=None):
+        _post_json(f"{self.base_url}/{self.name}", {"ttl": ttl}, method="PATCH")
+
+
+class StubGenerativeModel:
+    """Talks to the stub server with the same interface as genai.GenerativeModel"""
+
+    def __init__(self, base_url, model_name, generation_config=None, safety_settings=None,
+                 system_instruction=None, cached_content=None):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.system_instruction = system_instruction
+        self.cached_content = cached_content.name if cached_content is not None else None
+
+    def _payload(self, prompt, stream=False):
+        json_output = (self.generation_config or {}).get("response_mime_type") == "application/json"
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "json": json_output
+        }
+        # Like the real API, a cached prefix is referenced by name instead of being re-sent
+        if self.cached_content:
+            payload["cached_content"] = self.cached_content
+        elif self.system_instruction:
+            payload["system_instruction"] = self.system_instruction
+        return json.dumps(payload).encode("utf-8")
+
+    def _stream(self, request):
+        with urllib.request.urlopen(request) as response:
+            for line in response:
+                if line.strip():
+                    yield StubResponse(json.loads(line)["text"])
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        request = urllib.request.Request(
+            f"{self.base_url}/generate",
+            data=self._payload(prompt, stream),
+            headers={"Content-Type": "application/json"},
+        )
+        if stream:
+            return self._stream(request)
+        with urllib.request.urlopen(request) as response:
+            return StubResponse(json.loads(response.read())["text"])
+
+    async def generate_content_async(self, prompt, **kwargs):
+        body = self._payload(prompt)
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                f"POST /generate HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        head, _, payload = raw.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        if status != 200:
+            raise urllib.error.HTTPError(f"{self.base_url}/generate", status, "Stub model server error", None, None)
+        return StubResponse(json.loads(payload)["text"])
+
+
+class FakeGenerativeModel:
+    """
+    In-process stand-in for genai.GenerativeModel with deterministic latency.
+
+    Each call sleeps latency +/- jitter seconds, where the offset is derived
+    from the seed and the prompt, so repeated runs over the same corpus
+    produce the same delays whatever order the calls are made in. Responses
+    carry usage metadata estimated at four characters per token.
+    """
+
+    def __init__(self, model_name, generation_config=None, safety_settings=None, system_instruction=None,
+                 latency=1.0, jitter=0.0, seed=0):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.system_instruction = system_instruction or ""
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+
+    @classmethod
+    def factory(cls, latency=1.0, jitter=0.0, seed=0):
+        """A model_factory for gemini_client.GeminiClient that builds fake models with these settings"""
+        def build(model_name, generation_config=None, safety_settings=None, system_instruction=None):
+            return cls(model_name, generation_config, safety_settings, system_instruction, latency, jitter, seed)
+        return build
+
+    def _delay(self, prompt):
+        digest = hashlib.blake2b(f"{self.seed}:{prompt}".encode("utf-8"), digest_size=8).digest()
+        offset = int.from_bytes(digest, "big") / 2 ** 64 * 2 - 1
+        return max(self.latency + offset * self.jitter, 0)
+
+    def _answer(self, prompt):
+        prompt = prompt if isinstance(prompt, str) else str(prompt)
+        json_output = (self.generation_config or {}).get("response_mime_type") == "application/json"
+        text = stub_response_text(self.system_instruction + prompt, json_output)
+        usage = SimpleNamespace(
+            prompt_token_count=(len(self.system_instruction) + len(prompt)) // 4 + 1,
+            candidates_token_count=len(text) // 4 + 1,
+            cached_content_token_count=0,
+        )
+        return self._delay(prompt), text, usage
+
+    def _stream(self, delay, text, usage):
+        chunks = split_chunks(text)
+        for index, chunk in enumerate(chunks):
+            time.sleep(delay / len(chunks))
+            yield StubResponse(chunk, usage if index == len(chunks) - 1 else None)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        delay, text, usage = self._answer(prompt)
+        if stream:
+            return self._stream(delay, text, usage)
+        time.sleep(delay)
+        return StubResponse(text, usage)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        delay, text, usage = self._answer(prompt)
+        await asyncio.sleep(delay)
+        return StubResponse(text, usage)
+
+
+class StubModelServer:
+    """Asyncio HTTP server that answers /generate after a configurable delay"""
+
+    def __init__(self, host="127.0.0.1", port=8500, latency=1.0, jitter=0.0, error_rate=0.0,
+                 slow_rate=0.0, slow_latency=10.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        # Fraction of /generate calls answered with a 429 or 503, to exercise retries
+        self.error_rate = error_rate
+        # Fraction of calls that take slow_latency seconds instead, to produce a latency tail
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.requests = 0
+        self.failed_requests = 0
+        # name -> (system instruction, expiry on the monotonic clock)
+        self.cached_contents = {}
+        self.cached_requests = 0
+        self.sent_prompt_chars = 0
+        self.cached_prompt_chars = 0
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "cached_requests": self.cached_requests,
+            "cached_contents": len(self.cached_contents),
+            "sent_prompt_chars": self.sent_prompt_chars,
+            "cached_prompt_chars": self.cached_prompt_chars,
+        }
+
+    async def _send_json(self, writer, status, payload):
+        reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 503: "Service Unavailable"}.get(status, "Error")
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+    def _cached_content(self, name):
+        entry = self.cached_contents.get(name)
+        if entry is None or entry[1] < time.monotonic():
+            self.cached_contents.pop(name, None)
+            return None
+        return entry[0]
+
+    def _handle_cache(self, method, path, payload):
+        """Create (POST /cachedContents) or extend (PATCH /cachedContents/<id>) a cached prefix"""
+        ttl = payload.get("ttl") or 3600
+        if method == "POST" and path == "/cachedContents":
+            name = f"cachedContents/stub-{len(self.cached_contents) + 1}-{int(time.time() * 1000)}"
+            self.cached_contents[name] = (payload.get("system_instruction") or "", time.monotonic() + ttl)
+            return 200, {"name": name}
+        name = path.lstrip("/")
+        instruction = self._cached_content(name)
+        if instruction is None:
+            return 404, {"error": f"CachedContent not found: {name}"}
+        self.cached_contents[name] = (instruction, time.monotonic() + ttl)
+        return 200, {"name": name}
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path = request_line.decode("latin-1").split()[:2]
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    content_length = int(value.strip())
+            body = await reader.readexactly(content_length) if content_length else b"{}"
+            payload = json.loads(body)
+
+            if path == "/stats":
+                await self._send_json(writer, 200, self.stats())
+                return
+            if path.startswith("/cachedContents"):
+                await self._send_json(writer, *self._handle_cache(method, path, payload))
+                return
+
+            self.requests += 1
+            if self.error_rate and random.random() < self.error_rate:
+                self.failed_requests += 1
+                await self._send_json(writer, random.choice([429, 503]), {"error": "Injected failure"})
+                return
+            prompt = payload.get("prompt", "")
+            instruction = payload.get("system_instruction") or ""
+            self.sent_prompt_chars += len(prompt) + len(instruction)
+            if payload.get("cached_content"):
+                instruction = self._cached_content(payload["cached_content"])
+                if instruction is None:
+                    await self._send_json(writer, 404, {"error": f"CachedContent not found: {payload['cached_content']}"})
+                    return
+                self.cached_requests += 1
+                self.cached_prompt_chars += len(instruction)
+
+            delay = max(self.latency + random.uniform(-self.jitter, self.jitter), 0)
+            if self.slow_rate and random.random() < self.slow_rate:
+                delay = self.slow_latency
+            text = stub_response_text(instruction + prompt, payload.get("json", False))
+
+            if payload.get("stream"):
+                # Spread the generation time over the chunks, like a model emitting tokens
+                chunks = split_chunks(text)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                    b"Connection: close\r\n\r\n"
+                )
+                for chunk in chunks:
+                    await asyncio.sleep(delay / len(chunks))
+                    writer.write(json.dumps({"text": chunk}).encode("utf-8") + b"\n")
+                    await writer.drain()
+                return
+
+            await asyncio.sleep(delay)
+            await self._send_json(writer, 200, {"text": text})
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None):
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stub of the Gemini API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds before each answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failed with 429/503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of calls answered after --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=10.0, help="Seconds taken by the slow calls")
+    args = parser.parse_args()
+
+    print(f"Stub model server listening on http://{args.host}:{args.port}")
+    server = StubModelServer(
+        args.host, args.port, args.latency, args.jitter, args.error_rate, args.slow_rate, args.slow_latency
+    )
+    asyncio.run(server.serve())
@@ -0,0 +1,244 @@
+"""
+Per-stage timing, Prometheus metrics and leveled logging.
+
+Metrics are kept in process and rendered in the Prometheus text format by
+the /metrics endpoint of the Flask and ASGI apps:
+
+- resume_stage_seconds{stage}: time spent in each pipeline stage (upload,
+  pdf_open, text_extraction, link_extraction, prompt_build, model,
+  json_parse, enrichment)
+- resume_request_seconds{endpoint,status}: end-to-end request latency
+- resume_model_tokens{kind}: prompt, output and cached tokens per model call
+- resume_cache_requests_total{result} and resume_cache_hit_ratio: result cache
+  hits and misses
+
+Use span("stage") around a block (or observe_stage when the time was
+measured elsewhere, e.g. in a PDF extraction worker) to record a stage.
+
+Log records go through a queue to a background thread, so request threads
+never block on stdout. LOG_LEVEL sets the level (default INFO) and
+LOG_SAMPLE_RATE the fraction of DEBUG and INFO records that are kept
+(default 1.0); warnings and errors are always logged. METRICS_ENABLED=0
+turns recording off.
+"""
+import atexit
+import bisect
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no', 'off')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers sub-millisecond parsing up to slow model calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+_REGISTRY = []
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def inc(self, *labelvalues, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_labels(self.labelnames, values)} {_format_value(value)}' for values, value in items]
+
+
+class Gauge:
+    """Gauge whose value is computed by a function when the metrics are rendered"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        _REGISTRY.append(self)
+
+    def samples(self):
+        return [f'{self.name} {_format_value(float(self.function()))}']
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def observe(self, value, *labelvalues):
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues):
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((values, (list(counts), total)) for values, (counts, total) in self._series.items())
+        lines = []
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, values)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, values)} {cumulative}')
+        return lines
+
+
+STAGE_SECONDS = Histogram('resume_stage_seconds', 'Time spent in each resume pipeline stage', ['stage'])
+REQUEST_SECONDS = Histogram('resume_request_seconds', 'End-to-end HTTP request latency', ['endpoint', 'status'])
+MODEL_TOKENS = Histogram('resume_model_tokens', 'Tokens per model call', ['kind'], buckets=TOKEN_BUCKETS)
+CACHE_REQUESTS = Counter('resume_cache_requests_total', 'Result cache lookups', ['result'])
+PROMPT_TOKENS_SAVED = Histogram(
+    'resume_prompt_tokens_saved', 'Resume tokens removed by prompt compaction per prompt', ['prompt'],
+    buckets=(0,) + TOKEN_BUCKETS,
+)
+
+
+def _cache_hit_ratio():
+    hits, misses = CACHE_REQUESTS.value('hit'), CACHE_REQUESTS.value('miss')
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+CACHE_HIT_RATIO = Gauge('resume_cache_hit_ratio', 'Share of result cache lookups that were hits', _cache_hit_ratio)
+
+
+def observe_stage(stage, seconds):
+    """Record `seconds` spent in a pipeline stage"""
+    STAGE_SECONDS.observe(seconds, stage)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as a pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+def observe_tokens(prompt_tokens, output_tokens, cached_tokens=0):
+    """Record the token counts of one model call"""
+    MODEL_TOKENS.observe(prompt_tokens, 'prompt')
+    MODEL_TOKENS.observe(output_tokens, 'output')
+    if cached_tokens:
+        MODEL_TOKENS.observe(cached_tokens, 'cached')
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+class _SampleFilter(logging.Filter):
+    """Keep every warning and error, and LOG_SAMPLE_RATE of the other records"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+_logger = logging.getLogger('resume')
+_listener = None
+_configure_lock = threading.Lock()
+
+
+def _configure_logging():
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        records = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(records)
+        # Sampling happens before the record is queued, so dropped records cost nothing downstream
+        queue_handler.addFilter(_SampleFilter(LOG_SAMPLE_RATE))
+        _logger.addHandler(queue_handler)
+        _logger.setLevel(LOG_LEVEL)
+        _logger.propagate = False
+        _listener = logging.handlers.QueueListener(records, handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    """Return the logger for a module, e.g. get_logger(__name__)"""
+    _configure_logging()
+    return _logger.getChild(name)
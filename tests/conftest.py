@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app reads these at import; tests never talk to Gemini or write to uploads/
+os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+os.environ.setdefault("RESUME_STORE", "0")
+os.environ.setdefault("PDF_POOL_SIZE", "0")
+
+
+def call_asgi(app, method, path, body=b"", headers=(), query_string=b""):
+    """Send one HTTP request through an ASGI app; returns (status, headers dict, body bytes)"""
+    import asyncio
+
+    async def run():
+        scope = {
+            "type": "http", "method": method, "path": path, "query_string": query_string,
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        }
+        received = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return received.pop(0) if received else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(run())
+    start = sent[0]
+    response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in start["headers"]}
+    return start["status"], response_headers, b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def multipart(field, files):
+    """Encode [(file name, bytes)] as a multipart body under `field`; returns (content type, body)"""
+    from io import BytesIO
+
+    from werkzeug.datastructures import FileStorage, MultiDict
+    from werkzeug.test import encode_multipart
+
+    values = MultiDict([(field, FileStorage(BytesIO(data), filename=name)) for name, data in files])
+    boundary, body = encode_multipart(values)
+    return f"multipart/form-data; boundary={boundary}", body
+
+
+def sample_pdf(text="Jane Doe\njane.doe@example.com\nSkills: Python, Flask"):
+    """A one-page PDF holding `text`"""
+    import fitz
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+@pytest.fixture
+def fake_model():
+    """Route every Gemini call to the deterministic in-process fake model"""
+    import gemini_client
+    from stub_model import FakeGenerativeModel
+
+    previous = gemini_client._client
+    client = gemini_client.init_client("test-key", model_factory=FakeGenerativeModel.factory(latency=0.0))
+    yield client
+    gemini_client._client = previous
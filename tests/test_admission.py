@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from io import BytesIO
+
+import pytest
+
+import admission
+from admission import AdmissionLimiter, Overloaded
+from conftest import call_asgi, multipart, sample_pdf
+
+
+def test_full_queue_is_rejected_at_once():
+    limiter = AdmissionLimiter(max_in_flight=1, max_queued=0, queue_timeout=5)
+    with limiter.slot():
+        with pytest.raises(Overloaded, match="queue full") as error:
+            limiter.enter()
+    assert error.value.retry_after == admission.RETRY_AFTER_SECONDS
+    assert limiter.stats() == {"in_flight": 0, "queued": 0, "rejected": 1, "max_in_flight": 1, "max_queued": 0}
+
+
+def test_queued_upload_times_out():
+    limiter = AdmissionLimiter(max_in_flight=1, max_queued=1, queue_timeout=0.05)
+    with limiter.slot():
+        with pytest.raises(Overloaded, match="timed out"):
+            limiter.enter()
+    assert limiter.stats()["queued"] == 0
+
+
+def test_queued_upload_gets_the_freed_slot():
+    limiter = AdmissionLimiter(max_in_flight=1, max_queued=1, queue_timeout=5)
+    limiter.enter()
+    threading.Timer(0.05, limiter.leave).start()
+    limiter.enter()
+    limiter.leave()
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_async_slot_is_rejected_when_the_queue_is_full():
+    limiter = AdmissionLimiter(max_in_flight=1, max_queued=0, queue_timeout=5)
+
+    async def main():
+        async with limiter.slot_async():
+            with pytest.raises(Overloaded):
+                async with limiter.slot_async():
+                    pass
+
+    asyncio.run(main())
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_flask_app_answers_429_with_retry_after(monkeypatch):
+    import app as flask_module
+
+    limiter = AdmissionLimiter(max_in_flight=1, max_queued=0)
+    monkeypatch.setattr(flask_module, "upload_limiter", limiter)
+    limiter.enter()
+    response = flask_module.app.test_client().post("/process")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(admission.RETRY_AFTER_SECONDS)
+    assert response.get_json()["error"] == "Too many requests"
+
+
+def test_asgi_app_answers_429_with_retry_after(monkeypatch):
+    asgi_app = pytest.importorskip("asgi_app")
+
+    limiter = AdmissionLimiter(max_in_flight=0, max_queued=0)
+    monkeypatch.setattr(asgi_app, "upload_limiter", limiter)
+    content_type, body = multipart("file", [("resume.pdf", sample_pdf())])
+    status, headers, _ = call_asgi(asgi_app.app, "POST", "/parse-resume", body, [("Content-Type", content_type)])
+    assert status == 429
+    assert headers["retry-after"] == str(admission.RETRY_AFTER_SECONDS)
+
+
+def test_flask_stream_holds_its_slot_until_sent(monkeypatch, fake_model):
+    import app as flask_module
+
+    limiter = AdmissionLimiter(max_in_flight=1, max_queued=0)
+    monkeypatch.setattr(flask_module, "upload_limiter", limiter)
+    client = flask_module.app.test_client()
+    response = client.post(
+        "/process-stream", data={"pdf_doc": (BytesIO(sample_pdf()), "resume.pdf")}, buffered=False
+    )
+    assert response.status_code == 200 and limiter.in_flight == 1
+    assert client.post("/process-stream").status_code == 429
+    assert b"event: complete" in response.get_data()
+    response.close()
+    assert limiter.in_flight == 0
+
+
+def test_asgi_stream_is_limited(monkeypatch, fake_model):
+    asgi_app = pytest.importorskip("asgi_app")
+
+    monkeypatch.setattr(asgi_app, "upload_limiter", AdmissionLimiter(max_in_flight=0, max_queued=0))
+    content_type, body = multipart("pdf_doc", [("resume.pdf", sample_pdf())])
+    status, _, _ = call_asgi(asgi_app.app, "POST", "/process-stream", body, [("Content-Type", content_type)])
+    assert status == 429
@@ -0,0 +1,68 @@
+import json
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from conftest import call_asgi, multipart, sample_pdf
+
+asgi_app = pytest.importorskip("asgi_app")
+app = asgi_app.app
+
+ORIGIN = ("Origin", "http://localhost:5173")
+
+
+def test_preflight_is_answered_with_cors_headers():
+    status, headers, _ = call_asgi(app, "OPTIONS", "/process", headers=[
+        ORIGIN, ("Access-Control-Request-Method", "POST"), ("Access-Control-Request-Headers", "content-type"),
+    ])
+    assert status == 200
+    assert headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert headers["access-control-allow-methods"] == "GET, OPTIONS, POST"
+    assert headers["access-control-allow-headers"] == "content-type"
+
+
+def test_responses_carry_cors_headers_for_allowed_origins_only():
+    _, headers, _ = call_asgi(app, "GET", "/", headers=[ORIGIN])
+    assert headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert headers["vary"] == "Origin"
+    _, headers, _ = call_asgi(app, "GET", "/", headers=[("Origin", "http://example.com")])
+    assert "access-control-allow-origin" not in headers
+
+
+def test_process_stream_sends_server_sent_events(fake_model):
+    content_type, body = multipart("pdf_doc", [("resume.pdf", sample_pdf())])
+    status, headers, payload = call_asgi(app, "POST", "/process-stream", body, [("Content-Type", content_type), ORIGIN])
+    assert status == 200
+    assert headers["content-type"] == "text/event-stream"
+    assert headers["access-control-allow-origin"] == "http://localhost:5173"
+    events = [block.split("\n")[0] for block in payload.decode("utf-8").strip().split("\n\n")]
+    assert events[-1] == "event: complete"
+
+
+def test_parse_resumes_streams_one_line_per_resume(fake_model):
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("b.pdf", sample_pdf("Bob Builder\nbob@example.com"))
+    content_type, body = multipart("files", [("a.pdf", sample_pdf()), ("more.zip", archive.getvalue())])
+    status, headers, payload = call_asgi(app, "POST", "/parse-resumes", body, [("Content-Type", content_type)])
+    assert status == 200
+    assert headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+    assert sorted(line["file"] for line in lines[:-1]) == ["a.pdf", "b.pdf"]
+    assert lines[-1]["summary"]["ok"] == 2
+
+
+def test_process_stream_caches_under_its_own_key(fake_model, monkeypatch):
+    import app as flask_module
+    from result_cache import MemoryCacheBackend, ResultCache
+
+    cache = ResultCache(MemoryCacheBackend())
+    # cache_score_result writes through the Flask module's cache
+    monkeypatch.setattr(flask_module, "result_cache", cache)
+    monkeypatch.setattr(asgi_app, "result_cache", cache)
+    pdf = sample_pdf()
+    content_type, body = multipart("pdf_doc", [("resume.pdf", pdf)])
+    call_asgi(app, "POST", "/process-stream", body, [("Content-Type", content_type)])
+    assert cache.get(asgi_app.stream_score_cache_key(pdf))["detailed_scores"]
+    assert cache.get(asgi_app.score_cache_key(pdf)) is None
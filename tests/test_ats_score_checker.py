@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+import ats_score_checker
+from ats_score_checker import CATEGORIES, parse_json_analysis, parse_model_output
+
+NAMES = [name for _, name, _ in CATEGORIES]
+
+
+def _analysis(**overrides):
+    data = {
+        "ats_score": 78,
+        "detailed_scores": {key: 70 + index for index, (key, _, _) in enumerate(CATEGORIES)},
+        "category_analysis": {"content_quality": " Strong verbs ", "format": ""},
+        "strengths": ["Clear layout", "  "],
+        "improvements": ["Add metrics"],
+        "recommendations": "Not a list",
+    }
+    data.update(overrides)
+    return json.dumps(data)
+
+
+def test_json_analysis_uses_display_names():
+    result = parse_json_analysis(_analysis())
+    assert result["ats_score"] == 78
+    assert list(result["detailed_scores"]) == NAMES
+    assert result["detailed_scores"]["Content Quality"] == 70
+    assert result["category_analysis"] == {"Content Quality": "Strong verbs"}
+    assert result["strengths"] == ["Clear layout"]
+    assert result["recommendations"] == []
+
+
+def test_json_analysis_accepts_code_fences_and_display_name_keys():
+    text = "```json\n" + _analysis(detailed_scores={"Content Quality": 88.6, "format": 140}) + "\n```"
+    result = parse_json_analysis(text)
+    assert result["detailed_scores"] == {"Content Quality": 89, "Format": 100}
+
+
+def test_missing_overall_score_is_weighted_average():
+    result = parse_json_analysis(_analysis(ats_score=None, detailed_scores={"content_quality": 80, "format": 50}))
+    # (80 * 0.15 + 50 * 0.10) / 0.25
+    assert result["ats_score"] == 68
+
+
+@pytest.mark.parametrize("text", [
+    "not json",
+    "[1, 2]",
+    json.dumps({"ats_score": 50}),
+    json.dumps({"detailed_scores": {"unknown": 50}}),
+])
+def test_invalid_json_analysis_raises(text):
+    with pytest.raises(ValueError):
+        parse_json_analysis(text)
+
+
+def test_model_output_falls_back_to_text_parsing():
+    text = "Overall ATS Score: 64\n\nDetailed Scores:\n- Content Quality: 70/100\n- Format: 60/100\n"
+    result = parse_model_output(text, output_mode="json")
+    assert result["ats_score"] == 64
+    assert result["detailed_scores"] == {"Content Quality": 70, "Format": 60}
+
+
+def test_text_mode_skips_json_parsing(monkeypatch):
+    monkeypatch.setattr(ats_score_checker, "parse_json_analysis", pytest.fail)
+    assert parse_model_output("Overall ATS Score: 10", output_mode="text")["ats_score"] == 10
+
+
+STREAMED = """Overall ATS Score: 72
+
+Detailed Scores:
+- Content Quality: 80/100
+- ATS Parse Rate: 65/100
+
+Key Strengths:
+1. Clear layout
+"""
+
+
+def _feed(chunks):
+    parser = ats_score_checker.StreamingAnalysisParser()
+    events = [event for chunk in chunks for event in parser.feed(chunk)]
+    final_events, result = parser.finish()
+    return events, final_events, result
+
+
+def test_stream_events_arrive_with_their_lines():
+    parser = ats_score_checker.StreamingAnalysisParser()
+    assert parser.feed("Overall ATS Sc") == []
+    assert parser.feed("ore: 72\n\n- Content") == [{"event": "overall_score", "data": {"ats_score": 72}}]
+    assert parser.feed(" Quality: 80/1") == []
+    assert parser.feed("00\n") == [{"event": "detailed_score", "data": {"category": "Content Quality", "score": 80}}]
+    assert parser.overall_score == 72 and parser.detailed_scores == {"Content Quality": 80}
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(STREAMED)])
+def test_stream_result_does_not_depend_on_chunking(size):
+    events, final_events, result = _feed([STREAMED[i:i + size] for i in range(0, len(STREAMED), size)])
+    assert final_events == []
+    assert [event["event"] for event in events] == ["overall_score", "detailed_score", "detailed_score"]
+    assert result == ats_score_checker.parse_analysis_response(STREAMED)
+    assert result["detailed_scores"] == {"Content Quality": 80, "ATS Parse Rate": 65}
+
+
+def test_stream_flushes_last_line_without_newline():
+    events, final_events, result = _feed(["Overall ATS Score: 5", "0\n- Format: 4", "0/100"])
+    assert [event["event"] for event in events] == ["overall_score"]
+    assert final_events == [{"event": "detailed_score", "data": {"category": "Format", "score": 40}}]
+    assert result["ats_score"] == 50
+
+
+def test_stream_reports_overall_score_once():
+    events, _, _ = _feed(["Overall ATS Score: 60\n", "Overall ATS Score: 90\n"])
+    assert events == [{"event": "overall_score", "data": {"ats_score": 60}}]
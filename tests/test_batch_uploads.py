@@ -0,0 +1,61 @@
+import json
+import zipfile
+from io import BytesIO
+
+from werkzeug.datastructures import FileStorage
+
+import app as flask_module
+from conftest import sample_pdf
+
+
+def _zip(names):
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name in names:
+            zf.writestr(name, sample_pdf(name))
+    archive.seek(0)
+    return archive
+
+
+def test_zip_members_are_read_only_when_the_batch_reaches_them(monkeypatch):
+    sources, error = flask_module._open_batch_uploads([FileStorage(_zip(["a.pdf", "b.pdf", "notes.txt"]), "cv.zip")])
+    assert error is None
+    reads = []
+    read = zipfile.ZipFile.read
+    monkeypatch.setattr(zipfile.ZipFile, "read", lambda self, info, *args: reads.append(info.filename) or read(self, info, *args))
+
+    items = flask_module._iter_batch_items(sources)
+    assert reads == []
+    assert next(items)[0] == "a.pdf"
+    assert reads == ["a.pdf"]
+    assert [name for name, _ in items] == ["b.pdf"]
+    assert sources[0][1].fp is None
+
+
+def test_invalid_zip_is_rejected_before_the_stream_starts():
+    response = flask_module.app.test_client().post(
+        "/parse-resumes", data={"files": (BytesIO(b"not a zip"), "cv.zip")}
+    )
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid zip archive"
+
+
+def test_parse_resumes_streams_zip_members(fake_model):
+    response = flask_module.app.test_client().post(
+        "/parse-resumes", data={"files": [(_zip(["a.pdf", "b.pdf"]), "cv.zip"), (BytesIO(sample_pdf()), "c.pdf")]}
+    )
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(line["file"] for line in lines[:-1]) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert lines[-1]["summary"]["ok"] == 3
+
+
+def test_parse_resumes_is_shed_when_the_server_is_busy(monkeypatch):
+    from admission import Overloaded
+
+    def overloaded():
+        raise Overloaded("queue full")
+
+    monkeypatch.setattr(flask_module.upload_limiter, "enter", overloaded)
+    response = flask_module.app.test_client().post("/parse-resumes", data={"files": (BytesIO(sample_pdf()), "a.pdf")})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from call_scheduler import BATCH, INTERACTIVE, CallScheduler, DeadlineExceeded
+
+
+def _fill_queue(scheduler, lanes):
+    """Hold the only slot, queue one thread per lane, then free the slot; returns the admission order"""
+    order = []
+
+    def run(lane, name):
+        scheduler.call(lambda timeout: order.append(name), 1, priority=lane)
+
+    scheduler.acquire(1)
+    threads = []
+    for lane, name in lanes:
+        thread = threading.Thread(target=run, args=(lane, name))
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()["waiting"] < len(threads):
+            time.sleep(0.001)
+    scheduler.release()
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_interactive_calls_take_free_slots_before_batch_calls():
+    scheduler = CallScheduler(rpm=0, tpm=0, max_concurrency=1)
+    order = _fill_queue(scheduler, [(BATCH, "batch-1"), (BATCH, "batch-2"), (INTERACTIVE, "upload")])
+    assert order == ["upload", "batch-1", "batch-2"]
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_queued_call_fails_at_its_deadline():
+    scheduler = CallScheduler(rpm=0, tpm=0, max_concurrency=1)
+    scheduler.acquire(1)
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire(1, deadline=time.monotonic() + 0.05)
+    scheduler.release()
+    assert scheduler.stats()["waiting"] == 0
+    scheduler.acquire(1)
+
+
+def test_async_waiter_is_woken_by_a_release_from_another_thread():
+    scheduler = CallScheduler(rpm=0, tpm=0, max_concurrency=1)
+
+    async def main():
+        scheduler.acquire(1)
+        threading.Timer(0.05, scheduler.release).start()
+        start = time.monotonic()
+        await scheduler.acquire_async(1)
+        scheduler.release()
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 1
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    scheduler = CallScheduler(rpm=0, tpm=0, max_concurrency=1)
+
+    async def main():
+        scheduler.acquire(1)
+        task = asyncio.ensure_future(scheduler.acquire_async(1))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        scheduler.release()
+
+    asyncio.run(main())
+    assert scheduler.stats()["waiting"] == 0
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_interactive_calls_get_the_quota_before_batch_calls():
+    # 60000 tokens per minute refill at 1000 a second; each queued call needs 50
+    scheduler = CallScheduler(rpm=0, tpm=60000, max_concurrency=0)
+    scheduler.acquire(60000)
+    scheduler.release()
+    order = []
+
+    async def run(lane, name):
+        await scheduler.acquire_async(50, lane)
+        order.append(name)
+        scheduler.release()
+
+    async def main():
+        batch = asyncio.ensure_future(run(BATCH, "batch"))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(batch, run(INTERACTIVE, "upload"))
+
+    asyncio.run(main())
+    assert order == ["upload", "batch"]
+
+
+def test_quota_wait_longer_than_the_deadline_fails_at_once():
+    scheduler = CallScheduler(rpm=1, tpm=0, max_concurrency=0)
+    scheduler.acquire(1)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded, match="exceeds the call deadline"):
+        scheduler.acquire(1, deadline=start + 5)
+    assert time.monotonic() - start < 1
+    assert scheduler.stats()["deadline_failures"] == 1
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    monkeypatch.setattr("call_scheduler.BASE_BACKOFF", 0.001)
+    scheduler = CallScheduler(rpm=0, tpm=0, max_retries=2)
+    attempts = []
+
+    def flaky(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert scheduler.call(flaky, 1, priority=INTERACTIVE) == "ok"
+    assert len(attempts) == 2
+    assert scheduler.stats()["retries"] == 1
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_permanent_errors_are_not_retried():
+    scheduler = CallScheduler(rpm=0, tpm=0, max_retries=2)
+
+    def broken(timeout):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        scheduler.call(broken, 1, priority=INTERACTIVE)
+    assert scheduler.stats()["retries"] == 0
+    assert scheduler.stats()["in_flight"] == 0
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import stub_model
+from call_scheduler import CallScheduler
+from gemini_client import GeminiClient
+
+INSTRUCTION = "You are an ATS. Score the resume."
+LATENCY = 0.2
+# A slow cache round trip that would stall every request if it ran on the event loop
+CACHE_LATENCY = 0.3
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server = stub_model.StubModelServer(port=0, latency=LATENCY)
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(server.serve(ready)), daemon=True).start()
+    assert ready.wait(5)
+    return server
+
+
+@pytest.fixture
+def slow_cache(monkeypatch):
+    create, update = stub_model.StubCachedContent.create.__func__, stub_model.StubCachedContent.update
+
+    def slow_create(cls, *args, **kwargs):
+        time.sleep(CACHE_LATENCY)
+        return create(cls, *args, **kwargs)
+
+    def slow_update(self, *args, **kwargs):
+        time.sleep(CACHE_LATENCY)
+        return update(self, *args, **kwargs)
+
+    monkeypatch.setattr(stub_model.StubCachedContent, "create", classmethod(slow_create))
+    monkeypatch.setattr(stub_model.StubCachedContent, "update", slow_update)
+
+
+async def _timed_calls(client, calls):
+    """Run concurrent generate_content_async calls; returns (elapsed, longest event loop stall)"""
+    stalls = []
+
+    async def ticker():
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(0.01)
+            stalls.append(time.monotonic() - start)
+
+    tick = asyncio.ensure_future(ticker())
+    start = time.monotonic()
+    responses = await asyncio.gather(*[
+        client.generate_content_async(f"Resume {i}", "gemini-test", system_instruction=INSTRUCTION)
+        for i in range(calls)
+    ])
+    elapsed = time.monotonic() - start
+    tick.cancel()
+    assert all(response.text for response in responses)
+    return elapsed, max(stalls)
+
+
+def test_concurrent_async_calls_with_context_caching_do_not_block_the_loop(stub_server, slow_cache):
+    client = GeminiClient(
+        api_key="test-key", stub_url=f"http://127.0.0.1:{stub_server.port}", context_cache_ttl=60,
+        scheduler=CallScheduler(rpm=0, tpm=0, max_concurrency=0),
+    )
+    cached_before = stub_server.cached_requests
+
+    async def main():
+        # First use registers the context, the second round refreshes it
+        first = await _timed_calls(client, 10)
+        for context in client._contexts.values():
+            context.check_at = 0
+        return first, await _timed_calls(client, 10)
+
+    for elapsed, stall in asyncio.run(main()):
+        # Serialized calls would take 10 * LATENCY; a blocked loop would stall for CACHE_LATENCY
+        assert elapsed < CACHE_LATENCY + 3 * LATENCY
+        assert stall < CACHE_LATENCY / 2
+    assert stub_server.cached_requests - cached_before == 20
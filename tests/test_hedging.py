@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+
+import hedging
+from call_scheduler import CallScheduler
+from gemini_client import GeminiClient
+from stub_model import FakeGenerativeModel
+
+SLOW = 0.5
+HEDGE_DELAY = 0.05
+
+
+class ScriptedModel(FakeGenerativeModel):
+    """Fake model whose first call is slow, or whose every call fails"""
+
+    def __init__(self, model_name, *args, **kwargs):
+        super().__init__(model_name, *args, **kwargs)
+        self.calls = 0
+
+    def _next_delay(self):
+        self.calls += 1
+        if self.model_name == "broken":
+            raise ConnectionError("connection reset")
+        if self.model_name == "invalid":
+            raise ValueError("bad request")
+        return SLOW if self.model_name == "slow-first" and self.calls == 1 else 0.0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        time.sleep(self._next_delay())
+        return super().generate_content(prompt, stream, **kwargs)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self._next_delay())
+        return await super().generate_content_async(prompt, **kwargs)
+
+
+def _client(hedge=False, fallback_models=()):
+    return GeminiClient(
+        api_key="test-key",
+        model_factory=ScriptedModel.factory(latency=0.0),
+        scheduler=CallScheduler(rpm=0, tpm=0, max_retries=0, max_concurrency=4),
+        hedging=hedging.HedgePolicy(enabled=hedge, initial_delay=HEDGE_DELAY, min_delay=0.01),
+        fallback_models=list(fallback_models),
+    )
+
+
+def _model_stats(client, name):
+    return client.stats()["hedging"]["models"][name]
+
+
+def test_slow_call_is_hedged():
+    client = _client(hedge=True)
+    start = time.perf_counter()
+    response = client.generate_content("Resume text", "slow-first")
+    assert time.perf_counter() - start < SLOW
+    assert response.text
+    stats = _model_stats(client, "slow-first")
+    assert (stats["calls"], stats["hedges_fired"], stats["hedge_wins"]) == (1, 1, 1)
+
+
+def test_slow_async_call_is_hedged():
+    client = _client(hedge=True)
+
+    async def run():
+        start = time.perf_counter()
+        response = await client.generate_content_async("Resume text", "slow-first")
+        return time.perf_counter() - start, response
+
+    elapsed, response = asyncio.run(run())
+    assert elapsed < SLOW and response.text
+    assert _model_stats(client, "slow-first")["hedge_wins"] == 1
+
+
+def test_fast_call_is_not_hedged():
+    client = _client(hedge=True)
+    client.generate_content("Resume text", "fast")
+    stats = _model_stats(client, "fast")
+    assert stats["hedges_fired"] == 0 and stats["latency_p50_s"] is not None
+
+
+def test_hedging_disabled_waits_for_slow_call():
+    client = _client(hedge=False)
+    start = time.perf_counter()
+    client.generate_content("Resume text", "slow-first")
+    assert time.perf_counter() - start >= SLOW
+    assert _model_stats(client, "slow-first")["hedges_fired"] == 0
+
+
+def test_failed_model_falls_back_along_chain():
+    client = _client(fallback_models=["broken", "backup", "unused"])
+    assert client._model_chain("broken") == ["broken", "backup", "unused"]
+    assert client.generate_content("Resume text", "broken").text
+    assert _model_stats(client, "broken")["fallbacks_from"] == 1
+    assert _model_stats(client, "backup")["fallbacks_to"] == 1
+    assert "unused" not in client.stats()["hedging"]["models"]
+
+
+def test_async_failed_model_falls_back():
+    client = _client(fallback_models=["backup"])
+    assert asyncio.run(client.generate_content_async("Resume text", "broken")).text
+    assert _model_stats(client, "backup")["fallbacks_to"] == 1
+
+
+def test_non_retryable_error_does_not_fall_back():
+    client = _client(fallback_models=["backup"])
+    with pytest.raises(ValueError):
+        client.generate_content("Resume text", "invalid")
+    assert "backup" not in client.stats()["hedging"]["models"]
+
+
+def test_last_model_error_is_raised():
+    client = _client(fallback_models=["broken"])
+    with pytest.raises(ConnectionError):
+        client.generate_content("Resume text", "broken")
+
+
+def test_delay_follows_latency_percentile():
+    policy = hedging.HedgePolicy(enabled=True, percentile=90, initial_delay=5.0, min_delay=0.5)
+    for index in range(hedging.MIN_SAMPLES - 1):
+        policy.record_latency("model", index / 10)
+    assert policy.delay("model") == 5.0
+    policy.record_latency("model", 3.0)
+    assert policy.delay("model") == pytest.approx(1.7)
+    assert hedging.HedgePolicy(enabled=True, initial_delay=0.1, min_delay=0.5).delay("other") == 0.1
@@ -0,0 +1,75 @@
+import pytest
+
+import job_matcher
+from resume_store import ResumeStore
+
+JOB = "Backend engineer with Python, Flask and PostgreSQL"
+ALICE = {"id": "alice", "parsed_data": {"skills": {"languages": ["Python"], "backend": ["Flask", "PostgreSQL"]}}}
+BOB = {"id": "bob", "parsed_data": {"skills": {"frontend": ["React", "CSS"]}}}
+
+
+@pytest.fixture(autouse=True)
+def empty_index_cache():
+    job_matcher.index_cache.clear()
+    yield
+    job_matcher.index_cache.clear()
+
+
+@pytest.mark.parametrize("resume", [{"parsed_data": None}, {"parsed_data": 42}, None, 7, ["Python"]])
+def test_rank_request_rejects_records_without_a_resume(resume):
+    with pytest.raises(ValueError, match=r'"resumes"\[1\]'):
+        job_matcher.rank_request({"job_description": JOB, "resumes": [ALICE, resume]})
+
+
+@pytest.mark.parametrize("payload, message", [
+    (None, "JSON object"),
+    ({"resumes": [ALICE]}, "job_description"),
+    ({"job_description": "  ", "resumes": [ALICE]}, "job_description"),
+    ({"job_description": JOB, "resumes": "alice"}, "resumes"),
+    ({"job_description": JOB, "resumes": [ALICE], "top_k": "many"}, "top_k"),
+    ({"job_description": JOB, "resumes": [ALICE], "scoring": "cosine"}, "scoring"),
+])
+def test_rank_request_validates_the_body(payload, message):
+    with pytest.raises(ValueError, match=message):
+        job_matcher.rank_request(payload)
+
+
+def test_plain_string_parsed_data_is_ranked_as_text():
+    result = job_matcher.rank_request({"job_description": JOB, "resumes": [{"id": "carol", "parsed_data": "Python"}]})
+    assert [candidate["id"] for candidate in result["candidates"]] == ["carol"]
+
+
+def test_rank_request_ranks_best_match_first():
+    result = job_matcher.rank_request({"job_description": JOB, "resumes": [BOB, ALICE]})
+    assert result["total"] == 2
+    assert [candidate["id"] for candidate in result["candidates"]] == ["alice"]
+    assert "flask" in result["candidates"][0]["matched_keywords"]
+
+
+def test_same_corpus_reuses_the_index(monkeypatch):
+    payload = {"job_description": JOB, "resumes": [ALICE, BOB]}
+    job_matcher.rank_request(payload)
+    monkeypatch.setattr(job_matcher.CandidateIndex, "build", pytest.fail)
+    assert job_matcher.rank_request(dict(payload, job_description="React developer"))["candidates"][0]["id"] == "bob"
+    assert job_matcher.index_cache.hits == 1
+
+
+def test_store_index_is_rebuilt_after_a_write(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    store.upsert("a" * 64, ALICE["parsed_data"])
+    ranked = job_matcher.rank_request({"job_description": JOB}, store)
+    assert [candidate["id"] for candidate in ranked["candidates"]] == ["a" * 64]
+
+    store.upsert("b" * 64, {"skills": {"languages": ["Python", "Flask", "PostgreSQL", "Django"]}})
+    ranked = job_matcher.rank_request({"job_description": JOB}, store)
+    assert ranked["total"] == 2
+
+
+def test_rank_route_returns_400_for_null_parsed_data():
+    from app import app
+
+    response = app.test_client().post(
+        "/rank-candidates", json={"job_description": JOB, "resumes": [{"parsed_data": None}]}
+    )
+    assert response.status_code == 400
+    assert "parsed_data" in response.get_json()["details"]
@@ -0,0 +1,68 @@
+import dataclasses
+import datetime
+import importlib.util
+import sys
+from decimal import Decimal
+
+import pytest
+
+import json_codec
+from resume_models import AtsReport, ParsedResume
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+
+    def to_dict(self):
+        return {"x": self.x}
+
+
+def test_known_types_are_converted():
+    value = {"tags": {"python"}, "point": Point(1), "price": Decimal("1.50"), "day": datetime.date(2024, 1, 2)}
+    assert json_codec.loads(json_codec.dumpb(value)) == {
+        "tags": ["python"], "point": {"x": 1}, "price": "1.50", "day": "2024-01-02",
+    }
+
+
+def test_numpy_values_are_converted():
+    np = pytest.importorskip("numpy")
+    assert json_codec.loads(json_codec.dumpb({"scores": np.arange(6)[::2], "mean": np.float32(1.5)})) == {
+        "scores": [0, 2, 4], "mean": 1.5,
+    }
+
+
+def test_unknown_types_raise_type_error():
+    with pytest.raises(TypeError):
+        json_codec.dumpb({"value": object()})
+
+
+@pytest.fixture(scope="module")
+def stdlib_codec():
+    """A second copy of json_codec loaded as if orjson were not installed"""
+    saved = sys.modules.get("orjson")
+    sys.modules["orjson"] = None
+    try:
+        spec = importlib.util.spec_from_file_location("json_codec_stdlib", json_codec.__file__)
+        codec = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(codec)
+    finally:
+        if saved is None:
+            del sys.modules["orjson"]
+        else:
+            sys.modules["orjson"] = saved
+    assert codec.BACKEND == "json"
+    return codec
+
+
+@pytest.mark.parametrize("value", [
+    AtsReport(ats_score=5),
+    AtsReport.from_dict({"ats_score": 80, "detailed_scores": {"format": 90}, "strengths": ["Clear"], "scorer": "local"}),
+    ParsedResume.from_dict({"personal_info": {"full_name": "Jane Doe"}, "skills": {"programming_languages": ["Python"]}}),
+    {"report": AtsReport(ats_score=5), "tags": {"a"}, "point": Point(2)},
+])
+def test_both_backends_serialize_the_models_alike(stdlib_codec, value):
+    if json_codec.BACKEND != "orjson":
+        pytest.skip("orjson is not installed")
+    assert json_codec.loads(json_codec.dumpb(value)) == stdlib_codec.loads(stdlib_codec.dumpb(value))
+    assert "scorer" not in json_codec.loads(json_codec.dumpb(AtsReport(ats_score=5)))
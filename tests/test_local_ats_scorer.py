@@ -0,0 +1,89 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import local_ats_scorer  # noqa: E402
+from ats_score_checker import CATEGORIES  # noqa: E402
+
+STRONG = """Jane Doe
+jane.doe@example.com | +91 98765 43210 | github.com/janedoe | linkedin.com/in/janedoe
+Summary
+Backend engineer focused on reliable Python services.
+Education
+B.Tech in Computer Science, IIT Delhi, 2019 - 2023, CGPA: 8.7
+Skills
+Python, Java, SQL, Flask, Django, PostgreSQL, Redis, Docker, Kubernetes, AWS, Git, React
+Experience
+Software Engineer, Acme Corp, May 2023 - Present
+• Reduced API latency by 45% by adding Redis caching to the Flask order service
+• Migrated 12 cron jobs to Kubernetes, cutting infrastructure cost by $3,000 per month
+• Designed a PostgreSQL schema for billing that serves 2M requests per day
+• Mentored 3 interns on testing practices and code review
+Software Intern, Beta Labs, May 2022 - Aug 2022
+• Built a Django admin dashboard used by 40 support agents every day
+• Automated release checks in GitHub Actions, saving 5 hours per week
+Projects
+Workify | React, Node.js, MongoDB
+• Developed a job board that matched 1,200 students with internships
+• Implemented search with Elasticsearch, returning results in under 200 ms
+Achievements
+• Finalist among 500 teams at Smart India Hackathon 2022
+"""
+
+WEAK = """my resume
+i worked on some things at a company and i did stuff ,, and more stuff
+- i did stuff
+- i did stuff
+- helped with things
+"""
+
+
+def test_feature_row_counts_bullets_and_sections():
+    row = dict(zip(local_ats_scorer.FEATURES, local_ats_scorer.extract_features(STRONG)))
+    assert row["bullets"] == 9
+    assert row["quantified_bullets"] == 9
+    # "Finalist" is not an action verb
+    assert row["action_bullets"] == 8
+    assert row["sections_required"] == 4
+    assert row["sections_optional"] == 2
+    assert row["email"] == row["phone"] == 1.0
+    assert row["links"] == 2
+    assert row["pages"] == 1
+
+
+def test_count_skills_matches_multi_word_names():
+    # Spring, Spring Boot, GitHub and GitHub Actions are separate dictionary entries
+    assert local_ats_scorer.count_skills("Python, Spring Boot; github actions (Docker) and python") == 6
+    assert local_ats_scorer.count_skills("no skills here") == 0
+
+
+def test_strong_resume_outscores_weak_one():
+    strong, weak = local_ats_scorer.score_documents([STRONG, WEAK])
+    assert strong["ats_score"] > weak["ats_score"]
+    assert set(strong["detailed_scores"]) == {name for _, name, _ in CATEGORIES}
+    assert strong["detailed_scores"]["Sections"] == 100
+    assert strong["scorer"] == local_ats_scorer.VERSION
+    assert all(0 <= score <= 100 for score in strong["detailed_scores"].values())
+
+
+def test_weighted_overall_score():
+    scores, overall = local_ats_scorer.score_matrix(local_ats_scorer.feature_matrix([STRONG]))
+    weights = np.array([weight for _, _, weight in CATEGORIES])
+    assert overall[0] == int(np.rint(scores[0] @ weights))
+
+
+def test_batch_scores_match_single_scores():
+    batch = local_ats_scorer.score_documents([STRONG, WEAK, STRONG])
+    assert batch == [local_ats_scorer.score_resume(text) for text in (STRONG, WEAK, STRONG)]
+
+
+def test_failed_extraction_scores_zero():
+    result = local_ats_scorer.score_resume("Jane Doe\nPython")
+    assert result["ats_score"] == 0
+    assert set(result["detailed_scores"].values()) == {0}
+    assert result["improvements"] and result["recommendations"]
+
+
+def test_empty_batch():
+    assert local_ats_scorer.feature_matrix([]).shape == (0, len(local_ats_scorer.FEATURES))
+    assert local_ats_scorer.score_documents([]) == []
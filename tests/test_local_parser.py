@@ -0,0 +1,91 @@
+import local_parser
+from parsed_document import LinkAnnotation, PageContent, ParsedDocument
+from text_extraction import PAGE_BREAK
+
+RESUME = """Jane Doe
+jane.doe@example.com
+Education
+B.Tech in Computer Science, IIT Delhi, 2019 - 2023, CGPA: 8.7
+Skills
+Python, React, Flask, Docker, Git
+Experience
+Software Intern, Acme Corp, Remote, May 2022 - Aug 2022
+• Built REST APIs in Flask
+Projects
+Workify | React, Node.js
+• Job board for students
+Achievements
+• Finalist, Smart India Hackathon
+"""
+
+
+def _document(pages, urls=()):
+    return ParsedDocument(
+        [PageContent(number, text, text.split("\n"), ()) for number, text in enumerate(pages)],
+        [LinkAnnotation(url, 0, (0, 0, 0, 0)) for url in urls],
+    )
+
+
+def test_sections_are_parsed():
+    result = local_parser.parse_document(RESUME)
+    assert result["personal_info"]["full_name"] == "Jane Doe"
+    assert result["personal_info"]["contact"]["email"] == "jane.doe@example.com"
+    assert result["education"] == [{
+        "degree": "B.Tech in Computer Science", "institute": "IIT Delhi", "board_university": "",
+        "score": "CGPA: 8.7", "year": "2019 - 2023",
+    }]
+    assert result["skills"]["programming_languages"] == ["Python"]
+    assert result["skills"]["version_control_deployment"] == ["Docker", "Git"]
+    assert result["experience"] == [{
+        "title": "Software Intern", "company": "Acme Corp", "location": "Remote",
+        "duration": "May 2022 - Aug 2022", "achievements": ["Built REST APIs in Flask"],
+    }]
+    assert result["projects"][0]["name"] == "Workify"
+    assert result["projects"][0]["technologies"] == ["React", "Node.js"]
+    assert result["achievements"] == ["Finalist, Smart India Hackathon"]
+    assert local_parser.missing_sections(result) == ["positions_of_responsibility"]
+
+
+def test_find_skills_prefers_longest_name():
+    skills = local_parser.find_skills("React Native, react and Node.js")
+    assert skills["frontend_technologies"] == ["React Native", "React"]
+    assert skills["backend_technologies"] == ["Node.js"]
+
+
+def test_page_furniture_is_dropped_from_text_and_documents():
+    pages = [
+        f"Jane Doe - Resume\n{body}\nPage {number} of 3"
+        for number, body in enumerate(["Skills\nPython, Flask", "Projects\nWorkify | React", "Achievements\nFinalist"], 1)
+    ]
+    for source in (PAGE_BREAK.join(pages), _document(pages)):
+        lines = local_parser._document_lines(source)
+        # The running header is kept once, page numbers are dropped
+        assert lines.count("Jane Doe - Resume") == 1
+        assert not any(line.startswith("Page ") for line in lines)
+        assert "Python, Flask" in lines and "Finalist" in lines
+
+
+def test_project_links_come_from_annotations():
+    document = _document([RESUME], ["https://workify.example.com"])
+    assert local_parser.parse_document(document)["projects"][0]["links"]["live_site"] == "https://workify.example.com"
+
+
+def test_nameless_project_gets_no_links():
+    links = {"workify": {"live": "https://workify.example.com"}}
+    assert local_parser._project_links("", "", links) == {"live_site": "", "github_repo": ""}
+    projects = local_parser._parse_projects(["• A project without a title line"], links)
+    assert projects[0]["name"] == "" and projects[0]["links"] == {"live_site": "", "github_repo": ""}
+
+
+def test_fill_gaps_keeps_local_values():
+    local = local_parser.empty_result()
+    local["personal_info"]["full_name"] = "Jane Doe"
+    model = local_parser.empty_result()
+    model["personal_info"]["full_name"] = "J. Doe"
+    model["personal_info"]["location"] = "Delhi"
+    model["achievements"] = ["Finalist"]
+    merged = local_parser.fill_gaps(local, model)
+    assert merged["personal_info"]["full_name"] == "Jane Doe"
+    assert merged["personal_info"]["location"] == "Delhi"
+    assert merged["achievements"] == ["Finalist"]
+    assert local_parser.fill_gaps(local, ["not a result"]) is local
@@ -0,0 +1,93 @@
+import pickle
+
+import pytest
+
+import parsed_document
+from parsed_document import ParsedDocument, extract_field_info
+
+fitz = pytest.importorskip("fitz")
+
+PAGES = [
+    "Jane Doe\nBengaluru, India\n+91-9876543210 | jane.doe@example.com",
+    "Projects\nWorkify job board",
+    "Achievements\nHackathon finalist",
+]
+
+
+def _pdf(pages=PAGES, links=()):
+    """A PDF with one page per text; links are (page index, url) pairs"""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    for index, url in links:
+        doc[index].insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 60, 200, 80), "uri": url})
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def test_pages_are_read_in_one_pass():
+    document = ParsedDocument.from_pdf(_pdf())
+    assert document.page_count == 3
+    assert [page.number for page in document.pages] == [1, 2, 3]
+    assert document.pages[0].lines == ["Jane Doe", "Bengaluru, India", "+91-9876543210 | jane.doe@example.com"]
+    assert document.pages[0].spans and document.pages[0].spans[0].text == "Jane Doe"
+    assert "Workify job board" in document.text
+    assert set(document.timings) == {"pdf_open", "text_extraction", "link_extraction"}
+
+
+def test_fields_and_links_are_extracted():
+    links = [(0, "https://github.com/janedoe"), (1, "https://workify.example.com"), (1, "https://www.linkedin.com/in/jd")]
+    document = ParsedDocument.from_pdf(_pdf(links=links))
+    # Page text is whitespace-collapsed, so only the pattern-matched fields are exact
+    assert document.fields["phone"] == "+91-9876543210"
+    assert document.fields["email"] == "jane.doe@example.com"
+    assert [(link.url, link.page) for link in document.link_annotations] == [(url, index + 1) for index, url in links]
+    assert document.links == {
+        "github": "https://github.com/janedoe",
+        "workify": {"live": "https://workify.example.com"},
+        "linkedin": "https://www.linkedin.com/in/jd",
+    }
+
+
+def test_payload_round_trip(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(_pdf(links=[(0, "https://github.com/janedoe")]))
+    document = ParsedDocument.from_pdf(str(path))
+    copy = ParsedDocument.from_payload(pickle.loads(pickle.dumps(document.to_payload())))
+    assert copy.text == document.text
+    assert [page.lines for page in copy.pages] == [page.lines for page in document.pages]
+    assert copy.pages[0].spans == ()
+    assert copy.link_annotations == document.link_annotations
+    assert copy.links == document.links and copy.fields == document.fields
+    assert copy.timings["pdf_open"] == document.timings["pdf_open"]
+
+
+def test_pages_after_max_pages_are_ignored(monkeypatch):
+    monkeypatch.setattr(parsed_document, "MAX_PAGES", 2)
+    document = ParsedDocument.from_pdf(_pdf())
+    assert document.page_count == 2
+    assert "Hackathon" not in document.text
+
+
+@pytest.mark.parametrize("source", [b"not a pdf", b"", "/nonexistent/resume.pdf"])
+def test_unreadable_pdf_raises_value_error(source):
+    with pytest.raises(ValueError):
+        ParsedDocument.from_pdf(source)
+
+
+def test_pdf_without_text_raises_value_error():
+    with pytest.raises(ValueError, match="No text content"):
+        ParsedDocument.from_pdf(_pdf(["", ""]))
+
+
+def test_extract_field_info_reads_profile_links():
+    info = extract_field_info("Jane Doe\nDelhi\ngithub.com/jd | linkedin.com/in/jd | leetcode.com/jd\n")
+    assert info["full_name"] == "Jane Doe" and info["location"] == "Delhi"
+    assert info["professional_links"] == {
+        "github": "github.com/jd", "linkedin": "linkedin.com/in/jd", "leetcode": "leetcode.com/jd",
+    }
+    assert extract_field_info("") == {}
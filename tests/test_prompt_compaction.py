@@ -0,0 +1,89 @@
+import fitz
+import pytest
+
+import prompt_compaction
+import text_extraction
+from parsed_document import ParsedDocument
+from prompt_compaction import (
+    TRUNCATION_MARKER, compact_resume, dedupe_lines, is_section_header, page_lines, remove_page_furniture,
+    trim_to_budget,
+)
+
+HEADER = "Jane Doe - Curriculum Vitae - jane.doe@example.com"
+
+
+def _three_page_pdf():
+    doc = fitz.open()
+    for number, body in enumerate(["EXPERIENCE\nAcme Corp, Engineer", "PROJECTS\nResume parser", "SKILLS\nPython"], 1):
+        doc.new_page().insert_text((72, 72), f"{HEADER}\n{body}\nPage {number} of 3")
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("EDUCATION", True), ("Projects:", True), ("Work Experience", True), ("TECHNICAL SKILLS", True),
+    ("Built a Flask API", False), ("AWS", False), ("", False),
+])
+def test_is_section_header(line, expected):
+    assert is_section_header(line) is expected
+
+
+def test_page_lines_splits_text_at_page_breaks():
+    assert page_lines("a\n b \n\n\fc\n") == [["a", "b"], ["c"]]
+    assert page_lines("a\nb") == [["a", "b"]]
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    pages = [[HEADER, "EXPERIENCE", "Page 1 of 2"], [HEADER, "SKILLS", "Page 2 of 2"]]
+    cleaned, removed = remove_page_furniture(pages)
+    assert cleaned == [[HEADER, "EXPERIENCE"], ["SKILLS"]]
+    assert removed == 3
+
+
+def test_extracted_text_keeps_page_boundaries_for_compaction():
+    text = text_extraction.extract_text(_three_page_pdf())
+    assert text.count(text_extraction.PAGE_BREAK) == 2
+    compacted = compact_resume(text, budget=0)
+    assert compacted.text.count("Curriculum Vitae") == 1
+    assert "Page 2 of 3" not in compacted.text
+    assert compacted.removed_lines == 5
+    # The same PDF through ParsedDocument compacts the same way
+    assert compact_resume(ParsedDocument.from_pdf(_three_page_pdf()), budget=0).text == compacted.text
+
+
+def test_long_duplicate_lines_are_dropped():
+    line = "Led the migration of the billing platform to Kubernetes"
+    assert dedupe_lines([line, "Python", "• " + line, "Python"]) == ([line, "Python", "Python"], 1)
+
+
+def test_trim_to_budget_keeps_every_section_header():
+    lines = ["EXPERIENCE"] + [f"Shipped feature number {i} for the platform" for i in range(40)] + ["SKILLS", "Python"]
+    trimmed, truncated = trim_to_budget(lines, 100)
+    assert truncated
+    assert "EXPERIENCE" in trimmed and "SKILLS" in trimmed and "Python" in trimmed
+    assert TRUNCATION_MARKER in trimmed
+    assert sum(prompt_compaction.estimate_tokens(line) + 1 for line in trimmed) <= 100
+
+
+def test_single_long_line_is_cut_at_a_word():
+    compacted = compact_resume("word " * 400, budget=50)
+    assert compacted.truncated
+    assert compacted.text.endswith(TRUNCATION_MARKER)
+    assert compacted.tokens <= 52
+
+
+def test_disabled_compaction_only_turns_page_breaks_into_newlines(monkeypatch):
+    monkeypatch.setattr(prompt_compaction, "ENABLED", False)
+    assert prompt_compaction.prepare_resume_text("a\fb") == "a\nb"
+
+
+def test_saved_tokens_are_recorded(monkeypatch):
+    import telemetry
+
+    monkeypatch.setattr(prompt_compaction, "ENABLED", True)
+    before = telemetry.PROMPT_TOKENS_SAVED.count("ats")
+    prompt_compaction.prepare_resume_text(text_extraction.extract_text(_three_page_pdf()), "ATS")
+    assert telemetry.PROMPT_TOKENS_SAVED.count("ats") == before + 1
+    assert "resume_prompt_tokens_saved_bucket{prompt=\"ats\"" in telemetry.render()
@@ -0,0 +1,66 @@
+import pytest
+
+from result_cache import MemoryCacheBackend, ResultCache, SQLiteCacheBackend, make_cache_key
+
+PDF = b"%PDF-1.4 resume"
+
+
+def test_key_is_stable_for_the_same_inputs():
+    assert make_cache_key(PDF, "gemini", {"temperature": 0, "top_p": 1}, "v1") == \
+        make_cache_key(PDF, "gemini", {"top_p": 1, "temperature": 0}, "v1")
+
+
+@pytest.mark.parametrize("other", [
+    (PDF + b" ", "gemini", {}, "v1"),
+    (PDF, "gemini-pro", {}, "v1"),
+    (PDF, "gemini", {"response_mime_type": "application/json"}, "v1"),
+    (PDF, "gemini", {}, "v2"),
+])
+def test_key_changes_with_document_model_config_and_prompt(other):
+    assert make_cache_key(PDF, "gemini", {}, "v1") != make_cache_key(*other)
+
+
+def test_parse_score_and_stream_keys_are_separate():
+    import app
+
+    keys = {app.parse_cache_key(PDF), app.score_cache_key(PDF), app.stream_score_cache_key(PDF)}
+    assert len(keys) == 3
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_entries_do_not_leak_across_keys(backend, tmp_path):
+    store = MemoryCacheBackend() if backend == "memory" else SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    cache = ResultCache(store)
+    parse_key = make_cache_key(PDF, "gemini", {}, "parse-v1")
+    score_key = make_cache_key(PDF, "gemini", {}, "ats-v1")
+    cache.set(parse_key, {"name": "Jane"})
+    assert cache.get(parse_key) == {"name": "Jane"}
+    assert cache.get(score_key) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_backend_evicts_the_least_recently_used_entry():
+    store = MemoryCacheBackend(max_entries=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert (store.get("a"), store.get("b"), store.get("c")) == (1, None, 3)
+
+
+def test_keys_change_with_text_extraction_settings(monkeypatch):
+    import app
+    import parsed_document
+    import text_extraction
+
+    def keys():
+        return app.parse_cache_key(PDF), app.score_cache_key(PDF), app.stream_score_cache_key(PDF)
+
+    default = keys()
+    monkeypatch.setattr(text_extraction, "DEFAULT_BACKEND", "pypdf")
+    backend = keys()
+    # Parse results come from ParsedDocument, which does not use the text backend
+    assert backend[0] == default[0]
+    assert backend[1] != default[1] and backend[2] != default[2]
+    monkeypatch.setattr(parsed_document, "MAX_PAGES", 2)
+    assert not set(keys()) & (set(default) | set(backend))
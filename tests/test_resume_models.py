@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ats_score_checker
+import resumeparser
+from resume_models import AtsReport, ParsedResume, normalize_report, normalize_resume
+
+
+def test_resume_fills_missing_keys_and_fixes_types():
+    resume = normalize_resume({
+        "personal_info": {"full_name": " Jane Doe ", "contact": {"phone": 5551234}},
+        "skills": {"programming_languages": "Python"},
+        "projects": [{"name": "Site", "technologies": ["Flask", ""]}, "not a project"],
+        "unknown": 1,
+    })
+    assert resume["personal_info"]["full_name"] == "Jane Doe"
+    assert resume["personal_info"]["contact"]["phone"] == "5551234"
+    assert resume["skills"]["programming_languages"] == ["Python"]
+    assert [project["name"] for project in resume["projects"]] == ["Site"]
+    assert resume["projects"][0]["technologies"] == ["Flask"]
+    assert resume["education"] == [] and "unknown" not in resume
+
+
+@pytest.mark.parametrize("data", [[], ["resume"], "resume", None, 3])
+def test_resume_rejects_non_object(data):
+    with pytest.raises(ValueError):
+        ParsedResume.from_dict(data)
+
+
+def test_model_list_answer_is_a_parse_error():
+    result = resumeparser._process_model_response(SimpleNamespace(text='[{"name": "Jane"}]'), {})
+    assert result["error"] == "Failed to parse resume data"
+
+
+def test_report_scores_are_clamped_and_lists_cleaned():
+    report = normalize_report({
+        "ats_score": "104.6",
+        "detailed_scores": {"Content Quality": -3, "": 50},
+        "strengths": "Clear layout",
+        "improvements": [None, " Add metrics "],
+    })
+    assert report == {
+        "ats_score": 100,
+        "detailed_scores": {"Content Quality": 0},
+        "category_analysis": {},
+        "strengths": ["Clear layout"],
+        "improvements": ["Add metrics"],
+        "recommendations": [],
+    }
+
+
+def test_report_keeps_scorer_only_when_set():
+    assert "scorer" not in AtsReport().to_dict()
+    assert AtsReport(scorer="local-1").to_dict()["scorer"] == "local-1"
+
+
+def test_ats_score_is_normalized(monkeypatch):
+    monkeypatch.setattr(ats_score_checker, "_local_score", lambda text: {"ats_score": 71.6, "scorer": "local-1"})
+    assert ats_score_checker.get_ats_score("Jane Doe", scorer="local") == {
+        "ats_score": 72, "detailed_scores": {}, "category_analysis": {}, "strengths": [],
+        "improvements": [], "recommendations": [], "scorer": "local-1",
+    }
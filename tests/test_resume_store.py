@@ -0,0 +1,95 @@
+import pytest
+
+from resume_store import ResumeStore, duration_months, experience_years, search_params
+
+JANE = {
+    "personal_info": {"full_name": "Jane Doe", "contact": {"email": "jane@example.com"}},
+    "skills": {"languages": ["Python", "JS"], "backend": ["Flask"]},
+    "experience": [{"company": "Acme Corp", "position": "Engineer", "duration": "Jan 2018 - Jan 2022",
+                    "responsibilities": ["Built fintech APIs"]}],
+}
+JOHN = {
+    "personal_info": {"full_name": "John Roe", "contact": {"email": "john@example.com"}},
+    "skills": {"frontend": ["React"]},
+    "experience": [{"company": "Globex", "position": "Developer", "duration": "Jan 2021 - Jan 2022"}],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.sqlite3"))
+    store.upsert("a" * 64, JANE, {"ats_score": 82, "detailed_scores": {"format": 80}}, "jane.pdf")
+    store.upsert("b" * 64, JOHN, {"ats_score": 55, "detailed_scores": {"format": 50}}, "john.pdf")
+    return store
+
+
+def test_upsert_keeps_the_parts_not_passed(store):
+    assert store.upsert("a" * 64, analysis={"ats_score": 90, "detailed_scores": {"format": 95}})
+    record = store.get("a" * 64)
+    assert record["parsed_data"] == JANE
+    assert record["ats_score"] == 90
+    assert record["file"] == "jane.pdf"
+    assert record["email"] == "jane@example.com"
+
+
+def test_unchanged_upsert_is_a_no_op(store):
+    version = store.version()
+    assert not store.upsert("a" * 64, JANE)
+    assert store.version() == version
+    assert len(store) == 2
+
+
+def test_search_by_skill_alias_company_and_score(store):
+    def found(**filters):
+        return [result["full_name"] for result in store.search(**filters)["results"]]
+
+    assert found(skills=["javascript"]) == ["Jane Doe"]
+    assert found(companies=["acme corp"]) == ["Jane Doe"]
+    assert found(min_ats_score=60) == ["Jane Doe"]
+    assert found(min_experience_years=3) == ["Jane Doe"]
+    assert sorted(found()) == ["Jane Doe", "John Roe"]
+
+
+def test_full_text_search(store):
+    result = store.search(text="fintech*")
+    assert result["total"] == 1
+    assert result["results"][0]["sha256"] == "a" * 64
+    with pytest.raises(ValueError, match="Invalid search query"):
+        store.search(text='"unbalanced')
+
+
+def test_delete_removes_the_resume_from_search(store):
+    store.delete("a" * 64)
+    assert store.get("a" * 64) is None
+    assert store.search(skills=["python"])["total"] == 0
+
+
+def test_search_params_from_a_query_string():
+    params = search_params({"skill": ["python,react", "flask"], "min_score": ["70"], "limit": [""]})
+    assert params["skills"] == ["python", "react", "flask"]
+    assert params["min_ats_score"] == 70
+    with pytest.raises(ValueError, match="min_years"):
+        search_params({"min_years": ["many"]})
+
+
+@pytest.mark.parametrize("duration", [None, 2021, ["Jan 2020 - Jan 2021"], {"from": 2020}])
+def test_duration_that_is_not_a_string_counts_zero(duration):
+    assert duration_months(duration) == 0
+    assert experience_years({"experience": [{"duration": duration}, {"duration": "Jan 2020 - Dec 2020"}]}) == 1.0
+
+
+def test_parsed_data_string_must_be_an_object(store):
+    version = store.version()
+    records = [{"sha256": "c" * 64, "parsed_data": "{}"}, {"sha256": "d" * 64, "parsed_data": '["Jane"]'}]
+    with pytest.raises(ValueError, match="parsed_data"):
+        store.upsert_many(records)
+    assert store.version() == version and len(store) == 2
+
+
+def test_post_resumes_rejects_list_parsed_data(store, monkeypatch):
+    import app as flask_module
+
+    monkeypatch.setattr(flask_module, "resume_store", store)
+    response = flask_module.app.test_client().post("/resumes", json={"sha256": "c" * 64, "parsed_data": "[1, 2]"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid resume records"
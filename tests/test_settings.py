@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+import settings
+
+pytest.importorskip("yaml")
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """A config file checked on every get_settings call; returns write(text)"""
+    path = tmp_path / "config.yaml"
+    monkeypatch.setattr(settings, "_caches", {})
+    # The repository's .env must not supply the key the tests remove
+    monkeypatch.setattr(settings, "_dotenv_loaded", True)
+    monkeypatch.setenv("CONFIG_PATH", str(path))
+    monkeypatch.setenv("CONFIG_RELOAD_INTERVAL", "0")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    mtime = [1_000_000_000]
+
+    def write(text):
+        path.write_text(text)
+        # Filesystem timestamps can be coarse, so every write gets its own mtime
+        mtime[0] += 10
+        os.utime(path, (mtime[0], mtime[0]))
+        return path
+
+    return write
+
+
+def test_settings_are_cached_until_the_file_changes(config, monkeypatch):
+    config("GEMINI_API_KEY: first\n")
+    first = settings.get_settings()
+    assert first.gemini_api_key == "first"
+    loads = []
+    monkeypatch.setattr(settings, "load_settings", lambda path=None: loads.append(path))
+    assert settings.get_settings() is first
+    assert loads == []
+
+
+def test_changed_file_is_reloaded(config):
+    config("GEMINI_API_KEY: first\n")
+    assert settings.get_settings().gemini_api_key == "first"
+    config("GEMINI_API_KEY: ' second '\n")
+    assert settings.get_settings().gemini_api_key == "second"
+
+
+def test_invalid_file_keeps_previous_settings(config, monkeypatch):
+    config("GEMINI_API_KEY: first\n")
+    previous = settings.get_settings()
+    config("- not\n- a mapping\n")
+    assert settings.get_settings() is previous
+    # The rejected version is not read again
+    monkeypatch.setattr(settings, "load_settings", pytest.fail)
+    assert settings.get_settings() is previous
+
+
+def test_reload_waits_for_the_interval(config, monkeypatch):
+    monkeypatch.setenv("CONFIG_RELOAD_INTERVAL", "3600")
+    config("GEMINI_API_KEY: first\n")
+    assert settings.get_settings().gemini_api_key == "first"
+    config("GEMINI_API_KEY: second\n")
+    assert settings.get_settings().gemini_api_key == "first"
+
+
+def test_environment_key_is_used_without_a_file(config, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "from-env")
+    loaded = settings.get_settings()
+    assert loaded.gemini_api_key == "from-env" and loaded.path is None
+    monkeypatch.delenv("GEMINI_API_KEY")
+    with pytest.raises(FileNotFoundError):
+        settings.load_settings()
+
+
+@pytest.mark.parametrize("text, error", [
+    ("OTHER: value\n", KeyError),
+    ("GEMINI_API_KEY: 42\n", ValueError),
+    ("GEMINI_API_KEY: '  '\n", ValueError),
+    ("just a string\n", ValueError),
+])
+def test_invalid_first_load_raises(config, text, error):
+    config(text)
+    with pytest.raises(error):
+        settings.get_settings()
+
+
+def test_dotenv_is_loaded_on_first_read_not_at_import(tmp_path):
+    pytest.importorskip("dotenv")
+    import subprocess
+    import sys
+
+    (tmp_path / ".env").write_text("GEMINI_API_KEY=from-dotenv\n")
+    script = (
+        "import os, sys\n"
+        "os.environ.pop('GEMINI_API_KEY', None)\n"
+        "import ats_score_checker, settings\n"
+        "print('dotenv' in sys.modules, 'GEMINI_API_KEY' in os.environ)\n"
+        "print(settings.load_settings('missing.yaml').gemini_api_key)\n"
+    )
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=package)
+    env.pop("GEMINI_API_KEY", None)
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    assert output[:2] == ["False False", "from-dotenv"]
@@ -0,0 +1,102 @@
+import logging
+import threading
+
+import pytest
+
+import telemetry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Metrics created in a test are rendered on their own, not with the app's"""
+    registered = []
+    monkeypatch.setattr(telemetry, "_REGISTRY", registered)
+    monkeypatch.setattr(telemetry, "METRICS_ENABLED", True)
+    return registered
+
+
+def test_counter_counts_per_label(registry):
+    counter = telemetry.Counter("jobs_total", "Jobs", ["result"])
+    counter.inc("ok")
+    counter.inc("ok", amount=2)
+    counter.inc("error")
+    assert counter.value("ok") == 3 and counter.value("error") == 1 and counter.value("missing") == 0
+    assert counter.samples() == ['jobs_total{result="error"} 1', 'jobs_total{result="ok"} 3']
+
+
+def test_counter_is_thread_safe(registry):
+    counter = telemetry.Counter("hits_total", "Hits")
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 8000
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = telemetry.Histogram("size", "Sizes", ["kind"], buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value, "pdf")
+    assert histogram.count("pdf") == 4 and histogram.count("docx") == 0
+    assert histogram.samples() == [
+        'size_bucket{kind="pdf",le="1"} 2',
+        'size_bucket{kind="pdf",le="5"} 3',
+        'size_bucket{kind="pdf",le="+Inf"} 4',
+        'size_sum{kind="pdf"} 14.5',
+        'size_count{kind="pdf"} 4',
+    ]
+
+
+def test_disabled_metrics_record_nothing(registry, monkeypatch):
+    counter = telemetry.Counter("off_total", "Off")
+    histogram = telemetry.Histogram("off_seconds", "Off")
+    monkeypatch.setattr(telemetry, "METRICS_ENABLED", False)
+    counter.inc()
+    histogram.observe(1.0)
+    assert counter.value() == 0 and histogram.count() == 0
+
+
+def test_render_uses_prometheus_text_format(registry):
+    counter = telemetry.Counter("lookups_total", "Lookups", ["path"])
+    counter.inc('a"b\\c')
+    telemetry.Gauge("ratio", "A ratio", lambda: 0.25)
+    assert telemetry.render() == (
+        "# HELP lookups_total Lookups\n"
+        "# TYPE lookups_total counter\n"
+        'lookups_total{path="a\\"b\\\\c"} 1\n'
+        "# HELP ratio A ratio\n"
+        "# TYPE ratio gauge\n"
+        "ratio 0.25\n"
+    )
+
+
+def test_span_records_stage_even_on_error(monkeypatch):
+    monkeypatch.setattr(telemetry, "METRICS_ENABLED", True)
+    before = telemetry.STAGE_SECONDS.count("test_stage")
+    with pytest.raises(RuntimeError):
+        with telemetry.span("test_stage"):
+            raise RuntimeError("boom")
+    assert telemetry.STAGE_SECONDS.count("test_stage") == before + 1
+
+
+def test_cache_hit_ratio(monkeypatch):
+    monkeypatch.setattr(telemetry, "METRICS_ENABLED", True)
+    monkeypatch.setattr(telemetry.CACHE_REQUESTS, "_values", {})
+    assert telemetry.CACHE_HIT_RATIO.samples() == ["resume_cache_hit_ratio 0"]
+    for result in ("hit", "hit", "hit", "miss"):
+        telemetry.CACHE_REQUESTS.inc(result)
+    assert telemetry.CACHE_HIT_RATIO.samples() == ["resume_cache_hit_ratio 0.75"]
+
+
+def test_sample_filter_keeps_warnings():
+    sample = telemetry._SampleFilter(0.0)
+    record = logging.LogRecord("resume", logging.INFO, __file__, 1, "dropped", (), None)
+    assert not sample.filter(record)
+    record.levelno = logging.WARNING
+    assert sample.filter(record)
@@ -0,0 +1,43 @@
+from io import BytesIO
+
+import pytest
+
+import text_extraction
+from conftest import sample_pdf
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_extract_text_reads_every_page(backend):
+    assert "jane.doe@example.com" in text_extraction.extract_text(sample_pdf(), backend)
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_unreadable_pdf_raises_value_error(backend):
+    with pytest.raises(ValueError):
+        text_extraction.extract_text(b"%PDF-1.4 not really a pdf", backend)
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+def test_page_error_mid_iteration_raises_value_error(monkeypatch, backend):
+    def broken_pages(source, max_pages=None):
+        yield "page one"
+        raise RuntimeError("bad content stream")
+
+    monkeypatch.setattr(text_extraction.BACKENDS[backend], "iter_pages", broken_pages)
+    pages = text_extraction.iter_page_texts(sample_pdf(), backend)
+    assert next(pages) == "page one"
+    with pytest.raises(ValueError, match="bad content stream"):
+        next(pages)
+
+
+def test_process_returns_400_for_a_page_error(monkeypatch):
+    from app import app
+
+    def broken_pages(source, max_pages=None):
+        raise RuntimeError("bad content stream")
+        yield
+
+    monkeypatch.setattr(text_extraction.get_backend(), "iter_pages", broken_pages)
+    response = app.test_client().post("/process", data={"pdf_doc": (BytesIO(sample_pdf()), "cv.pdf")})
+    assert response.status_code == 400
+    assert "bad content stream" in response.get_json()["message"]
@@ -0,0 +1,148 @@
+"""
+Pluggable plain-text extraction for the ATS endpoints.
+
+/process and /process-stream only need the text of a resume, not the layout
+and links that ParsedDocument collects. A backend yields the text of one page
+at a time. Pages are read lazily and stop at the page cap, and the document
+text is joined once, with a form feed (PAGE_BREAK) between pages so that
+prompt_compaction can still tell the pages apart.
+
+- pymupdf (default): the same PyMuPDF stack ParsedDocument uses, so a
+  worker does not load a second PDF library
+- pypdf: pure Python, imported only when selected
+
+Whatever a backend raises while opening the file or reading a page comes
+out of iter_page_texts as a ValueError, so a broken page is reported like
+any other unreadable upload (400) instead of escaping as a 500.
+
+PDF_TEXT_BACKEND selects the backend. PDF_MAX_PAGES caps the pages read from
+an upload (default 50, 0 for no cap). It applies here and to ParsedDocument,
+so a huge upload cannot tie up a worker.
+"""
+import os
+from io import BytesIO
+
+import telemetry
+from parsed_document import MAX_PAGES, open_pdf, raise_pdf_error
+
+log = telemetry.get_logger(__name__)
+
+# Separates the pages in extract_text output
+PAGE_BREAK = "\f"
+
+
+class PyMuPDFBackend:
+    name = "pymupdf"
+
+    def raise_error(self, e):
+        raise_pdf_error(e)
+
+    def iter_pages(self, source, max_pages=None):
+        """Yield the text of each page, up to max_pages"""
+        try:
+            doc = open_pdf(source)
+        except Exception as e:
+            raise_pdf_error(e)
+        try:
+            for number, page in enumerate(doc, start=1):
+                if max_pages and number > max_pages:
+                    break
+                yield page.get_text()
+        finally:
+            doc.close()
+
+
+class PypdfBackend:
+    name = "pypdf"
+
+    def raise_error(self, e):
+        """Translate pypdf errors into the same ValueErrors as raise_pdf_error"""
+        from pypdf.errors import EmptyFileError, PdfReadError
+
+        if isinstance(e, EmptyFileError):
+            log.warning("PDF file is empty: %s", e)
+            raise ValueError("The PDF file is empty. Please upload a non-empty PDF file.")
+        if isinstance(e, PdfReadError):
+            log.warning("PDF file is corrupted or invalid: %s", e)
+            raise ValueError("The PDF file appears to be corrupted or invalid. Please ensure it's a valid PDF file.")
+        log.warning("Error extracting text from PDF (%s): %s", type(e).__name__, e)
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+    def iter_pages(self, source, max_pages=None):
+        """Yield the text of each page, up to max_pages"""
+        from pypdf import PdfReader
+
+        reader = PdfReader(BytesIO(bytes(source)) if isinstance(source, (bytes, bytearray, memoryview)) else source)
+        for number, page in enumerate(reader.pages, start=1):
+            if max_pages and number > max_pages:
+                break
+            yield page.extract_text() or ""
+
+
+BACKENDS = {backend.name: backend for backend in (PyMuPDFBackend(), PypdfBackend())}
+DEFAULT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pymupdf").lower()
+
+
+def get_backend(name=None):
+    """Return the backend called `name` (default PDF_TEXT_BACKEND); raises ValueError for unknown names"""
+    name = (name or DEFAULT_BACKEND).lower()
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF text backend: {name} (choose from {', '.join(BACKENDS)})") from None
+
+
+def _checked(pages, backend):
+    """Re-raise errors of a lazy page iterator through the backend's raise_error"""
+    try:
+        while True:
+            try:
+                text = next(pages)
+            except StopIteration:
+                return
+            except ValueError:
+                raise
+            except Exception as e:
+                backend.raise_error(e)
+            yield text
+    finally:
+        pages.close()
+
+
+def iter_page_texts(source, backend=None, max_pages=None):
+    """
+    Lazily yield the text of each page of a PDF.
+
+    Args:
+        source (bytes | str): Raw PDF bytes or a path to a PDF file
+        backend (str): Backend name; defaults to PDF_TEXT_BACKEND
+        max_pages (int): Page cap; defaults to PDF_MAX_PAGES, 0 reads every page
+
+    Yields:
+        str: The text of one page
+
+    Raises:
+        ValueError: If the PDF cannot be opened or a page cannot be read
+    """
+    if max_pages is None:
+        max_pages = MAX_PAGES
+    backend = get_backend(backend)
+    return _checked(backend.iter_pages(source, max_pages), backend)
+
+
+def extract_text(source, backend=None, max_pages=None):
+    """
+    Extract the text of a PDF, one PAGE_BREAK between pages.
+
+    Args:
+        source (bytes | str): Raw PDF bytes or a path to a PDF file
+        backend (str): Backend name; defaults to PDF_TEXT_BACKEND
+        max_pages (int): Page cap; defaults to PDF_MAX_PAGES, 0 reads every page
+
+    Returns:
+        str: The document text
+
+    Raises:
+        ValueError: If the PDF cannot be opened or a page cannot be read
+    """
+    return PAGE_BREAK.join(iter_page_texts(source, backend, max_pages))
@@ -0,0 +1,94 @@
+"""
+Warm-up hook that moves one-time startup costs out of the first request.
+
+Importing app.py is kept cheap: the Gemini SDK, PyMuPDF, pypdf and the
+config file are all loaded on first use. warm_up pays those costs up front,
+before the server takes traffic:
+
+- pdf: imports PyMuPDF, parses a one-page PDF through ParsedDocument and the
+  PDF_TEXT_BACKEND text backend, and starts the extraction pool workers
+- model: configures the Gemini client from the settings and builds the parse
+  and ATS models (registering their cached contexts)
+
+The ASGI app calls it from its lifespan startup (WARM_UP=0 skips it). Under
+a WSGI server, call it from the worker start hook. Failures are logged and
+do not stop the server: the same work is retried on the first request.
+"""
+import threading
+import time
+
+import telemetry
+
+log = telemetry.get_logger(__name__)
+
+_lock = threading.Lock()
+_done = {}
+
+
+def _sample_pdf():
+    from parsed_document import pdf_engine
+    doc = pdf_engine().open()
+    try:
+        page = doc.new_page()
+        page.insert_text((72, 72), "Warm-up Resume\nwarm.up@example.com\nSkills: Python")
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def _warm_pdf():
+    import extraction_pool
+    import text_extraction
+    from parsed_document import ParsedDocument
+
+    pdf_bytes = _sample_pdf()
+    ParsedDocument.from_pdf(pdf_bytes)
+    text_extraction.extract_text(pdf_bytes)
+    extraction_pool.start_pool()
+
+
+def _warm_model():
+    import ats_score_checker
+    import resumeparser
+
+    client = resumeparser.get_client()
+    # Modes that never call Gemini need no model
+    if resumeparser.PARSER_MODE != "local":
+        client.get_model(
+            resumeparser.MODEL_NAME, resumeparser.GENERATION_CONFIG, resumeparser.SAFETY_SETTINGS,
+            system_instruction=resumeparser.PARSE_INSTRUCTIONS,
+        )
+    if ats_score_checker.SCORER != "local":
+        client.get_model(
+            ats_score_checker.MODEL_NAME, ats_score_checker.GENERATION_CONFIG,
+            system_instruction=ats_score_checker._system_instruction(),
+        )
+
+
+def warm_up(model=True, pdf=True):
+    """
+    Load the PDF engines and the model client before the first request.
+
+    Each part runs once per process; later calls return the recorded timings.
+
+    Args:
+        model (bool): Configure the Gemini client and build the models
+        pdf (bool): Load the PDF libraries and start the extraction pool
+
+    Returns:
+        dict: Seconds spent per part, or None for a part that failed
+    """
+    parts = [name for name, wanted in (("pdf", pdf), ("model", model)) if wanted]
+    with _lock:
+        for name in parts:
+            if name in _done:
+                continue
+            start = time.perf_counter()
+            try:
+                (_warm_pdf if name == "pdf" else _warm_model)()
+                _done[name] = time.perf_counter() - start
+                log.info("Warmed up %s in %.3fs", name, _done[name])
+            except Exception as e:
+                # Not recorded, so a later call tries again
+                log.warning("Warm-up of %s failed, it will happen on the first request instead: %s", name, e)
+        return {name: _done.get(name) for name in parts}